@@ -2,6 +2,7 @@
 Configuration centralisée - charge models.yaml, intents.yaml, risk.yaml
 """
 
+import hashlib
 import os
 import yaml
 from pathlib import Path
@@ -23,6 +24,102 @@ class Settings(BaseSettings):
     model_drafter: str = os.getenv("MODEL_DRAFTER", "claude-sonnet-4-5-20250929")
     model_verifier: str = os.getenv("MODEL_VERIFIER", "claude-opus-4-5-20251101")
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3")
+    # Micro-batching of query embeddings (concurrent requests encoded together)
+    embedding_batching: bool = os.getenv("EMBEDDING_BATCHING", "true").lower() == "true"
+    embedding_max_batch: int = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+    embedding_max_wait_ms: float = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+    
+    # LLM client (shared async connection pool)
+    llm_max_connections: int = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+    llm_max_keepalive_connections: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    llm_prompt_caching: bool = os.getenv("LLM_PROMPT_CACHING", "true").lower() == "true"
+    
+    # Background processing ("sync" = pipeline in the HTTP request, "queue" = 202 + workers)
+    processing_mode: str = os.getenv("PROCESSING_MODE", "sync")
+    job_queue_backend: str = os.getenv("JOB_QUEUE_BACKEND", "redis")  # 'redis' | 'memory'
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_result_ttl_seconds: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+    job_visibility_timeout_seconds: int = int(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+    
+    # Batch processing (/api/messages/process-batch)
+    batch_max_size: int = int(os.getenv("BATCH_MAX_SIZE", "4000"))
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    
+    # Keyword fast-path pre-classifier ('off' | 'shadow' = compare only | 'on' = skip LLM when confident)
+    # 'on': language is assumed to be default_language and risk LOW unless a risk keyword matches,
+    # so fast-path runs are never autopiloted (always HITL)
+    classifier_fastpath: str = os.getenv("CLASSIFIER_FASTPATH", "shadow")
+    fastpath_min_confidence: float = float(os.getenv("FASTPATH_MIN_CONFIDENCE", "0.85"))
+    
+    # Critical risk short-circuit (skip draft + verify, policy template reply)
+    critical_short_circuit: bool = os.getenv("CRITICAL_SHORT_CIRCUIT", "true").lower() == "true"
+    
+    # Verification policy ('llm' = Opus on every draft | 'tiered' = local style rules for low-risk safe intents)
+    verification_policy: str = os.getenv("VERIFICATION_POLICY", "tiered")
+    
+    # Audit log (table logs), toujours un seul commit par message traité:
+    # transactional = lignes d'audit dans la transaction du run, buffered = writer de fond après le commit
+    audit_log_mode: str = os.getenv("AUDIT_LOG_MODE", "transactional")
+    audit_log_batch_size: int = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "200"))
+    audit_log_flush_interval_seconds: float = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL_SECONDS", "0.5"))
+    audit_log_max_buffer: int = int(os.getenv("AUDIT_LOG_MAX_BUFFER", "10000"))
+    
+    # Classification cache (normalized message + context -> ClassificationOutput)
+    classification_cache: bool = os.getenv("CLASSIFICATION_CACHE", "true").lower() == "true"
+    classification_cache_backend: str = os.getenv("CLASSIFICATION_CACHE_BACKEND", "memory")  # 'memory' | 'redis' (shared, memory L1 in front)
+    classification_cache_ttl_seconds: int = int(os.getenv("CLASSIFICATION_CACHE_TTL_SECONDS", "3600"))
+    classification_cache_max_entries: int = int(os.getenv("CLASSIFICATION_CACHE_MAX_ENTRIES", "10000"))
+    config_reload_check_seconds: float = float(os.getenv("CONFIG_RELOAD_CHECK_SECONDS", "5"))
+    
+    # Semantic draft cache (FAQ intents: reuse verified PASS drafts of paraphrased questions)
+    draft_cache: bool = os.getenv("DRAFT_CACHE", "true").lower() == "true"
+    draft_cache_similarity: float = float(os.getenv("DRAFT_CACHE_SIMILARITY", "0.92"))
+    draft_cache_reverify: bool = os.getenv("DRAFT_CACHE_REVERIFY", "false").lower() == "true"
+    draft_cache_ttl_seconds: int = int(os.getenv("DRAFT_CACHE_TTL_SECONDS", "86400"))
+    draft_cache_max_entries_per_intent: int = int(os.getenv("DRAFT_CACHE_MAX_ENTRIES_PER_INTENT", "500"))
+    
+    # RAG (knowledge_docs embeddings searched in an in-memory float32 index)
+    embedding_dim: int = int(os.getenv("EMBEDDING_DIM", "1024"))
+    rag_similarity_threshold: float = float(os.getenv("RAG_SIMILARITY_THRESHOLD", "0.7"))
+    rag_corpus_check_seconds: float = float(os.getenv("RAG_CORPUS_CHECK_SECONDS", "5"))
+    # 'exact' = brute force | 'ivf' = approximate (IVF-Flat) once the corpus reaches rag_ivf_min_docs
+    # | 'pgvector' = ORDER BY distance LIMIT k in Postgres, through an HNSW / IVFFlat index
+    rag_index_backend: str = os.getenv("RAG_INDEX_BACKEND", "exact")
+    rag_ivf_min_docs: int = int(os.getenv("RAG_IVF_MIN_DOCS", "5000"))
+    rag_ivf_nlist: int = int(os.getenv("RAG_IVF_NLIST", "0"))  # 0 = ~sqrt(docs)
+    rag_ivf_nprobe: int = int(os.getenv("RAG_IVF_NPROBE", "8"))  # lists scanned per query: recall vs latency
+    rag_index_path: str = os.getenv("RAG_INDEX_PATH", "")  # .npz where the IVF index is persisted ('' = rebuilt each load)
+    rag_pgvector_index: str = os.getenv("RAG_PGVECTOR_INDEX", "hnsw")  # 'hnsw' | 'ivfflat'
+    rag_hnsw_m: int = int(os.getenv("RAG_HNSW_M", "16"))
+    rag_hnsw_ef_construction: int = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+    rag_hnsw_ef_search: int = int(os.getenv("RAG_HNSW_EF_SEARCH", "40"))  # >= top_k; higher = better recall, slower
+    rag_ivfflat_probes: int = int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+    # Hybrid retrieval: BM25 (title + content) fused with vector search by reciprocal rank fusion
+    rag_hybrid: bool = os.getenv("RAG_HYBRID", "true").lower() == "true"
+    rag_hybrid_candidates: int = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))  # per ranking, before fusion
+    rag_rrf_k: int = int(os.getenv("RAG_RRF_K", "60"))
+    # Quantized first pass for the exact backend ('none' | 'int8' | 'binary'), shortlist of
+    # rag_rescore_factor * k rescored on float32 vectors memory-mapped from rag_vectors_path
+    rag_quantization: str = os.getenv("RAG_QUANTIZATION", "none")
+    rag_rescore_factor: int = int(os.getenv("RAG_RESCORE_FACTOR", "4"))
+    rag_vectors_path: str = os.getenv("RAG_VECTORS_PATH", "")  # '' = per-process file in the temp dir
+    # Chunking: long docs stored as overlapping passages (embedding model tokens)
+    rag_chunk_max_tokens: int = int(os.getenv("RAG_CHUNK_MAX_TOKENS", "200"))
+    rag_chunk_overlap_tokens: int = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "40"))
+    # Intent routing: the classification narrows retrieval to (doc_type, category) partitions, each with its own index
+    rag_routing: bool = os.getenv("RAG_ROUTING", "true").lower() == "true"
+    rag_routing_min_confidence: float = float(os.getenv("RAG_ROUTING_MIN_CONFIDENCE", "0.6"))  # below: whole corpus
+    rag_routing_pinned_hits: int = int(os.getenv("RAG_ROUTING_PINNED_HITS", "2"))  # risk partitions, whatever the threshold
+    # Query caches (LRU, bounded in entries and MB): normalized query -> embedding,
+    # (query, route, params, corpus version) -> extracts, cleared when the corpus version changes
+    rag_query_cache: bool = os.getenv("RAG_QUERY_CACHE", "true").lower() == "true"
+    rag_query_cache_ttl_seconds: int = int(os.getenv("RAG_QUERY_CACHE_TTL_SECONDS", "86400"))
+    rag_embedding_cache_max_entries: int = int(os.getenv("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+    rag_embedding_cache_mb: float = float(os.getenv("RAG_EMBEDDING_CACHE_MB", "64"))
+    rag_result_cache_max_entries: int = int(os.getenv("RAG_RESULT_CACHE_MAX_ENTRIES", "5000"))
+    rag_result_cache_mb: float = float(os.getenv("RAG_RESULT_CACHE_MB", "32"))
     
     # Features
     hitl_required: bool = os.getenv("HITL_REQUIRED", "true").lower() == "true"
@@ -49,6 +146,40 @@ MODELS_CONFIG = load_yaml_config("models.yaml")
 INTENTS_CONFIG = load_yaml_config("intents.yaml")
 RISK_CONFIG = load_yaml_config("risk.yaml")
 
+# intents.yaml + risk.yaml drive classification: cached results are keyed by their version
+TAXONOMY_FILES = ("intents.yaml", "risk.yaml")
+
+def _taxonomy_stat() -> tuple:
+    stats = [(Path(__file__).parent / filename).stat() for filename in TAXONOMY_FILES]
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+def _taxonomy_hash() -> str:
+    digest = hashlib.sha1()
+    for filename in TAXONOMY_FILES:
+        digest.update((Path(__file__).parent / filename).read_bytes())
+    return digest.hexdigest()[:12]
+
+_taxonomy_stat_seen = _taxonomy_stat()
+TAXONOMY_VERSION = _taxonomy_hash()
+
+def get_taxonomy_version() -> str:
+    return TAXONOMY_VERSION
+
+def refresh_taxonomy_config() -> bool:
+    """Reload intents.yaml / risk.yaml if they changed on disk; True when the version changed"""
+    global INTENTS_CONFIG, RISK_CONFIG, TAXONOMY_VERSION, _taxonomy_stat_seen
+    current = _taxonomy_stat()
+    if current == _taxonomy_stat_seen:
+        return False
+    _taxonomy_stat_seen = current
+    version = _taxonomy_hash()
+    if version == TAXONOMY_VERSION:
+        return False
+    INTENTS_CONFIG = load_yaml_config("intents.yaml")
+    RISK_CONFIG = load_yaml_config("risk.yaml")
+    TAXONOMY_VERSION = version
+    return True
+
 # Extract specific configs
 def get_model_config(key: str, default: str = "") -> str:
     """Get model ID from config with env override"""
@@ -67,6 +198,14 @@ def get_safe_autopilot_intents() -> List[str]:
         if intent.get("safe_autopilot", False)
     ]
 
+def get_draft_cache_intents() -> List[str]:
+    """FAQ-style intents whose verified drafts can be reused (semantic draft cache)"""
+    return [
+        intent["id"]
+        for intent in get_intents()
+        if intent.get("draft_cache", False)
+    ]
+
 def get_risk_flags() -> List[Dict]:
     """Get list of risk flags"""
     return RISK_CONFIG.get("risk_flags", [])
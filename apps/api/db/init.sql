@@ -122,14 +122,29 @@ CREATE TABLE IF NOT EXISTS knowledge_docs (
     content TEXT NOT NULL,
     doc_type VARCHAR(50),
     category VARCHAR(100),
+    doc_key VARCHAR(255) UNIQUE,
+    content_hash VARCHAR(64),
+    parent_id INTEGER REFERENCES knowledge_docs(id) ON DELETE CASCADE,
+    chunk_index INTEGER,
     embedding vector(1024),
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW(),
     metadata JSONB
 );
-CREATE INDEX IF NOT EXISTS idx_knowledge_embedding ON knowledge_docs 
-    USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- HNSW: no training step, so it can be created on the empty table (IVFFlat lists would be trained on nothing)
+CREATE INDEX IF NOT EXISTS idx_knowledge_docs_embedding_hnsw ON knowledge_docs 
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+-- Partial indexes per routed doc_type (intent routing searches one partition at a time)
+CREATE INDEX IF NOT EXISTS idx_knowledge_docs_embedding_hnsw_claim ON knowledge_docs
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64) WHERE doc_type = 'claim';
+CREATE INDEX IF NOT EXISTS idx_knowledge_docs_embedding_hnsw_faq ON knowledge_docs
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64) WHERE doc_type = 'faq';
+CREATE INDEX IF NOT EXISTS idx_knowledge_docs_embedding_hnsw_policy ON knowledge_docs
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64) WHERE doc_type = 'policy';
+CREATE INDEX IF NOT EXISTS idx_knowledge_docs_embedding_hnsw_product ON knowledge_docs
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64) WHERE doc_type = 'product';
 CREATE INDEX IF NOT EXISTS idx_knowledge_type ON knowledge_docs(doc_type);
+CREATE INDEX IF NOT EXISTS idx_knowledge_parent ON knowledge_docs(parent_id);
 
 -- Tracking events table
 CREATE TABLE IF NOT EXISTS tracking_events (
@@ -3,13 +3,15 @@ FastAPI Main Application - Influence Connect
 """
 
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from config import settings
-from routes import health, messages, influencers, tracking, eval_routes, comments_ambassadors, instagram_webhook
-from db.database import init_db
+from routes import health, messages, influencers, tracking, eval_routes, comments_ambassadors, instagram_webhook, jobs
+from db.database import init_db, engine
+from services.metrics import PrometheusMiddleware, register_db_pool_collector, render_metrics
+from services.container import ServiceContainer
 
 # Configure logging
 logging.basicConfig(
@@ -28,10 +30,17 @@ async def lifespan(app: FastAPI):
     
     # Initialize database
     await init_db()
+    register_db_pool_collector(engine)
+    
+    # Shared services (pipeline, LLM clients, RAG, job workers, audit writer), once per process
+    container = ServiceContainer()
+    app.state.container = container
+    await container.start()
     
     yield
     
     logger.info("👋 Shutting down Influence Connect API")
+    await container.close()
 
 app = FastAPI(
     title="Influence Connect API",
@@ -48,6 +57,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
 
 # Routes
 app.include_router(health.router, prefix="/api", tags=["health"])
@@ -57,6 +67,7 @@ app.include_router(instagram_webhook.router, tags=["instagram"])
 app.include_router(influencers.router, prefix="/api/influencers", tags=["influencers"])
 app.include_router(tracking.router, prefix="/api/tracking", tags=["tracking"])
 app.include_router(eval_routes.router, prefix="/api/eval", tags=["evaluation"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -68,6 +79,12 @@ async def root():
         "health": "/api/health"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/api")
 async def api_root():
     return {
@@ -79,7 +96,9 @@ async def api_root():
             "docs": "/docs",
             "messages": "/api/messages",
             "influencers": "/api/influencers",
-            "tracking": "/api/tracking"
+            "tracking": "/api/tracking",
+            "jobs": "/api/jobs/{job_id}",
+            "metrics": "/metrics"
         }
     }
 
@@ -6,6 +6,7 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean,
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
 
 Base = declarative_base()
 
@@ -106,12 +107,25 @@ class KnowledgeDoc(Base):
     __tablename__ = "knowledge_docs"
     
     id = Column(Integer, primary_key=True)
-    title = Column(String(255), nullable=False)
+    title = Column(String(500), nullable=False)
     content = Column(Text, nullable=False)
+    doc_type = Column(String(50), nullable=True)  # policy, faq, product, claim
     category = Column(String(100), nullable=True)
     source = Column(String(255), nullable=True)
+    doc_key = Column(String(255), nullable=True, unique=True)  # stable source identity (incremental ingest)
+    content_hash = Column(String(64), nullable=True)
+    # Chunks of a long doc are rows pointing to it; only embedded rows (whole doc or chunk) are searched
+    parent_id = Column(Integer, ForeignKey('knowledge_docs.id', ondelete='CASCADE'), nullable=True)
+    chunk_index = Column(Integer, nullable=True)
+    embedding = Column(Vector(1024), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     meta = Column(JSON, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_knowledge_type', 'doc_type'),
+        Index('idx_knowledge_parent', 'parent_id'),
+    )
 
 class TrackingEvent(Base):
     """Analytics and tracking"""
@@ -3,7 +3,7 @@ Pydantic models pour validation JSON stricte
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
 # ============================================================================
@@ -118,6 +118,24 @@ class ProcessedMessage(BaseModel):
     rag_extracts: List[dict] = Field(default_factory=list)
     requires_hitl: bool = True
     can_autopilot: bool = False
+    stage_timings_ms: Dict[str, float] = Field(default_factory=dict)
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class JobInfo(BaseModel):
+    """Job de traitement pipeline (mode queue, réponse 202)"""
+    job_id: str
+    kind: str
+    status: JobStatus
+    message_id: Optional[int] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[float] = None
+    updated_at: Optional[float] = None
 
 class ApprovalAction(BaseModel):
     """Action HITL"""
@@ -171,3 +189,4 @@ class RAGExtract(BaseModel):
     similarity_score: float
     doc_type: str
     category: Optional[str] = None
+    chunk_index: Optional[int] = None  # passage of a chunked doc (content = that passage only)
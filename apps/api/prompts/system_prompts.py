@@ -328,6 +328,39 @@ Output:
 }
 """
 
+# ============================================================================
+# D) ESCALATION_TEMPLATES - Réponses policy pour risques critiques (sans LLM)
+# ============================================================================
+
+# Utilisées quand un flag critique court-circuite draft + vérification.
+# Ordre de priorité = ordre de risk.yaml; "default" si flag sans template.
+ESCALATION_TEMPLATES = {
+    "medical": {
+        "reply_text": "Nous ne pouvons pas donner de conseil médical. Nous vous recommandons de consulter un dermatologue. Notre équipe reste disponible en DM.",
+        "ask_dm_question": None
+    },
+    "allergy_adverse": {
+        "reply_text": "Nous prenons cela très au sérieux. Pouvez-vous nous contacter en DM avec plus de détails ? Notre équipe va vous aider.",
+        "ask_dm_question": "Pouvez-vous décrire la réaction et nous indiquer le produit exact utilisé ?"
+    },
+    "minors": {
+        "reply_text": "Nous vous recommandons de consulter un adulte ou un dermatologue pour des conseils adaptés.",
+        "ask_dm_question": None
+    },
+    "harassment_hate": {
+        "reply_text": "Nous souhaitons garder cet espace bienveillant pour tous. Notre équipe va examiner votre message.",
+        "ask_dm_question": None
+    },
+    "legal_press": {
+        "reply_text": "Merci pour votre message. Notre équipe dédiée va revenir vers vous rapidement.",
+        "ask_dm_question": None
+    },
+    "default": {
+        "reply_text": "Merci pour votre message. Notre équipe va revenir vers vous rapidement en DM.",
+        "ask_dm_question": None
+    }
+}
+
 # ============================================================================
 # STYLE GUIDE (Référence)
 # ============================================================================
@@ -352,6 +385,21 @@ STYLE_GUIDE = {
         "promesses absolues",
         "conseils médicaux"
     ],
+    # Vérification locale (tier "rules" de la vérification): tout match → Opus
+    "max_exclamation_run": 1,
+    "banned_phrases": [
+        "garanti",
+        "100%",
+        "guérir",
+        "guérit",
+        "miracle",
+        "élimine totalement",
+        "éliminer totalement",
+        "définitivement",
+        "sans aucun risque",
+        "diagnostic",
+        "traitement"
+    ],
     "prefer": [
         "phrases courtes",
         "empathie",
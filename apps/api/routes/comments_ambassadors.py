@@ -3,41 +3,30 @@ Routes pour commentaires et ambassadeurs
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import logging
 import json
 
-from config import settings
 from db.database import get_db
-from models.schemas import IncomingMessage, ProcessedMessage
+from models.schemas import IncomingMessage, ProcessedMessage, JobInfo
 from services.pipeline import AIPipeline
-from services.mock_ai import MockClassifierService, MockDrafterService, MockVerifierService
-from services.rag import RAGService
+from services.container import get_pipeline
+from services.job_queue import queue_enabled, enqueue_pipeline_job
+from services.unit_of_work import PipelineStageError, message_row, insert_message, record_failure
 from services.influencer_scoring import InfluencerScoringService, InfluencerProfile
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize services
-if settings.anthropic_api_key:
-    from services.real_ai import RealClassifierService, RealDrafterService, RealVerifierService
-    classifier_service = RealClassifierService()
-    drafter_service = RealDrafterService()
-    verifier_service = RealVerifierService()
-else:
-    classifier_service = MockClassifierService()
-    drafter_service = MockDrafterService()
-    verifier_service = MockVerifierService()
-
-rag_service = RAGService()
-pipeline = AIPipeline(classifier_service, rag_service, drafter_service, verifier_service)
 influencer_service = InfluencerScoringService()
 
-@router.post("/comments/process", response_model=ProcessedMessage)
+@router.post("/comments/process", response_model=ProcessedMessage, responses={202: {"model": JobInfo}})
 async def process_comment(
     message: IncomingMessage,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
 ):
     """
     Process Instagram/Facebook comment:
@@ -45,29 +34,20 @@ async def process_comment(
     2. Run AI pipeline
     3. Determine if should convert to DM
     4. Return draft response
+    
+    PROCESSING_MODE=queue: returns 202 with a job id after step 1.
     """
+    row = message_row(message, message_type="comment")
     try:
         logger.info(f"💬 Processing comment from {message.sender_username}: {message.content[:50]}...")
         
-        # Save comment
-        result = await db.execute(
-            text("""
-                INSERT INTO messages (platform, message_type, sender_id, sender_username, content, thread_id, meta)
-                VALUES (:platform, :message_type, :sender_id, :sender_username, :content, :thread_id, :meta)
-                RETURNING id
-            """),
-            {
-                "platform": message.platform,
-                "message_type": "comment",
-                "sender_id": message.sender_id,
-                "sender_username": message.sender_username,
-                "content": message.content,
-                "thread_id": message.thread_id,
-                "meta": json.dumps(message.metadata) if message.metadata else '{}'
-            }
-        )
-        await db.commit()
-        message_id = result.scalar_one()
+        # Save comment (committed with the pipeline run)
+        message_id = await insert_message(db, row)
+        
+        if queue_enabled():
+            await db.commit()
+            job = await enqueue_pipeline_job("comment", message_id, message.content, message.metadata)
+            return JSONResponse(status_code=202, content=job.dict())
         
         # Run pipeline
         processed = await pipeline.process(message.content, message_id, db, message.metadata)
@@ -87,6 +67,9 @@ async def process_comment(
         
         return processed
         
+    except PipelineStageError as e:
+        await record_failure(db, e, row)
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Error processing comment: {str(e)}")
         await db.rollback()
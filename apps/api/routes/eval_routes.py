@@ -7,7 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Optional
 
+from config import settings
 from db.database import get_db
+from services.keyword_classifier import FASTPATH_STATS
+from services.classification_cache import get_classification_cache
+from services.container import ServiceContainer, get_container
+from services.draft_cache import get_draft_cache
+from services.llm_client import USAGE_TOTALS
+from services.pipeline import EARLY_EXIT_STATS
+from services.verification_policy import VERIFICATION_STATS
 
 router = APIRouter()
 
@@ -116,3 +124,38 @@ async def get_logs(
     
     logs = [dict(row._mapping) for row in result]
     return {"logs": logs, "count": len(logs)}
+
+@router.get("/fastpath")
+async def get_fastpath_stats():
+    """Keyword fast-path classifier: LLM calls skipped and shadow agreement with the LLM"""
+    return FASTPATH_STATS.snapshot()
+
+@router.get("/short-circuit")
+async def get_short_circuit_stats():
+    """Critical-risk early exits: avoided drafter/verifier calls and estimated saved latency"""
+    return EARLY_EXIT_STATS.snapshot()
+
+@router.get("/verification-tiers")
+async def get_verification_tier_stats():
+    """Risk-tiered verification: counts and latencies per tier (rules / rules_then_llm / llm)"""
+    return VERIFICATION_STATS.snapshot()
+
+@router.get("/llm-usage")
+async def get_llm_usage():
+    """Token usage per model, incl. prompt cache reads/writes and cache hit ratio"""
+    return {"prompt_caching": settings.llm_prompt_caching, "models": USAGE_TOTALS.snapshot()}
+
+@router.get("/classification-cache")
+async def get_classification_cache_stats():
+    """Classification cache: hit rate (memory / Redis), entries, invalidations on intents.yaml / risk.yaml change"""
+    return get_classification_cache().snapshot()
+
+@router.get("/draft-cache")
+async def get_draft_cache_stats():
+    """Semantic draft cache: hit rate, entries per intent, estimated saved latency"""
+    return get_draft_cache().snapshot()
+
+@router.get("/rag-index")
+async def get_rag_index_stats(container: ServiceContainer = Depends(get_container)):
+    """RAG index: indexed docs, memory, reloads on corpus change, average search latency"""
+    return container.rag.snapshot()
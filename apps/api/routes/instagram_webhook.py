@@ -9,7 +9,7 @@ import sys
 from pathlib import Path
 
 from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import Response
+from fastapi.responses import Response, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Add parent directory to path for imports
@@ -18,9 +18,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from db.database import get_db
 from services.instagram_webhook import InstagramWebhookService
 from services.pipeline import AIPipeline
+from services.container import get_pipeline
 from models.orm import Message, Thread
-from services.mock_ai import MockClassifierService, MockDrafterService, MockVerifierService
-from services.rag import RAGService
+from services.job_queue import queue_enabled, enqueue_pipeline_job
+from services.unit_of_work import PipelineStageError, record_failure
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +69,11 @@ async def verify_webhook(request: Request):
 
 
 @router.post("/webhook")
-async def receive_webhook(request: Request, db: AsyncSession = Depends(get_db)):
+async def receive_webhook(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
+):
     """
     Webhook event receiver (POST)
     Instagram sends DMs and comments here
@@ -117,13 +122,16 @@ async def receive_webhook(request: Request, db: AsyncSession = Depends(get_db)):
         message_id = message_obj.id
         logger.info(f"💾 Saved message to DB: id={message_id}")
         
-        # Initialize pipeline with mock services
-        pipeline = AIPipeline(
-            classifier=MockClassifierService(),
-            rag=RAGService(),
-            drafter=MockDrafterService(),
-            verifier=MockVerifierService()
-        )
+        # Queue mode: answer Meta immediately, workers run the pipeline
+        if queue_enabled():
+            job = await enqueue_pipeline_job("instagram", message_id, pipeline_input["message"])
+            return JSONResponse(status_code=202, content={
+                "status": "accepted",
+                "processed": False,
+                "message_id": message_id,
+                "event_type": webhook_event.get("event_type"),
+                "job_id": job.job_id
+            })
         
         # Process through pipeline
         logger.info(f"🚀 Processing through AI pipeline...")
@@ -133,7 +141,7 @@ async def receive_webhook(request: Request, db: AsyncSession = Depends(get_db)):
             db=db
         )
         
-        logger.info(f"✅ Processing complete: verdict={result.get('verification_verdict')}")
+        logger.info(f"✅ Processing complete: verdict={result.verification.verdict}")
         
         return {
             "status": "ok",
@@ -143,6 +151,10 @@ async def receive_webhook(request: Request, db: AsyncSession = Depends(get_db)):
             "result": result
         }
         
+    except PipelineStageError as e:
+        # The message itself was committed on receipt (Meta will not redeliver after a 200)
+        await record_failure(db, e)
+        return {"status": "error", "reason": str(e)}
     except Exception as e:
         logger.error(f"❌ Webhook processing error: {e}", exc_info=True)
         # Return 200 to prevent Instagram retries, but log the error
@@ -150,7 +162,10 @@ async def receive_webhook(request: Request, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/fetch-real-messages")
-async def fetch_real_messages(db: AsyncSession = Depends(get_db)):
+async def fetch_real_messages(
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
+):
     """
     Fetch real messages from Instagram Graph API
     Uses existing access token to poll for new messages
@@ -221,20 +236,13 @@ async def fetch_real_messages(db: AsyncSession = Depends(get_db)):
                 logger.info(f"💾 Saved real message: {msg_id}")
                 
                 # Process through pipeline
-                pipeline = AIPipeline(
-                    classifier=MockClassifierService(),
-                    rag=RAGService(),
-                    drafter=MockDrafterService(),
-                    verifier=MockVerifierService()
-                )
-                
                 result = await pipeline.process(
                     message=msg.get("message", ""),
                     message_id=message_obj.id,
                     db=db
                 )
                 
-                logger.info(f"✅ Processed message: {result.get('verification_verdict')}")
+                logger.info(f"✅ Processed message: {result.verification.verdict}")
                 processed_count += 1
         
         return {
@@ -285,7 +293,8 @@ async def instagram_webhook_status():
 async def demo_message(
     message: str = "Bonjour, quelle est votre meilleure crème anti-âge?",
     sender_name: str = "Jury Member",
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
 ):
     """
     Demo endpoint - Simulate receiving an Instagram message
@@ -313,14 +322,6 @@ async def demo_message(
         message_id = message_obj.id
         logger.info(f"💾 Saved demo message to DB: id={message_id}")
         
-        # Initialize pipeline with real or mock services
-        pipeline = AIPipeline(
-            classifier=MockClassifierService(),
-            rag=RAGService(),
-            drafter=MockDrafterService(),
-            verifier=MockVerifierService()
-        )
-        
         # Process through pipeline
         logger.info(f"🚀 Processing demo message through AI pipeline...")
         processed_msg = await pipeline.process(
@@ -0,0 +1,31 @@
+"""
+Routes jobs - suivi des traitements pipeline en mode queue (202 Accepted)
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+import logging
+
+from models.schemas import JobInfo
+from services.job_queue import get_job_queue, to_job_info
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Long-poll: seconds to wait for completion")
+):
+    """
+    Poll a pipeline job. With wait > 0 the request blocks until the job
+    completes (or the timeout expires) - subscribe-style long polling.
+    """
+    queue = get_job_queue()
+    if queue is None:
+        raise HTTPException(status_code=404, detail="Job queue disabled (PROCESSING_MODE=sync)")
+
+    job = await queue.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return to_job_info(job)
@@ -2,42 +2,32 @@
 Routes pour le flux messages (pipeline IA complet)
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from typing import List, Optional
+import asyncio
 import logging
 import json
+import time
 
 from config import settings
-from db.database import get_db
-from models.schemas import IncomingMessage, ProcessedMessage, ApprovalAction
+from db.database import get_db, AsyncSessionLocal
+from models.schemas import IncomingMessage, ProcessedMessage, ApprovalAction, JobInfo
 from services.pipeline import AIPipeline
-from services.rag import RAGService
+from services.container import get_pipeline
+from services.job_queue import queue_enabled, enqueue_pipeline_job
+from services.unit_of_work import PipelineStageError, message_row, insert_message, record_failure
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Use real Claude models if API key is available, otherwise use mocks
-if settings.anthropic_api_key:
-    logger.info("✅ Using REAL Claude AI services")
-    from services.real_ai import RealClassifierService, RealDrafterService, RealVerifierService
-    classifier_service = RealClassifierService()
-    drafter_service = RealDrafterService()
-    verifier_service = RealVerifierService()
-else:
-    logger.info("⚠️  Using MOCK AI services (no ANTHROPIC_API_KEY set)")
-    from services.mock_ai import MockClassifierService, MockDrafterService, MockVerifierService
-    classifier_service = MockClassifierService()
-    drafter_service = MockDrafterService()
-    verifier_service = MockVerifierService()
-
-rag_service = RAGService()
-pipeline = AIPipeline(classifier_service, rag_service, drafter_service, verifier_service)
-
-@router.post("/process", response_model=ProcessedMessage)
+@router.post("/process", response_model=ProcessedMessage, responses={202: {"model": JobInfo}})
 async def process_message(
     message: IncomingMessage,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
 ):
     """
     Pipeline IA complet pour un message entrant:
@@ -47,29 +37,24 @@ async def process_message(
     4. Draft reply
     5. Verify reply
     6. Return for HITL
+    
+    PROCESSING_MODE=queue: saves the message, enqueues steps 2-5 and returns
+    202 with a job id (poll GET /api/jobs/{job_id}).
+    
+    Sync mode: message, draft and audit logs are committed in one transaction.
+    If a stage fails, the message is kept with an "error" audit row.
     """
+    row = message_row(message)
     try:
         logger.info(f"📥 Processing message from {message.sender_username}: {message.content[:50]}...")
         
-        # 1. Save message
-        result = await db.execute(
-            text("""
-                INSERT INTO messages (platform, message_type, sender_id, sender_username, content, thread_id, meta)
-                VALUES (:platform, :message_type, :sender_id, :sender_username, :content, :thread_id, :meta)
-                RETURNING id
-            """),
-            {
-                "platform": message.platform,
-                "message_type": message.message_type,
-                "sender_id": message.sender_id,
-                "sender_username": message.sender_username,
-                "content": message.content,
-                "thread_id": message.thread_id,
-                "meta": json.dumps(message.metadata) if message.metadata else '{}'
-            }
-        )
-        await db.commit()
-        message_id = result.scalar_one()
+        # 1. Save message (committed with the pipeline run)
+        message_id = await insert_message(db, row)
+        
+        if queue_enabled():
+            await db.commit()
+            job = await enqueue_pipeline_job("message", message_id, message.content)
+            return JSONResponse(status_code=202, content=job.dict())
         
         # 2-5. Pipeline IA
         processed = await pipeline.process(message.content, message_id, db)
@@ -78,11 +63,187 @@ async def process_message(
         
         return processed
         
+    except PipelineStageError as e:
+        await record_failure(db, e, row)
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Error processing message: {str(e)}")
         await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+MESSAGE_COLUMNS = ["platform", "message_type", "sender_id", "sender_username", "content", "thread_id", "meta"]
+# Postgres caps bind parameters at 32767 per statement
+INSERT_CHUNK_ROWS = 32767 // len(MESSAGE_COLUMNS)
+
+async def insert_messages(db: AsyncSession, messages: List[IncomingMessage]) -> List[int]:
+    """Insert messages with multi-row INSERTs (one per INSERT_CHUNK_ROWS), return ids in input order"""
+    ids = []
+    for start in range(0, len(messages), INSERT_CHUNK_ROWS):
+        ids.extend(await _insert_chunk(db, messages[start:start + INSERT_CHUNK_ROWS]))
+    return ids
+
+async def _insert_chunk(db: AsyncSession, messages: List[IncomingMessage]) -> List[int]:
+    values = []
+    params = {}
+    for i, message in enumerate(messages):
+        values.append("(" + ", ".join(f":{column}_{i}" for column in MESSAGE_COLUMNS) + ")")
+        params.update({
+            f"platform_{i}": message.platform,
+            f"message_type_{i}": message.message_type,
+            f"sender_id_{i}": message.sender_id,
+            f"sender_username_{i}": message.sender_username,
+            f"content_{i}": message.content,
+            f"thread_id_{i}": message.thread_id,
+            f"meta_{i}": json.dumps(message.metadata) if message.metadata else '{}'
+        })
+    
+    result = await db.execute(
+        text(f"""
+            INSERT INTO messages ({", ".join(MESSAGE_COLUMNS)})
+            VALUES {", ".join(values)}
+            RETURNING id
+        """),
+        params
+    )
+    # SERIAL ids are assigned in VALUES order, so sorted ids map to input order
+    return sorted(result.scalars().all())
+
+@router.post("/process-batch")
+async def process_batch(
+    messages: List[IncomingMessage],
+    concurrency: Optional[int] = Query(None, ge=1, le=64, description="Max pipelines in flight"),
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
+):
+    """
+    Backfill: process a list of messages through the pipeline.
+    1. Insert all messages (one statement per INSERT_CHUNK_ROWS)
+    2. Fan out to AIPipeline with bounded concurrency (own DB session per run)
+    3. Stream results as NDJSON in completion order, then a summary line
+    """
+    if not messages:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(messages) > settings.batch_max_size:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {settings.batch_max_size})")
+    
+    limit = concurrency or settings.batch_concurrency
+    
+    try:
+        message_ids = await insert_messages(db, messages)
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Error inserting batch: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    logger.info(f"📦 Batch of {len(messages)} messages saved, processing with concurrency={limit}")
+    
+    return StreamingResponse(
+        _stream_batch(pipeline, messages, message_ids, limit),
+        media_type="application/x-ndjson"
+    )
+
+async def _stream_batch(pipeline: AIPipeline, messages: List[IncomingMessage], message_ids: List[int], limit: int):
+    semaphore = asyncio.Semaphore(limit)
+    start = time.perf_counter()
+    
+    async def run(index: int) -> dict:
+        message_id = message_ids[index]
+        async with semaphore:
+            try:
+                async with AsyncSessionLocal() as session:
+                    try:
+                        processed = await pipeline.process(messages[index].content, message_id, session)
+                    except PipelineStageError as e:
+                        await record_failure(session, e)
+                        raise
+                return {"index": index, "message_id": message_id, "status": "ok", "result": processed.dict()}
+            except Exception as e:
+                logger.error(f"❌ Batch item {index} (message {message_id}) failed: {str(e)}")
+                return {"index": index, "message_id": message_id, "status": "error", "error": str(e)}
+    
+    tasks = [asyncio.create_task(run(i)) for i in range(len(messages))]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            succeeded += item["status"] == "ok"
+            yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+    finally:
+        # Client disconnected: stop the remaining pipelines
+        for task in tasks:
+            task.cancel()
+    
+    yield json.dumps({
+        "done": True,
+        "total": len(messages),
+        "succeeded": succeeded,
+        "failed": len(messages) - succeeded,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }) + "\n"
+
+@router.post("/process-stream")
+async def process_message_stream(
+    message: IncomingMessage,
+    db: AsyncSession = Depends(get_db),
+    pipeline: AIPipeline = Depends(get_pipeline)
+):
+    """
+    Pipeline IA en Server-Sent Events pour la console HITL:
+    message → classification → rag → token* (reply_text streamé par Sonnet)
+    → draft → verification → done (ProcessedMessage) | error
+    """
+    try:
+        message_id = (await insert_messages(db, [message]))[0]
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Error saving message: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    logger.info(f"📡 Streaming pipeline for message {message_id}")
+    
+    return StreamingResponse(
+        _stream_pipeline(pipeline, message, message_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+async def _stream_pipeline(pipeline: AIPipeline, message: IncomingMessage, message_id: int):
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def emit(event: str, data: dict):
+        await events.put((event, data))
+    
+    async def run():
+        try:
+            # Own session: the request-scoped one is released before streaming starts
+            async with AsyncSessionLocal() as session:
+                try:
+                    processed = await pipeline.process(message.content, message_id, session, emit=emit)
+                except PipelineStageError as e:
+                    await record_failure(session, e)
+                    raise
+            await events.put(("done", processed.dict()))
+        except Exception as e:
+            logger.error(f"❌ Error streaming message {message_id}: {str(e)}")
+            await events.put(("error", {"detail": str(e)}))
+        finally:
+            await events.put(None)
+    
+    task = asyncio.create_task(run())
+    try:
+        yield _sse("message", {"message_id": message_id})
+        while (item := await events.get()) is not None:
+            yield _sse(*item)
+    finally:
+        # Client disconnected: stop the pipeline
+        if not task.done():
+            task.cancel()
+
 @router.post("/approve")
 async def approve_draft(
     approval: ApprovalAction,
@@ -0,0 +1,171 @@
+"""
+Écriture bufferisée des logs d'audit pipeline (table logs)
+Le chemin requête ne fait qu'un append en mémoire; une tâche de fond
+flush par INSERT multi-lignes (taille de batch ou intervalle atteint).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from config import settings
+from db.database import AsyncSessionLocal
+from services.metrics import AUDIT_LOG_ROWS, AUDIT_LOG_FLUSH_SECONDS, AUDIT_LOG_PENDING
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("message_id", "draft_id", "log_type", "input_data", "output_data", "model_used", "created_at")
+
+
+def audit_record(
+    message_id: int,
+    log_type: str,
+    input_data: dict,
+    output_data: dict,
+    model_used: str,
+    draft_id: int = None
+) -> dict:
+    """Row for the logs table (timestamped at append time, not at flush time)"""
+    return {
+        "message_id": message_id,
+        "draft_id": draft_id,
+        "log_type": log_type,
+        "input_data": json.dumps(input_data),
+        "output_data": json.dumps(output_data),
+        "model_used": model_used,
+        "created_at": datetime.utcnow()
+    }
+
+
+async def insert_audit_records(db, records: List[dict]):
+    """Single multi-row INSERT for a batch of audit records (no commit)"""
+    values = []
+    params = {}
+    for i, record in enumerate(records):
+        values.append("(" + ", ".join(f":{column}_{i}" for column in COLUMNS) + ")")
+        params.update({f"{column}_{i}": record[column] for column in COLUMNS})
+
+    await db.execute(
+        text(f"""
+            INSERT INTO logs ({", ".join(COLUMNS)})
+            VALUES {", ".join(values)}
+        """),
+        params
+    )
+
+
+class AuditLogWriter:
+    """
+    Bounded in-memory buffer + background flusher.
+    - write(): put_nowait on the fast path; when the buffer is full the caller
+      awaits free space (backpressure instead of unbounded memory / dropped rows)
+    - flush when batch_size records are buffered or flush_interval has elapsed
+    - stop(): drains everything still buffered (lifespan shutdown)
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = None,
+        flush_interval: float = None,
+        max_buffer: int = None
+    ):
+        self.session_factory = session_factory
+        # Postgres caps bind parameters at 32767 per statement
+        self.batch_size = min(batch_size or settings.audit_log_batch_size, 32767 // len(COLUMNS))
+        self.flush_interval = flush_interval or settings.audit_log_flush_interval_seconds
+        self._buffer: asyncio.Queue = asyncio.Queue(maxsize=max_buffer or settings.audit_log_max_buffer)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return self._buffer.qsize()
+
+    async def write(self, record: dict):
+        try:
+            self._buffer.put_nowait(record)
+        except asyncio.QueueFull:
+            AUDIT_LOG_ROWS.labels("backpressure").inc()
+            await self._buffer.put(record)
+
+    async def start(self):
+        self._stopping = False
+        AUDIT_LOG_PENDING.set_function(lambda: self.pending)
+        self._task = asyncio.create_task(self._run(), name="audit-log-flusher")
+        logger.info(f"🗒️  Audit log writer started (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def stop(self):
+        """Flush remaining records and stop the background task"""
+        self._stopping = True
+        if self._task:
+            await self._task
+            self._task = None
+        logger.info("🗒️  Audit log writer stopped (buffer flushed)")
+
+    async def _run(self):
+        while not (self._stopping and self._buffer.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> List[dict]:
+        """Wait for the first record, then gather until batch_size or flush_interval"""
+        batch = []
+        try:
+            batch.append(await asyncio.wait_for(self._buffer.get(), self.flush_interval))
+        except asyncio.TimeoutError:
+            return batch
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not self._buffer.empty():
+                batch.append(self._buffer.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._buffer.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: List[dict]):
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            start = time.perf_counter()
+            try:
+                async with self.session_factory() as db:
+                    await insert_audit_records(db, batch)
+                    await db.commit()
+                AUDIT_LOG_FLUSH_SECONDS.observe(time.perf_counter() - start)
+                AUDIT_LOG_ROWS.labels("flushed").inc(len(batch))
+                logger.debug(f"🗒️  Flushed {len(batch)} audit rows")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️  Audit log flush failed ({attempt}/{self.MAX_ATTEMPTS}, {len(batch)} rows): {e}")
+                if attempt < self.MAX_ATTEMPTS:
+                    await asyncio.sleep(0.5 * attempt)
+
+        AUDIT_LOG_ROWS.labels("dropped").inc(len(batch))
+        logger.error(f"❌ Dropped {len(batch)} audit rows after {self.MAX_ATTEMPTS} attempts")
+
+
+# Process-wide writer, set by the lifespan hook when AUDIT_LOG_MODE=buffered
+_audit_log_writer: Optional[AuditLogWriter] = None
+
+
+def set_audit_log_writer(writer: Optional[AuditLogWriter]):
+    global _audit_log_writer
+    _audit_log_writer = writer
+
+
+def get_audit_log_writer() -> Optional[AuditLogWriter]:
+    return _audit_log_writer
@@ -0,0 +1,79 @@
+"""
+Découpage des knowledge_docs en fenêtres chevauchantes bornées en tokens
+Les phrases sont regroupées jusqu'à max_tokens; chaque fenêtre reprend les dernières phrases
+de la précédente (jusqu'à overlap_tokens) pour qu'une information à cheval ne soit pas coupée.
+"""
+
+import math
+import re
+from typing import Callable, List, Optional
+
+TokenCounter = Callable[[str], int]
+
+# Sentence ends, bullet / numbered list items ("1) ", "- ") and line breaks
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?;])\s+|\n+|\s+(?=\d+\)\s)|\s+(?=[-•]\s)")
+WORD_RE = re.compile(r"\S+")
+
+
+def approx_token_count(text: str) -> int:
+    """~4/3 tokens per word for a multilingual subword tokenizer (French, English)"""
+    return math.ceil(len(WORD_RE.findall(text)) * 4 / 3)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [part.strip() for part in SENTENCE_SPLIT_RE.split(text) if part and part.strip()]
+
+
+def _split_long(sentence: str, max_tokens: int, count_tokens: TokenCounter) -> List[str]:
+    """A sentence longer than a window is cut on word boundaries"""
+    pieces, words = [], []
+    for word in WORD_RE.findall(sentence):
+        if words and count_tokens(" ".join(words + [word])) > max_tokens:
+            pieces.append(" ".join(words))
+            words = []
+        words.append(word)
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = 200,
+    overlap_tokens: int = 40,
+    count_tokens: Optional[TokenCounter] = None
+) -> List[str]:
+    """Overlapping windows of whole sentences, each at most max_tokens; short texts stay one chunk"""
+    count_tokens = count_tokens or approx_token_count
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    units = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            units.extend((piece, count_tokens(piece)) for piece in _split_long(sentence, max_tokens, count_tokens))
+        else:
+            units.append((sentence, tokens))
+
+    chunks: List[str] = []
+    window: List[tuple] = []
+    size = 0
+    fresh = 0  # units added since the last emitted chunk
+    for unit in units:
+        if window and size + unit[1] > max_tokens:
+            chunks.append(" ".join(sentence for sentence, _ in window))
+            # Carry the tail of the window over, within overlap_tokens and leaving room for this unit
+            carried, carried_size = [], 0
+            for sentence, tokens in reversed(window):
+                if carried_size + tokens > overlap_tokens or carried_size + tokens + unit[1] > max_tokens:
+                    break
+                carried.insert(0, (sentence, tokens))
+                carried_size += tokens
+            window, size, fresh = carried, carried_size, 0
+        window.append(unit)
+        size += unit[1]
+        fresh += 1
+    if fresh:
+        chunks.append(" ".join(sentence for sentence, _ in window))
+    return chunks
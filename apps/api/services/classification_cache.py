@@ -0,0 +1,161 @@
+"""
+Cache des classifications (Haiku) - clé = texte normalisé + contexte + version taxonomie
+Les sections commentaires répètent les mêmes textes ("prix ?", "dispo où ?", "😍😍"):
+LRU/TTL en mémoire, optionnellement partagé via Redis. Invalidé quand
+intents.yaml ou risk.yaml changent.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import settings, get_taxonomy_version, refresh_taxonomy_config
+from models.schemas import ClassificationOutput
+from services.cache import TTLCache
+from services.keyword_classifier import normalize_keyword_text
+from services.metrics import CACHE_LOOKUPS
+from services.verification_policy import EMOJI_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Skin tones, zero-width joiner, variation selectors: "👍🏽" folds to "👍"
+EMOJI_MODIFIERS = re.compile("[\U0001F3FB-\U0001F3FF\u200d\ufe0e\ufe0f]")
+REPEATED_PUNCTUATION = re.compile(r"([!?.,])\1+")
+SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([!?.,])")
+
+
+def normalize_cache_text(text: str) -> str:
+    """Case, accents, whitespace, emoji and punctuation runs folded: "Prix ???" == "prix?" """
+    text = EMOJI_MODIFIERS.sub("", normalize_keyword_text(text))
+    # Repeated emoji ("🔥🔥🔥" -> "🔥"), keeping which emoji it was
+    text = re.sub(r"(%s)(\s*\1)+" % EMOJI_PATTERN.pattern, r"\1", text)
+    text = REPEATED_PUNCTUATION.sub(r"\1", text)
+    return SPACE_BEFORE_PUNCTUATION.sub(r"\1", text).strip()
+
+
+def classification_cache_key(message: str, context: dict = None) -> str:
+    """Context is part of the classifier prompt, so it is part of the key"""
+    raw = normalize_cache_text(message) + "\x1f" + json.dumps(context or {}, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{get_taxonomy_version()}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+class ClassificationCache:
+    """
+    Memory LRU (L1) + optional Redis (L2, shared between API replicas / workers).
+    Redis errors degrade to memory-only; they never fail a classification.
+    """
+
+    REDIS_PREFIX = "influence:classification"
+
+    def __init__(self):
+        self.memory = TTLCache(settings.classification_cache_max_entries, settings.classification_cache_ttl_seconds)
+        self.redis = None
+        self._redis_ready = settings.classification_cache_backend == "redis"
+        self._lock = threading.Lock()
+        self._last_config_check = time.monotonic()
+        self.hits_redis = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    def _check_config(self):
+        """Cheap stat() of intents.yaml / risk.yaml at most every config_reload_check_seconds"""
+        now = time.monotonic()
+        if now - self._last_config_check < settings.config_reload_check_seconds:
+            return
+        self._last_config_check = now
+        if refresh_taxonomy_config():
+            self.memory.clear()
+            with self._lock:
+                self.invalidations += 1
+            logger.info(f"♻️  intents.yaml / risk.yaml changed: classification cache invalidated (version {get_taxonomy_version()})")
+
+    async def _get_redis(self):
+        if self.redis is None and self._redis_ready:
+            try:
+                import redis.asyncio as aioredis
+
+                self.redis = aioredis.from_url(settings.redis_url, decode_responses=True)
+                await self.redis.ping()
+            except Exception as e:
+                logger.warning(f"⚠️  Classification cache: Redis unavailable, memory only: {e}")
+                self.redis = None
+                self._redis_ready = False
+        return self.redis
+
+    async def get(self, message: str, context: dict = None) -> Optional[Tuple[ClassificationOutput, str]]:
+        self._check_config()
+        key = classification_cache_key(message, context)
+
+        cached = self.memory.get(key)
+        if cached is not None:
+            CACHE_LOOKUPS.labels("classification", "hit_memory").inc()
+            return cached
+
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(f"{self.REDIS_PREFIX}:{key}")
+            except Exception as e:
+                logger.warning(f"⚠️  Classification cache Redis get failed: {e}")
+                raw = None
+            if raw:
+                data = json.loads(raw)
+                cached = (ClassificationOutput(**data["classification"]), data["model"])
+                self.memory.set(key, cached)
+                with self._lock:
+                    self.hits_redis += 1
+                CACHE_LOOKUPS.labels("classification", "hit_redis").inc()
+                return cached
+
+        CACHE_LOOKUPS.labels("classification", "miss").inc()
+        return None
+
+    async def set(self, message: str, context: dict, classification: ClassificationOutput, model: str):
+        key = classification_cache_key(message, context)
+        self.memory.set(key, (classification, model))
+        with self._lock:
+            self.stores += 1
+
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                await redis.set(
+                    f"{self.REDIS_PREFIX}:{key}",
+                    json.dumps({"classification": json.loads(classification.json()), "model": model}),
+                    ex=settings.classification_cache_ttl_seconds
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  Classification cache Redis set failed: {e}")
+
+    def snapshot(self) -> Dict:
+        memory = self.memory.snapshot()
+        with self._lock:
+            # Memory misses include lookups then served by Redis
+            lookups = memory["hits"] + memory["misses"]
+            hits = memory["hits"] + self.hits_redis
+            return {
+                "enabled": settings.classification_cache,
+                "backend": "redis" if self.redis is not None else "memory",
+                "taxonomy_version": get_taxonomy_version(),
+                "lookups": lookups,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "hits_redis": self.hits_redis,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "memory": memory,
+            }
+
+
+_classification_cache: Optional[ClassificationCache] = None
+
+
+def get_classification_cache() -> ClassificationCache:
+    global _classification_cache
+    if _classification_cache is None:
+        _classification_cache = ClassificationCache()
+    return _classification_cache
@@ -4,18 +4,27 @@ Service de classification - Intent + Risk (Claude Haiku)
 
 import json
 import logging
-import anthropic
 from typing import Dict
 
 from config import settings
+from services.llm_client import get_async_client, cached_system_prompt, record_usage
 from models.schemas import ClassificationOutput
 from prompts.system_prompts import SYSTEM_CLASSIFIER
 
 logger = logging.getLogger(__name__)
 
+# Reasoning of the fallback returned when the model output cannot be parsed
+FALLBACK_REASONING_PREFIX = "Parse error"
+
+
+def is_fallback_classification(classification: ClassificationOutput) -> bool:
+    """Degraded result of a failed classification: never worth caching"""
+    return classification.reasoning.startswith(FALLBACK_REASONING_PREFIX)
+
+
 class ClassifierService:
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    def __init__(self, client=None):
+        self.client = client or get_async_client()
         self.model = settings.model_classifier
         
     async def classify(self, message: str, context: Dict = None) -> ClassificationOutput:
@@ -31,11 +40,11 @@ class ClassifierService:
                 user_prompt += f"\n\nContexte additionnel: {json.dumps(context, ensure_ascii=False)}"
             
             # Call Claude Haiku
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=500,
                 temperature=0.3,
-                system=SYSTEM_CLASSIFIER,
+                system=cached_system_prompt(SYSTEM_CLASSIFIER),
                 messages=[{
                     "role": "user",
                     "content": user_prompt
@@ -43,6 +52,7 @@ class ClassifierService:
             )
             
             # Parse JSON response
+            record_usage("classify", self.model, response)
             content = response.content[0].text
             logger.debug(f"Classifier raw response: {content}")
             
@@ -71,7 +81,7 @@ class ClassifierService:
                 risk_flags=[],
                 risk_level="medium",
                 should_escalate=True,
-                reasoning=f"Parse error: {str(e)}"
+                reasoning=f"{FALLBACK_REASONING_PREFIX}: {str(e)}"
             )
             
         except Exception as e:
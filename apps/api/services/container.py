@@ -0,0 +1,99 @@
+"""
+Registre de services - une instance par process (worker uvicorn)
+Créé dans le lifespan, stocké sur app.state et injecté via Depends:
+pipeline, clients LLM, RAG, file de jobs et writer d'audit ne sont
+construits qu'une fois (et à la demande).
+"""
+
+import logging
+from typing import Optional
+
+from fastapi import Request
+
+from config import settings
+from services.pipeline import AIPipeline
+from services.rag import RAGService
+from services.llm_client import close_async_client
+from services.audit_log import AuditLogWriter, set_audit_log_writer
+from services.job_queue import create_job_queue, set_job_queue, JobWorkerPool, pipeline_job_handler
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    def __init__(self):
+        self._pipeline: Optional[AIPipeline] = None
+        self._rag: Optional[RAGService] = None
+        self.audit_log_writer: Optional[AuditLogWriter] = None
+        self.job_workers: Optional[JobWorkerPool] = None
+
+    @property
+    def rag(self) -> RAGService:
+        if self._rag is None:
+            self._rag = RAGService()
+        return self._rag
+
+    @property
+    def pipeline(self) -> AIPipeline:
+        if self._pipeline is None:
+            self._pipeline = self._build_pipeline()
+        return self._pipeline
+
+    def _build_pipeline(self) -> AIPipeline:
+        # Real Claude services if an API key is set, otherwise mocks
+        if settings.anthropic_api_key:
+            logger.info("✅ Using REAL Claude AI services")
+            from services.classifier import ClassifierService
+            from services.drafter import DrafterService
+            from services.verifier import VerifierService
+            return AIPipeline(ClassifierService(), self.rag, DrafterService(), VerifierService())
+
+        logger.info("⚠️  Using MOCK AI services (no ANTHROPIC_API_KEY set)")
+        from services.mock_ai import MockClassifierService, MockDrafterService, MockVerifierService
+        return AIPipeline(MockClassifierService(), self.rag, MockDrafterService(), MockVerifierService())
+
+    async def start(self):
+        """Background components (audit log writer, pipeline workers) and the pgvector index"""
+        if settings.rag_index_backend == "pgvector" and self.rag.enabled:
+            from db.database import AsyncSessionLocal
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.rag.ensure_pg_index(db)
+            except Exception as e:
+                logger.warning(f"⚠️  pgvector index not ready, retrieval falls back to a sequential scan: {e}")
+
+        if settings.audit_log_mode == "buffered":
+            self.audit_log_writer = AuditLogWriter()
+            await self.audit_log_writer.start()
+            set_audit_log_writer(self.audit_log_writer)
+
+        if settings.processing_mode == "queue":
+            job_queue = await create_job_queue()
+            set_job_queue(job_queue)
+            self.job_workers = JobWorkerPool(job_queue, pipeline_job_handler(self.pipeline), settings.job_workers)
+            await self.job_workers.start()
+
+    async def close(self):
+        if self.job_workers:
+            await self.job_workers.stop()
+            await self.job_workers.queue.close()
+            set_job_queue(None)
+            self.job_workers = None
+        if self.audit_log_writer:
+            # After the workers: their last audit rows are flushed too
+            set_audit_log_writer(None)
+            await self.audit_log_writer.stop()
+            self.audit_log_writer = None
+        if self._rag:
+            await self._rag.close()
+        await close_async_client()
+
+
+def get_container(request: Request) -> ServiceContainer:
+    return request.app.state.container
+
+
+def get_pipeline(request: Request) -> AIPipeline:
+    """FastAPI dependency: the process-wide pipeline"""
+    return request.app.state.container.pipeline
@@ -0,0 +1,185 @@
+"""
+Cache sémantique des drafts (intents FAQ: livraison, retours, disponibilité...)
+Embedding du message → drafts déjà vérifiés PASS du même intent et de la même langue
+au-dessus d'un seuil de similarité → réutilisation sans appel Sonnet. Les entrées sont liées
+à la version du corpus RAG: toute modification des knowledge docs les invalide.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings, get_draft_cache_intents
+from models.schemas import ClassificationOutput, DraftOutput, VerificationOutput, VerdictEnum, RiskLevel
+from services.metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DraftCacheEntry:
+    message: str
+    draft: DraftOutput
+    verification: VerificationOutput
+    created_at: float
+
+
+@dataclass
+class DraftCacheLookup:
+    """Result of a lookup; keeps the query embedding so a miss can be stored without re-embedding"""
+    intent: str
+    language: str
+    embedding: Optional[np.ndarray]
+    corpus_version: str
+    entry: Optional[DraftCacheEntry] = None
+    similarity: float = 0.0
+
+
+def draft_cache_eligible(classification: ClassificationOutput, context: dict = None) -> bool:
+    """FAQ intent, no risk flag, and no per-conversation context the draft could depend on"""
+    return (
+        settings.draft_cache
+        and classification.intent.value in get_draft_cache_intents()
+        and classification.risk_level == RiskLevel.LOW
+        and not classification.risk_flags
+        and not context
+    )
+
+
+class _IntentBucket:
+    """Normalized embeddings of one (intent, language) as a float32 matrix (one matvec per lookup)"""
+
+    def __init__(self):
+        self.matrix: Optional[np.ndarray] = None
+        self.entries: List[DraftCacheEntry] = []
+
+    def add(self, embedding: np.ndarray, entry: DraftCacheEntry, max_entries: int):
+        row = embedding[np.newaxis, :]
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+        self.entries.append(entry)
+        if len(self.entries) > max_entries:
+            # Oldest first
+            self.matrix = self.matrix[-max_entries:]
+            self.entries = self.entries[-max_entries:]
+
+    def best(self, embedding: np.ndarray, min_created_at: float):
+        if self.matrix is None:
+            return None, 0.0
+        scores = self.matrix @ embedding
+        for index in np.argsort(-scores):
+            if self.entries[index].created_at >= min_created_at:
+                return self.entries[index], float(scores[index])
+        return None, 0.0
+
+
+class SemanticDraftCache:
+    EMA_ALPHA = 0.1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Keyed by (intent, language): the multilingual embedder matches a question across languages,
+        # a draft must only answer messages written in its own language
+        self._buckets: Dict[Tuple[str, str], _IntentBucket] = {}
+        self.corpus_version: Optional[str] = None
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.saved_latency_ms = 0.0
+        # Moving averages observed on misses, used to estimate savings on hits
+        self.avg_draft_ms: Optional[float] = None
+        self.avg_verify_ms: Optional[float] = None
+
+    @staticmethod
+    def normalize(embedding) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        # Mock / failed embeddings are all zeros: never match them
+        return vector / norm if norm > 0 else None
+
+    def _check_corpus(self, corpus_version: str):
+        if corpus_version != self.corpus_version:
+            if self.corpus_version is not None and self._buckets:
+                self.invalidations += 1
+                logger.info(f"♻️  Knowledge corpus changed ({self.corpus_version} → {corpus_version}): draft cache invalidated")
+            self._buckets = {}
+            self.corpus_version = corpus_version
+
+    def lookup(self, intent: str, language: str, embedding, corpus_version: str) -> DraftCacheLookup:
+        vector = self.normalize(embedding)
+        lookup = DraftCacheLookup(intent=intent, language=language, embedding=vector, corpus_version=corpus_version)
+        with self._lock:
+            self._check_corpus(corpus_version)
+            self.lookups += 1
+            bucket = self._buckets.get((intent, language))
+            if vector is not None and bucket is not None:
+                min_created_at = time.time() - settings.draft_cache_ttl_seconds
+                entry, similarity = bucket.best(vector, min_created_at)
+                lookup.similarity = similarity
+                if entry is not None and similarity >= settings.draft_cache_similarity:
+                    lookup.entry = entry
+                    self.hits += 1
+        CACHE_LOOKUPS.labels("draft", "hit_memory" if lookup.entry else "miss").inc()
+        return lookup
+
+    def store(self, lookup: DraftCacheLookup, message: str, draft: DraftOutput, verification: VerificationOutput):
+        """Only drafts verified PASS are reusable"""
+        if lookup.embedding is None or verification.verdict != VerdictEnum.PASS:
+            return
+        with self._lock:
+            if lookup.corpus_version != self.corpus_version:
+                return  # Corpus changed while this draft was being produced
+            bucket = self._buckets.setdefault((lookup.intent, lookup.language), _IntentBucket())
+            bucket.add(
+                lookup.embedding,
+                DraftCacheEntry(message=message, draft=draft, verification=verification, created_at=time.time()),
+                settings.draft_cache_max_entries_per_intent
+            )
+            self.stores += 1
+
+    def observe_miss(self, draft_ms: float, verify_ms: float):
+        with self._lock:
+            if self.avg_draft_ms is None:
+                self.avg_draft_ms, self.avg_verify_ms = draft_ms, verify_ms
+            else:
+                self.avg_draft_ms += self.EMA_ALPHA * (draft_ms - self.avg_draft_ms)
+                self.avg_verify_ms += self.EMA_ALPHA * (verify_ms - self.avg_verify_ms)
+
+    def observe_hit(self, draft_ms: float, verify_ms: float, reverified: bool):
+        """Estimated saving = usual drafter (+ verifier unless re-verified) latency minus the hit's cost"""
+        with self._lock:
+            usual = (self.avg_draft_ms or 0.0) + (0.0 if reverified else (self.avg_verify_ms or 0.0))
+            self.saved_latency_ms += max(usual - draft_ms - (0.0 if reverified else verify_ms), 0.0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": settings.draft_cache,
+                "intents": get_draft_cache_intents(),
+                "similarity_threshold": settings.draft_cache_similarity,
+                "reverify": settings.draft_cache_reverify,
+                "corpus_version": self.corpus_version,
+                "entries": {f"{intent}/{language}": len(bucket.entries) for (intent, language), bucket in self._buckets.items()},
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "saved_latency_ms": round(self.saved_latency_ms, 2),
+                "avg_draft_ms": round(self.avg_draft_ms or 0.0, 2),
+                "avg_verify_ms": round(self.avg_verify_ms or 0.0, 2),
+            }
+
+
+_draft_cache: Optional[SemanticDraftCache] = None
+
+
+def get_draft_cache() -> SemanticDraftCache:
+    global _draft_cache
+    if _draft_cache is None:
+        _draft_cache = SemanticDraftCache()
+    return _draft_cache
@@ -4,18 +4,82 @@ Service de draft - Génération réponse (Claude Sonnet)
 
 import json
 import logging
-import anthropic
-from typing import List
+import re
+from typing import Awaitable, Callable, List, Optional
 
 from config import settings
+from services.llm_client import get_async_client, cached_system_prompt, record_usage
 from models.schemas import DraftOutput, RAGExtract, ClassificationOutput
 from prompts.system_prompts import SYSTEM_DRAFTER
 
 logger = logging.getLogger(__name__)
 
-class DrafterService:
+class ReplyTextStream:
+    """
+    Incremental extractor for the "reply_text" string of a streamed JSON response:
+    feed() raw chunks, get back the newly decoded reply text.
+    """
+    
+    KEY_PATTERN = re.compile(r'"reply_text"\s*:\s*"')
+    ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+    
     def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.buffer = ""
+        self.pos = None
+        self.done = False
+    
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if self.done:
+            return ""
+        if self.pos is None:
+            match = self.KEY_PATTERN.search(self.buffer)
+            if not match:
+                return ""
+            self.pos = match.end()
+        
+        out = []
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+            if char == '"':
+                self.done = True
+                break
+            if char != "\\":
+                out.append(char)
+                self.pos += 1
+                continue
+            # Escape sequence: wait for the full sequence before decoding
+            if self.pos + 1 >= len(self.buffer):
+                break
+            code = self.buffer[self.pos + 1]
+            if code == "u":
+                if self.pos + 6 > len(self.buffer):
+                    break
+                point = int(self.buffer[self.pos + 2:self.pos + 6], 16)
+                if 0xD800 <= point <= 0xDFFF:
+                    # UTF-16 surrogate pair (emoji): "\uD83D\uDE00" is one code point, possibly split across chunks
+                    following = self.buffer[self.pos + 6:self.pos + 12]
+                    if len(following) < 6 and "\\u".startswith(following[:2]):
+                        break
+                    low = int(following[2:], 16) if following[:2] == "\\u" else None
+                    if point <= 0xDBFF and low is not None and 0xDC00 <= low <= 0xDFFF:
+                        out.append(chr(0x10000 + ((point - 0xD800) << 10) + (low - 0xDC00)))
+                        self.pos += 12
+                        continue
+                    # Lone surrogate: not encodable as UTF-8
+                    out.append("\ufffd")
+                    self.pos += 6
+                    continue
+                out.append(chr(point))
+                self.pos += 6
+            else:
+                out.append(self.ESCAPES.get(code, code))
+                self.pos += 2
+        return "".join(out)
+
+class DrafterService:
+    def __init__(self, client=None):
+        self.client = client or get_async_client()
         self.model = settings.model_drafter
         
     async def draft(
@@ -23,10 +87,13 @@ class DrafterService:
         message: str,
         classification: ClassificationOutput,
         rag_extracts: List[RAGExtract],
-        context: dict = None
+        context: dict = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> DraftOutput:
         """
         Generate draft reply avec Claude Sonnet
+        on_token: si fourni, la réponse est streamée et chaque fragment de
+        reply_text est transmis dès réception (SSE)
         """
         try:
             # Construct user prompt
@@ -54,19 +121,25 @@ Langue: {classification.language}
             user_prompt += "\n\nGénère la réponse au format JSON strict comme spécifié."
             
             # Call Claude Sonnet
-            response = self.client.messages.create(
+            request = dict(
                 model=self.model,
                 max_tokens=800,
                 temperature=0.8,
-                system=SYSTEM_DRAFTER,
+                system=cached_system_prompt(SYSTEM_DRAFTER),
                 messages=[{
                     "role": "user",
                     "content": user_prompt
                 }]
             )
             
+            if on_token:
+                content = await self._stream_completion(request, on_token)
+            else:
+                response = await self.client.messages.create(**request)
+                record_usage("draft", self.model, response)
+                content = response.content[0].text
+            
             # Parse JSON
-            content = response.content[0].text
             logger.debug(f"Drafter raw response: {content[:200]}...")
             
             # Extract JSON
@@ -96,3 +169,19 @@ Langue: {classification.language}
         except Exception as e:
             logger.error(f"❌ Drafter error: {str(e)}")
             raise
+    
+    async def _stream_completion(
+        self,
+        request: dict,
+        on_token: Callable[[str], Awaitable[None]]
+    ) -> str:
+        """Stream the completion, forwarding reply_text fragments to on_token"""
+        reply_stream = ReplyTextStream()
+        async with self.client.messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                fragment = reply_stream.feed(text)
+                if fragment:
+                    await on_token(fragment)
+            message = await stream.get_final_message()
+        record_usage("draft", self.model, message)
+        return message.content[0].text
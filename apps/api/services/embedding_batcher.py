@@ -0,0 +1,120 @@
+"""
+Micro-batching des embeddings de requêtes
+Les appels concurrents à embed() sont regroupés: le premier ouvre une fenêtre de max_wait,
+jusqu'à max_batch textes sont encodés en un seul encode() dans un thread dédié (la boucle
+asyncio n'est jamais bloquée), puis chaque appelant récupère son vecteur.
+Pendant un encode, les requêtes suivantes s'accumulent: les lots grossissent avec la charge.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from services.metrics import EMBEDDING_BATCH_SECONDS, EMBEDDING_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    encode_batch(texts) -> (len(texts), dim) matrix, called from one worker thread at a time.
+    The collector task starts on the first embed() (or start()) and is stopped by stop().
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], np.ndarray], max_batch: int = 32, max_wait: float = 0.005):
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.batches = 0
+        self.texts = 0
+        self.encode_seconds = 0.0
+
+    async def embed(self, text: str) -> np.ndarray:
+        if self._task is None or self._task.done():
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedder")
+        self._task = asyncio.create_task(self._run(), name="embedding-batcher")
+        logger.info(f"🧮 Embedding batcher started (max_batch={self.max_batch}, max_wait={self.max_wait * 1000:.0f}ms)")
+
+    async def stop(self):
+        """Encode what is still queued, then stop the collector and the worker thread"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._executor, self.encode_batch, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - start
+            EMBEDDING_BATCH_SECONDS.observe(elapsed)
+            EMBEDDING_BATCH_SIZE.observe(len(batch))
+            self.batches += 1
+            self.texts += len(batch)
+            self.encode_seconds += elapsed
+            for (_, future), vector in zip(batch, vectors):
+                # The caller may have been cancelled (client gone) while its text was encoded
+                if not future.done():
+                    future.set_result(vector)
+
+    async def _collect(self) -> Tuple[List[tuple], bool]:
+        """Wait for the first text, then gather until max_batch or max_wait; (batch, stop requested)"""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            if self._queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def snapshot(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "avg_encode_ms": round(self.encode_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,442 @@
+"""
+File de jobs durable pour le pipeline IA (Redis, ou in-process si JOB_QUEUE_BACKEND=memory)
+Les routes enregistrent le message, enqueue un job et répondent 202;
+un pool de workers async exécute AIPipeline.process.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+from db.database import AsyncSessionLocal
+from models.schemas import JobInfo, JobStatus
+from services.unit_of_work import PipelineStageError, record_failure
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = {JobStatus.DONE.value, JobStatus.FAILED.value}
+
+# Finished jobs kept by the in-process queue beyond which the oldest are dropped (on top of the TTL)
+MEMORY_MAX_FINISHED_JOBS = 10000
+# A job in processing without started_at is being claimed (between BLMOVE and the worker's HSET)
+CLAIM_GRACE_SECONDS = 30
+
+
+def _new_job(kind: str, payload: dict) -> dict:
+    now = time.time()
+    return {
+        "job_id": uuid.uuid4().hex,
+        "kind": kind,
+        "status": JobStatus.QUEUED.value,
+        "message_id": payload.get("message_id"),
+        "payload": payload,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def to_job_info(job: dict) -> JobInfo:
+    return JobInfo(**{k: v for k, v in job.items() if k != "payload"})
+
+
+class InMemoryJobQueue:
+    """
+    In-process queue (tests / single worker). Jobs are lost on restart.
+    Finished jobs are forgotten after job_result_ttl_seconds (like the Redis hash expiry)
+    or beyond MEMORY_MAX_FINISHED_JOBS, oldest first.
+    """
+
+    backend = "memory"
+
+    def __init__(self):
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._jobs: Dict[str, dict] = {}
+        self._done_events: Dict[str, asyncio.Event] = {}
+        # job_id -> finish time, oldest first
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+
+    async def connect(self):
+        return self
+
+    async def close(self):
+        pass
+
+    async def enqueue(self, kind: str, payload: dict) -> dict:
+        self._evict_finished()
+        job = _new_job(kind, payload)
+        self._jobs[job["job_id"]] = job
+        self._done_events[job["job_id"]] = asyncio.Event()
+        await self._pending.put(job["job_id"])
+        return job
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[dict]:
+        try:
+            job_id = await asyncio.wait_for(self._pending.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        job = self._jobs[job_id]
+        job["status"] = JobStatus.RUNNING.value
+        job["updated_at"] = time.time()
+        return job
+
+    async def complete(self, job_id: str, result: dict):
+        self._finish(job_id, JobStatus.DONE, result=result)
+
+    async def fail(self, job_id: str, error: str):
+        self._finish(job_id, JobStatus.FAILED, error=error)
+
+    def _finish(self, job_id: str, status: JobStatus, result: dict = None, error: str = None):
+        job = self._jobs[job_id]
+        job.update(status=status.value, result=result, error=error, updated_at=time.time())
+        self._done_events[job_id].set()
+        self._finished[job_id] = job["updated_at"]
+        self._evict_finished()
+
+    def _evict_finished(self):
+        cutoff = time.time() - settings.job_result_ttl_seconds
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at >= cutoff and len(self._finished) <= MEMORY_MAX_FINISHED_JOBS:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+            self._done_events.pop(job_id, None)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(self._done_events[job_id].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._jobs.get(job_id)
+
+    async def requeue_stale(self) -> int:
+        return 0
+
+
+class RedisJobQueue:
+    """
+    Durable queue on Redis (settings.redis_url).
+    - pending list -> BLMOVE -> processing list (reliable queue pattern)
+    - one hash per job with status/result, expiring after job_result_ttl_seconds
+    - completion published on a per-job channel for subscribers
+    Jobs stuck in processing longer than job_visibility_timeout_seconds
+    (worker crash) are moved back to pending by requeue_stale(); a job not yet
+    marked started gets CLAIM_GRACE_SECONDS for its worker to do so.
+    """
+
+    backend = "redis"
+
+    def __init__(self, redis_url: str, prefix: str = "influence:jobs"):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+        self.redis = None
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _channel(self, job_id: str) -> str:
+        return f"{self.prefix}:done:{job_id}"
+
+    async def connect(self):
+        import redis.asyncio as aioredis
+
+        self.redis = aioredis.from_url(self.redis_url, decode_responses=True)
+        await self.redis.ping()
+        return self
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.close()
+
+    @staticmethod
+    def _encode(job: dict) -> dict:
+        return {
+            k: json.dumps(v) if k in ("payload", "result") else ("" if v is None else v)
+            for k, v in job.items()
+        }
+
+    @staticmethod
+    def _decode(raw: dict) -> Optional[dict]:
+        if not raw:
+            return None
+        job = dict(raw)
+        for k in ("payload", "result"):
+            job[k] = json.loads(job[k]) if job.get(k) else None
+        for k in ("created_at", "updated_at", "started_at"):
+            if job.get(k):
+                job[k] = float(job[k])
+        job["message_id"] = int(job["message_id"]) if job.get("message_id") else None
+        job["error"] = job.get("error") or None
+        job.pop("started_at", None)
+        job.pop("unclaimed_since", None)
+        return job
+
+    async def enqueue(self, kind: str, payload: dict) -> dict:
+        job = _new_job(kind, payload)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job["job_id"]), mapping=self._encode(job))
+            pipe.lpush(self.pending_key, job["job_id"])
+            await pipe.execute()
+        return job
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[dict]:
+        job_id = await self.redis.blmove(
+            self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        if job_id is None:
+            return None
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job_id), mapping={
+                "status": JobStatus.RUNNING.value,
+                "started_at": now,
+                "updated_at": now,
+            })
+            pipe.hdel(self._job_key(job_id), "unclaimed_since")
+            await pipe.execute()
+        return await self.get(job_id)
+
+    async def complete(self, job_id: str, result: dict):
+        await self._finish(job_id, {"status": JobStatus.DONE.value, "result": json.dumps(result)})
+
+    async def fail(self, job_id: str, error: str):
+        await self._finish(job_id, {"status": JobStatus.FAILED.value, "error": error})
+
+    async def _finish(self, job_id: str, fields: dict):
+        fields["updated_at"] = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job_id), mapping=fields)
+            pipe.expire(self._job_key(job_id), settings.job_result_ttl_seconds)
+            pipe.lrem(self.processing_key, 0, job_id)
+            pipe.publish(self._channel(job_id), fields["status"])
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return self._decode(await self.redis.hgetall(self._job_key(job_id)))
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        job = await self.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES or timeout <= 0:
+            return job
+
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self._channel(job_id))
+            # Re-check after subscribing: the job may have finished in between
+            job = await self.get(job_id)
+            deadline = time.monotonic() + timeout
+            while job and job["status"] not in FINAL_STATUSES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None:
+                    job = await self.get(job_id)
+            return job
+        finally:
+            await pubsub.unsubscribe(self._channel(job_id))
+            await pubsub.close()
+
+    async def requeue_stale(self) -> int:
+        """Move jobs whose worker died (processing > visibility timeout) back to pending"""
+        requeued = 0
+        now = time.time()
+        cutoff = now - settings.job_visibility_timeout_seconds
+        for job_id in await self.redis.lrange(self.processing_key, 0, -1):
+            key = self._job_key(job_id)
+            started_at = await self.redis.hget(key, "started_at")
+            if started_at:
+                if float(started_at) > cutoff:
+                    continue
+            else:
+                # Just moved by BLMOVE, started_at not written yet: only a claim abandoned
+                # for CLAIM_GRACE_SECONDS (worker died in between) is requeued
+                await self.redis.hsetnx(key, "unclaimed_since", now)
+                unclaimed_since = await self.redis.hget(key, "unclaimed_since")
+                if await self.redis.hget(key, "started_at") or float(unclaimed_since) > now - CLAIM_GRACE_SECONDS:
+                    continue
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.lrem(self.processing_key, 1, job_id)
+                pipe.rpush(self.pending_key, job_id)
+                pipe.hset(key, "status", JobStatus.QUEUED.value)
+                # The next claim starts without started_at, under the same grace period
+                pipe.hdel(key, "started_at", "unclaimed_since")
+                await pipe.execute()
+            requeued += 1
+        if requeued:
+            logger.warning(f"♻️  Requeued {requeued} stale jobs")
+        return requeued
+
+
+async def create_job_queue():
+    """
+    Build the configured queue. The in-process queue is only used when JOB_QUEUE_BACKEND=memory:
+    an unreachable Redis fails startup rather than silently keeping jobs in one process
+    (lost on restart, unknown to the other workers polling GET /jobs/{id}).
+    """
+    if settings.job_queue_backend == "memory":
+        logger.info("📥 Job queue: in-process (JOB_QUEUE_BACKEND=memory)")
+        return await InMemoryJobQueue().connect()
+    if settings.job_queue_backend != "redis":
+        raise ValueError(f"Unknown JOB_QUEUE_BACKEND '{settings.job_queue_backend}' (expected 'redis' or 'memory')")
+    try:
+        queue = await RedisJobQueue(settings.redis_url).connect()
+    except Exception as e:
+        logger.error(f"❌ Redis job queue unavailable ({settings.redis_url}): {e}")
+        raise RuntimeError(f"Job queue backend 'redis' unreachable at {settings.redis_url}") from e
+    logger.info(f"✅ Job queue connected to Redis ({settings.redis_url})")
+    return queue
+
+
+class JobWorkerPool:
+    """Pool of asyncio workers pulling jobs and running a handler"""
+
+    def __init__(
+        self,
+        queue,
+        handler: Callable[[dict], Awaitable[dict]],
+        concurrency: int = 4
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self):
+        await self.queue.requeue_stale()
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        if self.queue.backend == "redis":
+            self._tasks.append(asyncio.create_task(self._reaper(), name="job-reaper"))
+        logger.info(f"👷 Started {self.concurrency} pipeline workers ({self.queue.backend} queue)")
+
+    async def stop(self, grace_seconds: float = 30.0):
+        """Let in-flight jobs finish (up to grace_seconds), then cancel workers"""
+        self._stopping = True
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(self._tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("👷 Pipeline workers stopped")
+
+    async def _worker(self, worker_id: int):
+        while not self._stopping:
+            try:
+                job = await self.queue.dequeue(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Worker {worker_id} dequeue error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if job is None:
+                continue
+
+            logger.info(f"👷 Worker {worker_id} running job {job['job_id']} ({job['kind']})")
+            try:
+                result = await self.handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job {job['job_id']} failed: {e}", exc_info=True)
+                await self._settle(worker_id, self.queue.fail, job["job_id"], str(e))
+                continue
+            await self._settle(worker_id, self.queue.complete, job["job_id"], result)
+
+    @staticmethod
+    async def _settle(worker_id: int, settle: Callable[[str, object], Awaitable[None]], job_id: str, outcome):
+        """complete / fail: a queue outage must not kill the worker (the reaper re-delivers the job)"""
+        try:
+            await settle(job_id, outcome)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Worker {worker_id} could not record the outcome of job {job_id}: {e}")
+            await asyncio.sleep(1.0)
+
+    async def _reaper(self):
+        interval = max(settings.job_visibility_timeout_seconds / 2, 5)
+        while not self._stopping:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.requeue_stale()
+            except Exception as e:
+                logger.warning(f"⚠️  Job reaper error: {e}")
+
+
+def pipeline_job_handler(pipeline) -> Callable[[dict], Awaitable[dict]]:
+    """Handler running AIPipeline.process for message/comment/instagram jobs"""
+
+    async def handle(job: dict) -> dict:
+        payload = job["payload"]
+        async with AsyncSessionLocal() as db:
+            try:
+                processed = await pipeline.process(
+                    payload["content"],
+                    payload["message_id"],
+                    db,
+                    payload.get("context")
+                )
+            except PipelineStageError as e:
+                await record_failure(db, e)
+                raise
+            if job["kind"] == "comment":
+                await pipeline.should_convert_to_dm(
+                    processed.classification,
+                    payload["content"],
+                    payload.get("context")
+                )
+                processed.can_autopilot = False  # Comments always need manual review
+                processed.requires_hitl = True
+        return json.loads(processed.json())
+
+    return handle
+
+
+# Process-wide queue, set by the lifespan hook when PROCESSING_MODE=queue
+_job_queue = None
+
+
+def set_job_queue(queue):
+    global _job_queue
+    _job_queue = queue
+
+
+def get_job_queue():
+    return _job_queue
+
+
+def queue_enabled() -> bool:
+    return settings.processing_mode == "queue" and _job_queue is not None
+
+
+async def enqueue_pipeline_job(kind: str, message_id: int, content: str, context: dict = None) -> JobInfo:
+    job = await _job_queue.enqueue(kind, {
+        "message_id": message_id,
+        "content": content,
+        "context": context
+    })
+    logger.info(f"📬 Enqueued {kind} job {job['job_id']} for message {message_id}")
+    return to_job_info(job)
@@ -0,0 +1,253 @@
+"""
+Pré-classification par mots-clés (fast-path) - compilée depuis intents.yaml + risk.yaml
+Automate Aho-Corasick construit une fois au démarrage: un seul passage sur le message
+pour tous les mots-clés, en quelques microsecondes.
+"""
+
+import logging
+import re
+import threading
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from config import settings, get_intents, get_risk_flags, get_taxonomy_version
+from models.schemas import ClassificationOutput, IntentEnum, RiskLevel
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_TO_RISK_LEVEL = {
+    "low": RiskLevel.LOW,
+    "medium": RiskLevel.MEDIUM,
+    "high": RiskLevel.HIGH,
+    "critical": RiskLevel.CRITICAL,
+}
+RISK_ORDER = [RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL]
+
+SHORT_MESSAGE_WORDS = 8
+
+# Model name recorded for fast-path classifications ("cache:keyword-fastpath" when served from the cache)
+FASTPATH_MODEL = "keyword-fastpath"
+
+
+def is_fastpath_model(model: str) -> bool:
+    """
+    Classification produced by keywords only: its language is settings.default_language and its
+    risk is LOW unless a risk keyword matched, no model assessed either (never autopilot)
+    """
+    return model.removeprefix("cache:") == FASTPATH_MODEL
+
+
+def normalize_keyword_text(text: str) -> str:
+    """Lowercase, strip accents, unify apostrophes and whitespace"""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace("’", "'").replace("`", "'")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class AhoCorasick:
+    """Multi-pattern matcher; patterns must already be normalized"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pattern_id)
+
+        # BFS to compute failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, pattern_id) for every occurrence in text"""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_id in self._out[state]:
+                yield i - len(self.patterns[pattern_id]) + 1, pattern_id
+
+    def find_words(self, text: str) -> Iterator[int]:
+        """Pattern ids matched on word boundaries ("con" must not match "conseille")"""
+        for start, pattern_id in self.iter_matches(text):
+            end = start + len(self.patterns[pattern_id])
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            yield pattern_id
+
+
+@dataclass
+class KeywordMatch:
+    classification: ClassificationOutput
+    confidence: float
+    confident: bool
+    intent_hits: Dict[str, Set[str]] = field(default_factory=dict)
+    risk_hits: Dict[str, Set[str]] = field(default_factory=dict)
+
+
+class KeywordClassifier:
+    """Provisional ClassificationOutput from intents.yaml / risk.yaml keywords"""
+
+    def __init__(self, intents: List[Dict] = None, risk_flags: List[Dict] = None):
+        self.version = get_taxonomy_version()
+        intents = get_intents() if intents is None else intents
+        risk_flags = get_risk_flags() if risk_flags is None else risk_flags
+
+        # pattern -> list of ("intent"|"risk", id)
+        targets: Dict[str, List[Tuple[str, str]]] = {}
+        for intent in intents:
+            for keyword in intent.get("keywords", []):
+                targets.setdefault(normalize_keyword_text(keyword), []).append(("intent", intent["id"]))
+        self.risk_severity = {}
+        for flag in risk_flags:
+            self.risk_severity[flag["id"]] = flag.get("severity", "medium")
+            for keyword in flag.get("keywords", []):
+                targets.setdefault(normalize_keyword_text(keyword), []).append(("risk", flag["id"]))
+
+        self.patterns = list(targets)
+        self.targets = [targets[p] for p in self.patterns]
+        self.automaton = AhoCorasick(self.patterns)
+        logger.info(f"⚡ Keyword fast-path compiled: {len(self.patterns)} keywords")
+
+    def classify(self, message: str) -> KeywordMatch:
+        text = normalize_keyword_text(message)
+        intent_hits: Dict[str, Set[str]] = {}
+        risk_hits: Dict[str, Set[str]] = {}
+        for pattern_id in self.automaton.find_words(text):
+            for kind, target_id in self.targets[pattern_id]:
+                hits = intent_hits if kind == "intent" else risk_hits
+                hits.setdefault(target_id, set()).add(self.patterns[pattern_id])
+
+        ranked = sorted(intent_hits.items(), key=lambda item: len(item[1]), reverse=True)
+        top_hits = len(ranked[0][1]) if ranked else 0
+        runner_up = len(ranked[1][1]) if len(ranked) > 1 else 0
+
+        if not top_hits:
+            intent, confidence = IntentEnum.UNKNOWN, 0.0
+        elif runner_up:
+            # Several intents matched: ambiguous, leave it to the LLM
+            intent = IntentEnum(ranked[0][0])
+            confidence = min(0.5 + 0.1 * (top_hits - runner_up), 0.7)
+        else:
+            intent = IntentEnum(ranked[0][0])
+            confidence = 0.7 + 0.1 * top_hits
+            if len(text.split()) <= SHORT_MESSAGE_WORDS:
+                confidence += 0.1
+            confidence = min(confidence, 0.95)
+        confidence = round(confidence, 2)
+
+        risk_level = RiskLevel.LOW
+        for flag_id in risk_hits:
+            level = SEVERITY_TO_RISK_LEVEL.get(self.risk_severity.get(flag_id), RiskLevel.MEDIUM)
+            if RISK_ORDER.index(level) > RISK_ORDER.index(risk_level):
+                risk_level = level
+
+        classification = ClassificationOutput(
+            intent=intent,
+            intent_confidence=confidence,
+            risk_flags=sorted(risk_hits),
+            risk_level=risk_level,
+            language=settings.default_language,
+            should_dm=False,
+            should_escalate=risk_level == RiskLevel.CRITICAL,
+            reasoning=f"Keyword fast-path: {sorted(intent_hits.get(intent.value, []))}"
+        )
+        return KeywordMatch(
+            classification=classification,
+            confidence=confidence,
+            confident=bool(top_hits) and not runner_up and confidence >= settings.fastpath_min_confidence,
+            intent_hits=intent_hits,
+            risk_hits=risk_hits
+        )
+
+
+class FastPathStats:
+    """Process-wide fast-path counters (skips + shadow agreement with the LLM)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.evaluated = 0
+        self.matched = 0
+        self.confident = 0
+        self.llm_skipped = 0
+        self.shadow_compared = 0
+        self.intent_agreed = 0
+        self.risk_agreed = 0
+        self.full_agreed = 0
+
+    def record(self, match: KeywordMatch, skipped: bool):
+        with self._lock:
+            self.evaluated += 1
+            self.matched += bool(match.intent_hits or match.risk_hits)
+            self.confident += match.confident
+            self.llm_skipped += skipped
+
+    def record_shadow(self, match: KeywordMatch, llm: ClassificationOutput):
+        """Compare a confident fast-path result with the LLM classification"""
+        if not match.confident:
+            return
+        fast = match.classification
+        intent_ok = fast.intent == llm.intent
+        risk_ok = fast.risk_level == llm.risk_level and set(fast.risk_flags) == set(llm.risk_flags)
+        with self._lock:
+            self.shadow_compared += 1
+            self.intent_agreed += intent_ok
+            self.risk_agreed += risk_ok
+            self.full_agreed += intent_ok and risk_ok
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            compared = self.shadow_compared or 1
+            return {
+                "mode": settings.classifier_fastpath,
+                "evaluated": self.evaluated,
+                "matched": self.matched,
+                "confident": self.confident,
+                "llm_skipped": self.llm_skipped,
+                "shadow_compared": self.shadow_compared,
+                "intent_agreement": round(self.intent_agreed / compared, 3),
+                "risk_agreement": round(self.risk_agreed / compared, 3),
+                "full_agreement": round(self.full_agreed / compared, 3),
+            }
+
+
+FASTPATH_STATS = FastPathStats()
+
+_keyword_classifier: Optional[KeywordClassifier] = None
+
+
+def get_keyword_classifier() -> KeywordClassifier:
+    """Process-wide compiled matcher (built at startup, rebuilt when intents.yaml / risk.yaml change)"""
+    global _keyword_classifier
+    if _keyword_classifier is None or _keyword_classifier.version != get_taxonomy_version():
+        _keyword_classifier = KeywordClassifier()
+    return _keyword_classifier
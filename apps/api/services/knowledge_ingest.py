@@ -0,0 +1,242 @@
+"""
+Ingestion incrémentale des knowledge_docs
+- clé stable par document (doc_key) + hash du contenu: les documents inchangés ne sont ni ré-encodés ni réécrits
+- encodage par lots dans un executor, pendant que le lot précédent est écrit (COPY + INSERT ... ON CONFLICT)
+- un commit par lot: une ingestion interrompue reprend là où elle s'est arrêtée
+- documents longs découpés en passages (lignes enfants parent_id / chunk_index): seuls les passages
+  sont encodés, la ligne parente garde le texte complet sans embedding
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from services.pg_vector_search import to_pgvector
+
+logger = logging.getLogger(__name__)
+
+STAGING_COLUMNS = ["doc_key", "title", "content", "doc_type", "category", "content_hash", "parent_key", "chunk_index", "embedding"]
+
+Chunker = Callable[[str], List[str]]
+
+
+def doc_key(doc: dict) -> str:
+    """Stable identity of a source document: explicit doc_key, else doc_type + title"""
+    return doc.get("doc_key") or f"{doc.get('doc_type') or 'doc'}:{doc['title']}"
+
+
+def chunk_key(key: str, index: int) -> str:
+    return f"{key}#{index}"
+
+
+def content_hash(doc: dict) -> str:
+    """Changes whenever anything that is embedded or returned to the drafter changes"""
+    payload = "\x1f".join(str(doc.get(name) or "") for name in ("title", "content", "doc_type", "category"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestStats:
+    scanned: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    embedded: int = 0
+    chunks: int = 0
+    pruned: int = 0
+    batches: int = 0
+    embed_seconds: float = 0.0
+    write_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def line(self) -> str:
+        rate = self.scanned / self.elapsed if self.elapsed else 0.0
+        embed_rate = self.embedded / self.embed_seconds if self.embed_seconds else 0.0
+        return (f"{self.scanned} scanned, {self.skipped} unchanged, {self.duplicates} duplicate keys, {self.embedded} embedded "
+                f"({self.chunks} chunks), {self.pruned} pruned | "
+                f"{rate:.0f} docs/s overall, {embed_rate:.0f} docs/s encoding, "
+                f"write {self.write_seconds:.1f}s, {self.elapsed:.1f}s total")
+
+
+def batched(docs: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def last_per_key(batch: List[dict]) -> List[dict]:
+    """
+    One doc per doc_key, the last one wins: INSERT ... ON CONFLICT cannot affect
+    the same row twice in one statement
+    """
+    return list({doc_key(doc): doc for doc in batch}.values())
+
+
+async def existing_hashes(db) -> Dict[str, Optional[str]]:
+    result = await db.execute(text("""
+        SELECT doc_key, content_hash FROM knowledge_docs WHERE doc_key IS NOT NULL AND parent_id IS NULL
+    """))
+    return dict(result.fetchall())
+
+
+def expand_rows(doc: dict, chunk: Optional[Chunker]) -> List[dict]:
+    """Rows written for one doc: itself (embedded when short), then its chunks (embedded) when long"""
+    key = doc_key(doc)
+    row = {**doc, "doc_key": key, "parent_key": None, "chunk_index": None, "embed": True}
+    chunks = chunk(doc["content"]) if chunk else [doc["content"]]
+    if len(chunks) == 1:
+        return [row]
+    row["embed"] = False
+    return [row] + [
+        {**doc, "doc_key": chunk_key(key, i), "content": passage, "content_hash": None,
+         "parent_key": key, "chunk_index": i, "embed": True}
+        for i, passage in enumerate(chunks)
+    ]
+
+
+async def upsert_docs(db, rows: List[dict], embeddings: List[Optional[np.ndarray]]):
+    """
+    COPY the batch into a temporary staging table, then INSERT ... ON CONFLICT (doc_key) for the docs
+    and for their chunks (previous chunks of these docs are deleted first):
+    a few round-trips per batch instead of one INSERT per row. No commit.
+    """
+    await db.execute(text("""
+        CREATE TEMP TABLE IF NOT EXISTS knowledge_docs_staging (
+            doc_key VARCHAR(255),
+            title VARCHAR(500),
+            content TEXT,
+            doc_type VARCHAR(50),
+            category VARCHAR(100),
+            content_hash VARCHAR(64),
+            parent_key VARCHAR(255),
+            chunk_index INTEGER,
+            embedding TEXT
+        ) ON COMMIT DELETE ROWS
+    """))
+    records = [
+        (row["doc_key"], row["title"], row["content"], row.get("doc_type"), row.get("category"), row["content_hash"],
+         row["parent_key"], row["chunk_index"], to_pgvector(embedding) if embedding is not None else None)
+        for row, embedding in zip(rows, embeddings)
+    ]
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table("knowledge_docs_staging", records=records, columns=STAGING_COLUMNS)
+    await db.execute(text("""
+        DELETE FROM knowledge_docs chunk
+        USING knowledge_docs doc, knowledge_docs_staging staged
+        WHERE staged.parent_key IS NULL AND doc.doc_key = staged.doc_key AND chunk.parent_id = doc.id
+    """))
+    await db.execute(text("""
+        INSERT INTO knowledge_docs (doc_key, title, content, doc_type, category, content_hash, embedding, created_at, updated_at)
+        SELECT doc_key, title, content, doc_type, category, content_hash, CAST(embedding AS vector), NOW(), NOW()
+        FROM knowledge_docs_staging
+        WHERE parent_key IS NULL
+        ON CONFLICT (doc_key) DO UPDATE SET
+            title = EXCLUDED.title,
+            content = EXCLUDED.content,
+            doc_type = EXCLUDED.doc_type,
+            category = EXCLUDED.category,
+            content_hash = EXCLUDED.content_hash,
+            embedding = EXCLUDED.embedding,
+            updated_at = NOW()
+    """))
+    await db.execute(text("""
+        INSERT INTO knowledge_docs (doc_key, title, content, doc_type, category, parent_id, chunk_index, embedding, created_at, updated_at)
+        SELECT staged.doc_key, staged.title, staged.content, staged.doc_type, staged.category,
+               doc.id, staged.chunk_index, CAST(staged.embedding AS vector), NOW(), NOW()
+        FROM knowledge_docs_staging staged
+        JOIN knowledge_docs doc ON doc.doc_key = staged.parent_key
+        WHERE staged.parent_key IS NOT NULL
+    """))
+
+
+async def prune_docs(db, keep_keys: Iterable[str]) -> int:
+    """Deletes keyed docs absent from the source, with their chunks (docs without doc_key are left alone)"""
+    result = await db.execute(
+        text("DELETE FROM knowledge_docs WHERE doc_key IS NOT NULL AND parent_id IS NULL AND NOT (doc_key = ANY(:keys))"),
+        {"keys": list(keep_keys)}
+    )
+    return result.rowcount
+
+
+async def ingest(
+    db,
+    docs: Iterable[dict],
+    encode: Callable[[List[str]], np.ndarray],
+    batch_size: int = 256,
+    prune: bool = False,
+    chunk: Optional[Chunker] = None,
+    force: bool = False,
+    on_progress: Optional[Callable[[IngestStats], None]] = None
+) -> IngestStats:
+    """
+    Streams docs (dicts with title, content, doc_type, category, optional doc_key) into knowledge_docs.
+    encode(texts) -> normalized float32 matrix runs in an executor; batch n+1 is encoded while batch n is written.
+    chunk(content) -> passages splits long docs; force re-ingests unchanged docs (e.g. new chunking settings).
+    """
+    stats = IngestStats()
+    known = await existing_hashes(db)
+    seen = set()
+    loop = asyncio.get_running_loop()
+
+    async def encode_batch(batch: List[dict]):
+        rows = [row for doc in batch for row in expand_rows(doc, chunk)]
+        start = time.perf_counter()
+        vectors = iter(await loop.run_in_executor(None, encode, [row["content"] for row in rows if row["embed"]]))
+        stats.embed_seconds += time.perf_counter() - start
+        return batch, rows, [next(vectors) if row["embed"] else None for row in rows]
+
+    async def write_batch(batch: List[dict], rows: List[dict], embeddings: List[Optional[np.ndarray]]):
+        start = time.perf_counter()
+        await upsert_docs(db, rows, embeddings)
+        await db.commit()
+        stats.write_seconds += time.perf_counter() - start
+        stats.embedded += len(batch)
+        stats.chunks += sum(1 for row in rows if row["parent_key"] is not None)
+        stats.batches += 1
+        if on_progress:
+            on_progress(stats)
+
+    def changed(source: Iterable[dict]) -> Iterator[dict]:
+        for doc in source:
+            stats.scanned += 1
+            key = doc_key(doc)
+            seen.add(key)
+            doc["content_hash"] = content_hash(doc)
+            if not force and known.get(key) == doc["content_hash"]:
+                stats.skipped += 1
+                continue
+            yield doc
+
+    pending: Optional[asyncio.Task] = None
+    for batch in batched(changed(docs), batch_size):
+        unique = last_per_key(batch)
+        stats.duplicates += len(batch) - len(unique)
+        batch = unique
+        encoding = asyncio.ensure_future(encode_batch(batch))
+        if pending is not None:
+            await write_batch(*await pending)
+        pending = encoding
+    if pending is not None:
+        await write_batch(*await pending)
+
+    if prune:
+        stats.pruned = await prune_docs(db, seen)
+        await db.commit()
+    if on_progress:
+        on_progress(stats)
+    return stats
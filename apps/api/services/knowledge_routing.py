@@ -0,0 +1,103 @@
+"""
+Routage de la recherche knowledge par intention et flags de risque
+La classification restreint l'espace de recherche à des partitions (doc_type, category)
+avant la recherche vectorielle: chaque partition a son propre index, la recherche filtrée
+ne parcourt que les partitions routées (pas de post-filtrage des k meilleurs du corpus entier).
+Les flags de risque épinglent des partitions (politiques de conformité) toujours jointes aux extraits.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import settings
+from models.schemas import ClassificationOutput
+
+# (doc_type, categories or None for the whole doc_type)
+PartitionFilter = Tuple[str, Optional[Tuple[str, ...]]]
+
+COMPLIANCE = ("policy", ("compliance",))
+
+INTENT_ROUTES: Dict[str, Tuple[PartitionFilter, ...]] = {
+    "availability": (("product", None), ("faq", ("livraison",))),
+    "routine_usage": (("faq", ("routine",)), ("product", None), ("claim", None)),
+    "shade_color": (("product", ("maquillage", "coloration")), ("faq", ("maquillage",))),
+    "delivery_return": (("faq", ("livraison", "retours")),),
+    "complaint": (("faq", ("livraison", "retours", "fidelite")), ("policy", None)),
+    "where_to_buy": (("product", None), ("faq", ("livraison",))),
+    "ingredients": (("claim", None), ("product", None), COMPLIANCE),
+    "recommendation": (("product", None), ("faq", ("routine", "maquillage")), ("claim", None)),
+}
+
+RISK_ROUTES: Dict[str, Tuple[PartitionFilter, ...]] = {
+    "allergy_adverse": (COMPLIANCE,),
+    "medical": (COMPLIANCE,),
+    "minors": (COMPLIANCE,),
+    "pregnancy": (COMPLIANCE,),
+    "legal_press": (COMPLIANCE,),
+}
+
+
+def _matches(filters: Iterable[PartitionFilter], doc_type: Optional[str], category: Optional[str]) -> bool:
+    return any(doc_type == dt and (categories is None or category in categories) for dt, categories in filters)
+
+
+def _by_doc_type(filters: Iterable[PartitionFilter]) -> Dict[str, Optional[Tuple[str, ...]]]:
+    """One entry per doc_type: categories merged, None (whole doc_type) wins"""
+    merged: Dict[str, Optional[Tuple[str, ...]]] = {}
+    for doc_type, categories in filters:
+        if doc_type in merged and (merged[doc_type] is None or categories is None):
+            merged[doc_type] = None
+        else:
+            merged[doc_type] = tuple(sorted(set(merged.get(doc_type) or ()) | set(categories or ()))) if categories else None
+    return merged
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    Partitions searched for one message (None: the whole corpus);
+    pinned ones contribute their best hits even under the similarity threshold
+    """
+    partitions: Optional[Tuple[PartitionFilter, ...]]
+    pinned: Tuple[PartitionFilter, ...] = ()
+    reason: str = ""
+
+    def matches(self, doc_type: Optional[str], category: Optional[str]) -> bool:
+        return self.partitions is None or _matches(self.partitions + self.pinned, doc_type, category)
+
+    def matches_pinned(self, doc_type: Optional[str], category: Optional[str]) -> bool:
+        return _matches(self.pinned, doc_type, category)
+
+    def doc_types(self) -> Optional[Dict[str, Optional[Tuple[str, ...]]]]:
+        """doc_type -> categories (None: all) to search, or None for the whole corpus"""
+        if self.partitions is None:
+            return None
+        return _by_doc_type(self.partitions + self.pinned)
+
+    def pinned_doc_types(self) -> Dict[str, Optional[Tuple[str, ...]]]:
+        return _by_doc_type(self.pinned)
+
+
+def routed_doc_types() -> Tuple[str, ...]:
+    """doc_types any route can target (one partial pgvector index each)"""
+    filters = [f for route in (*INTENT_ROUTES.values(), *RISK_ROUTES.values()) for f in route]
+    return tuple(sorted({doc_type for doc_type, _ in filters}))
+
+
+def route_for(classification: ClassificationOutput) -> Optional[Route]:
+    """
+    Partitions for this classification, or None to search the whole corpus
+    (routing disabled, intent without route such as spam / unknown, or low intent confidence).
+    Risk flags pin their partitions whatever the intent.
+    """
+    if not settings.rag_routing:
+        return None
+    pinned = tuple(f for flag in classification.risk_flags for f in RISK_ROUTES.get(flag, ()))
+    intent = classification.intent.value
+    partitions = INTENT_ROUTES.get(intent)
+    if partitions is None or classification.intent_confidence < settings.rag_routing_min_confidence:
+        if not pinned:
+            return None
+        # Whole corpus, plus the pinned partitions guaranteed in the extracts
+        return Route(partitions=None, pinned=pinned, reason=f"risk:{','.join(classification.risk_flags)}")
+    return Route(partitions=partitions, pinned=pinned, reason=f"intent:{intent}")
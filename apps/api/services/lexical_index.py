@@ -0,0 +1,142 @@
+"""
+Index lexical BM25 (index inversé en mémoire) sur titre + contenu des knowledge_docs
+Garde les tokens exacts que les embeddings denses lissent: noms de produits, SPF50+,
+numéros de teinte, codes promo. Mis à jour document par document (ajout / remplacement / retrait).
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from services.keyword_classifier import normalize_keyword_text
+
+# Words, numbers with decimals (shade 5.5), trailing '+' kept (SPF50+)
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*\+?")
+
+STOPWORDS = frozenset("""
+a au aux avec ce ces dans de des du elle en est et eux il ils je la le les leur lui ma mais me meme
+mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un
+une vos votre vous c d j l m n s t y
+an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(normalize_keyword_text(text)) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index (term -> {doc key: term frequency}).
+    A query only touches the postings of its own terms. Titles count title_weight times.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.doc_terms: Dict[Hashable, Counter] = {}
+        self.doc_length: Dict[Hashable, int] = {}
+        self.payloads: Dict[Hashable, Any] = {}
+        self.stamps: Dict[Hashable, Any] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / len(self.doc_terms) if self.doc_terms else 0.0
+
+    def add(self, key: Hashable, title: str, content: str, payload: Any, stamp: Any = None) -> bool:
+        """Index (or re-index) one doc; False when it is already indexed with the same stamp"""
+        if key in self.doc_terms:
+            if stamp is not None and self.stamps.get(key) == stamp:
+                return False
+            self.remove(key)
+        terms = Counter(tokenize(content))
+        for token in tokenize(title):
+            terms[token] += self.title_weight
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[key] = tf
+        self.doc_terms[key] = terms
+        self.payloads[key] = payload
+        self.stamps[key] = stamp
+        self.doc_length[key] = sum(terms.values())
+        self.total_length += self.doc_length[key]
+        return True
+
+    def remove(self, key: Hashable):
+        terms = self.doc_terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+        self.total_length -= self.doc_length.pop(key)
+        self.payloads.pop(key, None)
+        self.stamps.pop(key, None)
+
+    def sync(self, docs: Iterable[Tuple[Hashable, str, str, Any, Any]]) -> Tuple[int, int]:
+        """
+        Align the index on the full corpus (key, title, content, payload, stamp):
+        only new or changed docs are tokenized, missing ones are removed. Returns (indexed, removed).
+        """
+        seen = set()
+        indexed = 0
+        for key, title, content, payload, stamp in docs:
+            seen.add(key)
+            if self.add(key, title, content, payload, stamp):
+                indexed += 1
+            else:
+                self.payloads[key] = payload
+        stale = [key for key in self.doc_terms if key not in seen]
+        for key in stale:
+            self.remove(key)
+        return indexed, len(stale)
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_terms) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int, accept: Optional[Callable[[Any], bool]] = None) -> List[Tuple[Any, float]]:
+        """
+        (payload, BM25 score) of the k best docs containing at least one query term;
+        accept(payload) restricts the candidates before ranking (filtered search, not post-filtered)
+        """
+        if not self.doc_terms:
+            return []
+        avg_length = self.avg_length
+        scores: Dict[Hashable, float] = {}
+        rejected = set()
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf(term)
+            for key, tf in posting.items():
+                if accept is not None and key not in scores:
+                    if key in rejected:
+                        continue
+                    if not accept(self.payloads[key]):
+                        rejected.add(key)
+                        continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_length[key] / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.payloads[key], score) for key, score in best]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+    """Merge ranked lists of keys: score = sum of 1 / (k + rank) over the lists a key appears in"""
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return fused[:limit] if limit else fused
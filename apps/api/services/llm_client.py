@@ -0,0 +1,133 @@
+"""
+Client Anthropic asynchrone partagé - un seul pool de connexions par process
+"""
+
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Union
+
+import anthropic
+import httpx
+
+from config import settings
+from services.metrics import observe_llm_usage
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[anthropic.AsyncAnthropic] = None
+
+
+def get_async_client() -> anthropic.AsyncAnthropic:
+    """
+    Return the process-wide AsyncAnthropic client (created lazily).
+    Classifier, drafter and verifier share its httpx connection pool, so the
+    event loop is never blocked by a model round-trip.
+    """
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=10.0),
+        )
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            http_client=http_client,
+            max_retries=settings.llm_max_retries,
+        )
+        logger.info(f"🔌 Async Anthropic client created (pool={settings.llm_max_connections})")
+    return _client
+
+
+async def close_async_client():
+    """Close the shared client and its connection pool (lifespan shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        logger.info("🔌 Async Anthropic client closed")
+
+
+# ============================================================================
+# Prompt caching + token usage
+# ============================================================================
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+# Per pipeline run usage records (set by AIPipeline.process, inherited by its tasks)
+_run_usage: ContextVar[Optional[List[Dict]]] = ContextVar("llm_run_usage", default=None)
+
+
+def cached_system_prompt(text: str) -> Union[str, List[Dict]]:
+    """
+    Mark a static system prompt as a cacheable prefix (Anthropic prompt caching).
+    Prompts below the model's minimum cacheable length are simply not cached.
+    """
+    if not settings.llm_prompt_caching:
+        return text
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+class UsageTotals:
+    """Process-wide token counts per model"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_model: Dict[str, Dict[str, int]] = {}
+
+    def add(self, model: str, entry: Dict):
+        with self._lock:
+            totals = self.by_model.setdefault(model, {"calls": 0, **{f: 0 for f in USAGE_FIELDS}})
+            totals["calls"] += 1
+            for field in USAGE_FIELDS:
+                totals[field] += entry[field]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snapshot = {}
+            for model, totals in self.by_model.items():
+                cacheable = totals["cache_read_input_tokens"] + totals["cache_creation_input_tokens"] + totals["input_tokens"]
+                snapshot[model] = {
+                    **totals,
+                    "cache_hit_ratio": round(totals["cache_read_input_tokens"] / cacheable, 3) if cacheable else 0.0
+                }
+            return snapshot
+
+
+USAGE_TOTALS = UsageTotals()
+
+
+def start_usage_capture() -> List[Dict]:
+    """Collect usage of every LLM call made in the current context (one pipeline run)"""
+    records: List[Dict] = []
+    _run_usage.set(records)
+    return records
+
+
+def record_usage(stage: str, model: str, response) -> Dict:
+    """Record token usage (incl. cache read/write) of an Anthropic response"""
+    usage = getattr(response, "usage", None)
+    entry = {"stage": stage, "model": model}
+    for field in USAGE_FIELDS:
+        entry[field] = getattr(usage, field, None) or 0
+
+    USAGE_TOTALS.add(model, entry)
+    observe_llm_usage(entry)
+    records = _run_usage.get()
+    if records is not None:
+        records.append(entry)
+
+    if entry["cache_read_input_tokens"] or entry["cache_creation_input_tokens"]:
+        logger.debug(
+            f"💾 {stage} prompt cache: read={entry['cache_read_input_tokens']} "
+            f"write={entry['cache_creation_input_tokens']} input={entry['input_tokens']}"
+        )
+    return entry
@@ -0,0 +1,157 @@
+"""
+Métriques Prometheus - latences par stage pipeline, latence HTTP par route,
+tokens LLM par modèle, utilisation du pool DB. Exposées sur /metrics.
+"""
+
+import time
+import logging
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# LLM stages are 0.1s-30s, DB writes / local steps are sub-10ms
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "influence_pipeline_stage_seconds",
+    "AIPipeline stage duration (classify, embed, retrieve, draft, save_draft, verify, commit)",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "influence_http_request_seconds",
+    "HTTP request duration by route template (streams: until the last body chunk)",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+
+LLM_TOKENS = Counter(
+    "influence_llm_tokens",
+    "Anthropic tokens by model and type (input, output, cache_read_input, cache_creation_input)",
+    ["model", "type"]
+)
+
+LLM_CALLS = Counter(
+    "influence_llm_calls",
+    "Anthropic calls by model and pipeline stage",
+    ["model", "stage"]
+)
+
+CACHE_LOOKUPS = Counter(
+    "influence_cache_lookups",
+    "Pipeline cache lookups by cache and result (hit_memory, hit_redis, miss)",
+    ["cache", "result"]
+)
+
+AUDIT_LOG_ROWS = Counter(
+    "influence_audit_log_rows",
+    "Audit log rows by outcome (flushed, dropped, backpressure = writer had to wait)",
+    ["outcome"]
+)
+
+AUDIT_LOG_FLUSH_SECONDS = Histogram(
+    "influence_audit_log_flush_seconds",
+    "Duration of one buffered audit log flush (multi-row INSERT + commit)",
+    buckets=STAGE_BUCKETS
+)
+
+AUDIT_LOG_PENDING = Gauge(
+    "influence_audit_log_pending",
+    "Audit log rows buffered in memory, not yet flushed"
+)
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "influence_embedding_batch_size",
+    "Texts encoded together by the micro-batching embedder",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+EMBEDDING_BATCH_SECONDS = Histogram(
+    "influence_embedding_batch_seconds",
+    "Duration of one batched encode (worker thread)",
+    buckets=STAGE_BUCKETS
+)
+
+
+def observe_stage(stage: str, seconds: float):
+    PIPELINE_STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def observe_llm_usage(entry: dict):
+    """entry as built by services.llm_client.record_usage"""
+    LLM_CALLS.labels(entry["model"], entry["stage"]).inc()
+    for field in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        if entry[field]:
+            LLM_TOKENS.labels(entry["model"], field[:-len("_tokens")]).inc(entry[field])
+
+
+class DBPoolCollector:
+    """Reads SQLAlchemy pool counters at scrape time (no per-checkout overhead)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+        gauges = {
+            "size": ("Configured pool size", getattr(pool, "size", None)),
+            "checked_out": ("Connections currently in use", getattr(pool, "checkedout", None)),
+            "checked_in": ("Idle connections in the pool", getattr(pool, "checkedin", None)),
+            "overflow": ("Connections opened above pool size", getattr(pool, "overflow", None)),
+        }
+        for name, (doc, read) in gauges.items():
+            if read is None:
+                continue
+            gauge = GaugeMetricFamily(f"influence_db_pool_{name}", doc)
+            gauge.add_metric([], read())
+            yield gauge
+
+
+_db_pool_collector = None
+
+
+def register_db_pool_collector(engine):
+    global _db_pool_collector
+    if _db_pool_collector is None:
+        _db_pool_collector = DBPoolCollector(engine)
+        REGISTRY.register(_db_pool_collector)
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware (works with StreamingResponse / SSE, unlike BaseHTTPMiddleware).
+    Labels use the route template (/api/messages/{message_id}) to keep cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status["code"])
+            ).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
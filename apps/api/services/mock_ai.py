@@ -25,9 +25,9 @@ class MockDrafterService:
     def __init__(self):
         self.model = "claude-sonnet-4-5-20250929-MOCK"
     
-    async def draft(self, message: str, classification, rag_extracts, context=None):
+    async def draft(self, message: str, classification, rag_extracts, context=None, on_token=None):
         """Mock draft generation"""
-        return DraftOutput(
+        draft = DraftOutput(
             reply_text="Merci pour votre question ! Pour une peau grasse, je vous recommande notre gel purifiant léger qui régule l'excès de sébum. Avez-vous des préoccupations spécifiques ?",
             ask_dm_question="Quelle est votre type de peau exactement ?",
             suggested_products=[
@@ -42,6 +42,10 @@ class MockDrafterService:
             citations_internal=[],
             confidence=0.85
         )
+        if on_token:
+            for word in draft.reply_text.split(" "):
+                await on_token(word + " ")
+        return draft
 
 class MockVerifierService:
     def __init__(self):
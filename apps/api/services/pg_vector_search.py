@@ -0,0 +1,177 @@
+"""
+Recherche vectorielle dans Postgres (pgvector) - index HNSW ou IVFFlat sur knowledge_docs.embedding
+La requête trie par distance (ORDER BY embedding <=> q LIMIT k) pour que l'index soit utilisé;
+le seuil de similarité s'applique ensuite sur les k voisins, jamais dans le WHERE du scan.
+Partitions par doc_type: un index partiel (WHERE doc_type = '...') par doc_type routé; la requête
+filtrée répète le même prédicat littéral pour que le planner choisisse l'index de la partition.
+"""
+
+import logging
+import math
+import re
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("hnsw", "ivfflat")
+
+# doc_type values are inlined in partial index predicates and queries
+DOC_TYPE_RE = re.compile(r"^[a-z_]+$")
+
+
+def index_name(method: str, table: str = "knowledge_docs", doc_type: Optional[str] = None) -> str:
+    return f"idx_{table}_embedding_{method}" + (f"_{doc_type}" if doc_type else "")
+
+
+def doc_type_predicate(doc_type: Optional[str]) -> str:
+    """Literal 'doc_type = ...' (a bound parameter would not match the partial index predicate)"""
+    if doc_type is None:
+        return "TRUE"
+    if not DOC_TYPE_RE.match(doc_type):
+        raise ValueError(f"Invalid doc_type partition '{doc_type}'")
+    return f"doc_type = '{doc_type}'"
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector guideline: rows / 1000 up to 1M rows, sqrt(rows) beyond"""
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(10, rows // 1000)
+
+
+def to_pgvector(embedding) -> str:
+    return "[" + ",".join(f"{x:.7g}" for x in embedding) + "]"
+
+
+async def _index_options(db, name: str) -> Optional[List[str]]:
+    result = await db.execute(text("SELECT reloptions FROM pg_class WHERE relname = :name"), {"name": name})
+    row = result.fetchone()
+    if row is None:
+        return None
+    return row[0] or []
+
+
+async def ensure_vector_index(
+    db,
+    method: str,
+    table: str = "knowledge_docs",
+    m: int = 16,
+    ef_construction: int = 64,
+    doc_type: Optional[str] = None
+) -> str:
+    """
+    Creates the cosine index for `method` and drops the other one (no commit: caller's transaction).
+    IVFFlat centroids are trained on the rows present at build time, so the index is rebuilt
+    when the ideal number of lists drifts by more than 2x (typically after a large ingest).
+    doc_type: partial index over that partition only.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown pgvector index method '{method}' (expected one of {METHODS})")
+    name = index_name(method, table, doc_type)
+    predicate = doc_type_predicate(doc_type)
+    where = f" WHERE {predicate}" if doc_type else ""
+    for other in METHODS:
+        if other != method:
+            await db.execute(text(f"DROP INDEX IF EXISTS {index_name(other, table, doc_type)}"))
+    if table == "knowledge_docs" and doc_type is None:
+        # Former init.sql index (IVFFlat trained on an empty table)
+        await db.execute(text("DROP INDEX IF EXISTS idx_knowledge_embedding"))
+
+    options = await _index_options(db, name)
+    if method == "hnsw":
+        if options is None:
+            logger.info(f"🧭 Creating HNSW index {name} (m={m}, ef_construction={ef_construction})")
+            await db.execute(text(
+                f"CREATE INDEX {name} ON {table} USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)}){where}"
+            ))
+        return name
+
+    result = await db.execute(text(f"SELECT COUNT(*) FROM {table} WHERE embedding IS NOT NULL AND {predicate}"))
+    lists = ivfflat_lists(result.scalar_one())
+    current = None
+    for option in options or []:
+        if option.startswith("lists="):
+            current = int(option.split("=", 1)[1])
+    if current is not None and current / 2 <= lists <= current * 2:
+        return name
+    if current is not None:
+        await db.execute(text(f"DROP INDEX {name}"))
+    logger.info(f"🧭 Creating IVFFlat index {name} (lists={lists}, was {current})")
+    await db.execute(text(
+        f"CREATE INDEX {name} ON {table} USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists}){where}"
+    ))
+    return name
+
+
+async def ensure_partition_indexes(
+    db,
+    method: str,
+    doc_types: Iterable[str],
+    table: str = "knowledge_docs",
+    m: int = 16,
+    ef_construction: int = 64
+) -> List[str]:
+    """One partial index per doc_type, so that a routed query scans its partition's graph / lists only"""
+    return [
+        await ensure_vector_index(db, method, table, m, ef_construction, doc_type=doc_type)
+        for doc_type in doc_types
+    ]
+
+
+async def set_search_params(db, ef_search: Optional[int] = None, probes: Optional[int] = None):
+    """Per-query recall/latency knobs, scoped to the current transaction"""
+    if ef_search:
+        await db.execute(text("SELECT set_config('hnsw.ef_search', :value, true)"), {"value": str(int(ef_search))})
+    if probes:
+        await db.execute(text("SELECT set_config('ivfflat.probes', :value, true)"), {"value": str(int(probes))})
+
+
+def nearest_query(
+    table: str = "knowledge_docs",
+    columns: str = "id, title, content, doc_type, category, parent_id, chunk_index",
+    doc_type: Optional[str] = None,
+    by_category: bool = False
+):
+    """
+    k nearest rows by cosine distance, then similarity threshold on those k only.
+    doc_type restricts the scan to that partition's partial index; by_category adds
+    category = ANY(:categories), filtered inside the partition scan.
+    """
+    where = doc_type_predicate(doc_type) + (" AND category = ANY(:categories)" if by_category else "")
+    return text(f"""
+        SELECT {columns}, 1 - distance AS similarity
+        FROM (
+            SELECT {columns}, embedding <=> CAST(:embedding AS vector) AS distance
+            FROM {table}
+            WHERE {where}
+            ORDER BY embedding <=> CAST(:embedding AS vector)
+            LIMIT :k
+        ) nearest
+        WHERE distance <= :max_distance
+        ORDER BY distance
+    """)
+
+
+async def nearest_docs(
+    db,
+    embedding,
+    k: int,
+    similarity_threshold: float,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    doc_type: Optional[str] = None,
+    categories: Optional[Sequence[str]] = None
+):
+    """
+    Rows (id, title, content, doc_type, category, parent_id, chunk_index, similarity) of the k closest
+    docs / chunks, of one doc_type partition (and some of its categories) when given
+    """
+    await set_search_params(db, ef_search, probes)
+    params = {"embedding": to_pgvector(embedding), "k": k, "max_distance": 1 - similarity_threshold}
+    if categories:
+        params["categories"] = list(categories)
+    result = await db.execute(nearest_query(doc_type=doc_type, by_category=bool(categories)), params)
+    return result.fetchall()
@@ -2,22 +2,78 @@
 Pipeline IA complet - Orchestration de tous les services
 """
 
+import asyncio
 import logging
 import json
+import threading
+import time
+from typing import Awaitable, Callable, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from models.schemas import ProcessedMessage, ClassificationOutput, DraftOutput, VerificationOutput
-from services.classifier import ClassifierService
+from models.schemas import ProcessedMessage, ClassificationOutput, DraftOutput, VerificationOutput, VerdictEnum
+from services.classifier import ClassifierService, is_fallback_classification
 from services.rag import RAGService
+from services.knowledge_routing import route_for
 from services.drafter import DrafterService
 from services.verifier import VerifierService
 from services.loreal_tools import LoreaToolService
 from services.influencer_scoring import InfluencerScoringService
+from services.llm_client import start_usage_capture, USAGE_FIELDS
+from services.metrics import observe_stage
+from services.audit_log import get_audit_log_writer, audit_record, insert_audit_records
+from services.unit_of_work import PipelineStageError
+from services.keyword_classifier import get_keyword_classifier, is_fastpath_model, FASTPATH_MODEL, FASTPATH_STATS
+from services.classification_cache import get_classification_cache
+from services.draft_cache import get_draft_cache, draft_cache_eligible, DraftCacheLookup
+from services.verification_policy import (
+    check_style_rules, rules_tier_eligible, rules_verification, VERIFICATION_STATS, RULES_MODEL
+)
+from prompts.system_prompts import ESCALATION_TEMPLATES
 from config import settings, get_safe_autopilot_intents, get_critical_risk_flags
 
 logger = logging.getLogger(__name__)
 
+DRAFT_CACHE_MODEL = "draft-cache"
+
+class EarlyExitStats:
+    """Process-wide counters for critical-risk short-circuits"""
+    
+    EMA_ALPHA = 0.1
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.short_circuits = 0
+        self.avoided_llm_calls = 0
+        self.saved_latency_ms = 0.0
+        # Moving average of draft + verify latency on full runs
+        self.avg_draft_verify_ms = None
+    
+    def observe_full_run(self, draft_verify_ms: float):
+        with self._lock:
+            if self.avg_draft_verify_ms is None:
+                self.avg_draft_verify_ms = draft_verify_ms
+            else:
+                self.avg_draft_verify_ms += self.EMA_ALPHA * (draft_verify_ms - self.avg_draft_verify_ms)
+    
+    def record_short_circuit(self):
+        with self._lock:
+            self.short_circuits += 1
+            self.avoided_llm_calls += 2  # drafter + verifier
+            self.saved_latency_ms += self.avg_draft_verify_ms or 0.0
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.critical_short_circuit,
+                "short_circuits": self.short_circuits,
+                "avoided_llm_calls": self.avoided_llm_calls,
+                "saved_latency_ms": round(self.saved_latency_ms, 2),
+                "avg_draft_verify_ms": round(self.avg_draft_verify_ms or 0.0, 2)
+            }
+
+EARLY_EXIT_STATS = EarlyExitStats()
+
 class AIPipeline:
     def __init__(
         self,
@@ -32,67 +88,127 @@ class AIPipeline:
         self.verifier = verifier
         self.loreal_tools = LoreaToolService()
         self.influencer_scorer = InfluencerScoringService()
+        self.keyword_classifier = get_keyword_classifier()
+        self.classification_cache = get_classification_cache()
+        self.draft_cache = get_draft_cache()
         
     async def process(
         self,
         message: str,
         message_id: int,
         db: AsyncSession,
-        context: dict = None
+        context: dict = None,
+        emit: Optional[Callable[[str, dict], Awaitable[None]]] = None
     ) -> ProcessedMessage:
         """
-        Pipeline complet:
-        1. Classify intent + risk
-        2. Retrieve knowledge
-        3. Draft reply
-        4. Verify reply
-        5. Determine HITL requirements
-        """
+        Pipeline complet - les stages indépendants sont planifiés en parallèle:
+        1. Classify intent + risk   ║ Retrieve knowledge (ne dépend que du message)
+           (RAG_ROUTING: seul l'embedding est parallèle, la recherche suit la classification
+           et se limite aux partitions de l'intention / des flags de risque)
+           → flag critique: escalade directe, template policy, ni draft ni vérification
+        2. Draft reply
+        3. Save draft, puis Verify (règles locales ou Opus selon le risque)
+        4. Determine HITL requirements
+        5. Commit: draft + logs d'audit (+ message si inséré par l'appelant) en une transaction
         
-        # 1. CLASSIFY
-        logger.info(f"🔍 Step 1/4: Classifying...")
-        classification = await self.classifier.classify(message, context)
+        Unit of work: aucun commit intermédiaire. Si un stage échoue, tout est
+        rollback et PipelineStageError est levée (voir services.unit_of_work).
+        
+        Les timings par stage (ms) sont retournés dans stage_timings_ms.
+        emit(event, data): progression streamée (classification, rag, token,
+        draft, verification) dès que chaque stage est prêt.
+        """
+        try:
+            return await self._process(message, message_id, db, context, emit)
+        except Exception as e:
+            await db.rollback()
+            if not isinstance(e, PipelineStageError):
+                e = PipelineStageError("pipeline", e)
+            e.message_id = message_id
+            logger.error(f"❌ Pipeline failed at stage {e.stage} for message {message_id}: {e.error}")
+            raise e from e.error
+    
+    async def _process(
+        self,
+        message: str,
+        message_id: int,
+        db: AsyncSession,
+        context: dict = None,
+        emit: Optional[Callable[[str, dict], Awaitable[None]]] = None
+    ) -> ProcessedMessage:
+        timings = {}
+        audit = []
+        start = time.perf_counter()
+        usage = start_usage_capture()
         
-        # Log classification
-        await self._log_step(db, message_id, "classify", {
+        # 1. CLASSIFY || RETRIEVE
+        logger.info(f"🔍 Step 1/4: Classifying + retrieving knowledge...")
+        (classification, classifier_model), rag_extracts, embedding = await self._classify_and_retrieve(
+            message, context, db, timings, emit
+        )
+        self._log_step(audit, message_id, "classify", {
             "message": message,
             "context": context
-        }, classification.dict(), self.classifier.model)
+        }, {**classification.dict(), "usage": self._usage(usage, "classify")}, classifier_model)
         
-        # 2. RETRIEVE
-        logger.info(f"📚 Step 2/4: Retrieving knowledge...")
-        rag_extracts = await self.rag.retrieve(message, db, top_k=5)
+        # Critical risk: no human will send an LLM draft, skip Sonnet + Opus
+        critical_flags = [f for f in get_critical_risk_flags() if f in classification.risk_flags]
+        if critical_flags and settings.critical_short_circuit:
+            return await self._escalate_early(
+                message_id, db, classification, rag_extracts, critical_flags,
+                timings, start, usage, audit, emit
+            )
         
-        # 3. DRAFT
-        logger.info(f"✍️  Step 3/4: Drafting reply...")
-        draft = await self.drafter.draft(message, classification, rag_extracts, context)
+        # 2. DRAFT (semantic draft cache for FAQ intents, else drafter)
+        logger.info(f"✍️  Step 2/4: Drafting reply...")
+        draft, draft_model, cache_lookup = await self._timed(timings, "draft", self._draft(
+            message, classification, rag_extracts, context, db, emit, embedding
+        ))
+        draft_cached = cache_lookup is not None and cache_lookup.entry is not None
+        await self._emit(emit, "draft", draft.dict())
         
-        # Save draft to DB
-        draft_id = await self._save_draft(
+        # Save draft (uncommitted, verification logs reference draft_id)
+        draft_id = await self._timed(timings, "save_draft", self._save_draft(
             db, message_id, draft, classification, rag_extracts
-        )
-        
-        # Log draft
-        await self._log_step(db, message_id, "draft", {
+        ))
+        self._log_step(audit, message_id, "draft", {
             "classification": classification.dict(),
             "rag_extracts": [e.dict() for e in rag_extracts]
-        }, draft.dict(), self.drafter.model, draft_id)
+        }, {**draft.dict(), "usage": self._usage(usage, "draft")}, draft_model, draft_id)
         
-        # 4. VERIFY
-        logger.info(f"✅ Step 4/4: Verifying...")
-        verification = await self.verifier.verify(draft, classification, message)
-        
-        # Log verification
-        await self._log_step(db, message_id, "verify", {
+        # 3. VERIFY (a cached draft keeps its PASS verdict unless DRAFT_CACHE_REVERIFY)
+        logger.info(f"✅ Step 3/4: Verifying...")
+        if draft_cached and not settings.draft_cache_reverify:
+            verification, verifier_model = cache_lookup.entry.verification, DRAFT_CACHE_MODEL
+            timings["verify"] = 0.0
+        else:
+            verification, verifier_model = await self._timed(
+                timings, "verify", self._verify(draft, classification, message, context)
+            )
+        await self._emit(emit, "verification", verification.dict())
+        self._log_step(audit, message_id, "verify", {
             "draft": draft.dict()
-        }, verification.dict(), self.verifier.model, draft_id)
+        }, {**verification.dict(), "usage": self._usage(usage, "verify")}, verifier_model, draft_id)
         
-        # 5. DETERMINE HITL vs AUTOPILOT
+        # 4. DETERMINE HITL vs AUTOPILOT
         requires_hitl, can_autopilot = self._determine_hitl(
-            classification, verification
+            classification, verification, classifier_model
         )
         
+        # 5. COMMIT (single transaction for the whole run)
+        logger.info(f"🗒️  Step 4/4: Committing draft + {len(audit)} audit rows...")
+        await self._timed(timings, "commit", self._commit(db, audit))
+        
+        if cache_lookup is not None:
+            self._remember_draft(cache_lookup, message, draft, verification, timings)
+        if not draft_cached:
+            EARLY_EXIT_STATS.observe_full_run(timings["draft"] + timings["verify"])
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        stages_sum = sum(v for k, v in timings.items() if k != "total")
+        
         logger.info(f"📊 Pipeline complete: HITL={requires_hitl}, Autopilot={can_autopilot}")
+        logger.info(f"⏱️  Pipeline timings: total={timings['total']:.0f}ms (sum of stages={stages_sum:.0f}ms) {timings}")
+        self._log_usage(usage)
         
         return ProcessedMessage(
             message_id=message_id,
@@ -101,13 +217,276 @@ class AIPipeline:
             verification=verification,
             rag_extracts=[e.dict() for e in rag_extracts],
             requires_hitl=requires_hitl,
-            can_autopilot=can_autopilot
+            can_autopilot=can_autopilot,
+            stage_timings_ms=timings
         )
     
+    async def _escalate_early(
+        self,
+        message_id: int,
+        db: AsyncSession,
+        classification: ClassificationOutput,
+        rag_extracts: list,
+        critical_flags: list,
+        timings: dict,
+        start: float,
+        usage: list,
+        audit: list,
+        emit: Optional[Callable[[str, dict], Awaitable[None]]] = None
+    ) -> ProcessedMessage:
+        """Escalation record with a policy template reply (no drafter / verifier call)"""
+        logger.info(f"🚨 Critical risk {critical_flags}: escalating without draft/verify")
+        
+        template = ESCALATION_TEMPLATES.get(critical_flags[0], ESCALATION_TEMPLATES["default"])
+        draft = DraftOutput(
+            reply_text=template["reply_text"],
+            ask_dm_question=template["ask_dm_question"],
+            confidence=1.0
+        )
+        verification = VerificationOutput(
+            verdict=VerdictEnum.ESCALATE,
+            reasoning=f"Short-circuit: critical risk flags {critical_flags} - policy template, human review required"
+        )
+        
+        draft_id = await self._timed(timings, "save_draft", self._save_draft(
+            db, message_id, draft, classification, rag_extracts
+        ))
+        self._log_step(audit, message_id, "escalate", {
+            "critical_flags": critical_flags
+        }, {
+            "draft": draft.dict(),
+            "verification": verification.dict()
+        }, "policy-template", draft_id)
+        await self._timed(timings, "commit", self._commit(db, audit))
+        
+        await self._emit(emit, "draft", draft.dict())
+        await self._emit(emit, "verification", verification.dict())
+        
+        EARLY_EXIT_STATS.record_short_circuit()
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"⏱️  Pipeline timings (short-circuit): total={timings['total']:.0f}ms {timings}")
+        self._log_usage(usage)
+        
+        return ProcessedMessage(
+            message_id=message_id,
+            classification=classification,
+            draft=draft,
+            verification=verification,
+            rag_extracts=[e.dict() for e in rag_extracts],
+            requires_hitl=True,
+            can_autopilot=False,
+            stage_timings_ms=timings
+        )
+    
+    async def _classify_and_retrieve(
+        self,
+        message: str,
+        context: dict,
+        db: AsyncSession,
+        timings: dict,
+        emit: Optional[Callable[[str, dict], Awaitable[None]]] = None
+    ) -> tuple:
+        """
+        ((classification, model), rag_extracts, query embedding or None).
+        Without routing both stages run in parallel; with routing the query is embedded
+        during classification, then only the routed partitions are searched (a few ms).
+        """
+        to_rag_event = lambda r: {"extracts": [e.dict() for e in r]}
+        classify = self._timed(timings, "classify", self._emitting(
+            self._classify(message, context), emit, "classification", lambda r: r[0].dict()
+        ))
+        if not settings.rag_routing:
+            classified, rag_extracts = await asyncio.gather(classify, self._timed(timings, "retrieve", self._emitting(
+                self.rag.retrieve(message, db, top_k=5), emit, "rag", to_rag_event
+            )))
+            return classified, rag_extracts, None
+        
+        classified, embedding = await asyncio.gather(classify, self._timed(timings, "embed", self.rag.prepare(message, db)))
+        route = route_for(classified[0])
+        if route is not None:
+            logger.info(f"🧭 Knowledge routed by {route.reason}")
+        rag_extracts = await self._timed(timings, "retrieve", self._emitting(
+            self.rag.retrieve(message, db, top_k=5, route=route, embedding=embedding), emit, "rag", to_rag_event
+        ))
+        return classified, rag_extracts, embedding
+    
+    async def _draft(
+        self,
+        message: str,
+        classification: ClassificationOutput,
+        rag_extracts: list,
+        context: dict,
+        db: AsyncSession,
+        emit: Optional[Callable[[str, dict], Awaitable[None]]] = None,
+        embedding=None
+    ) -> tuple[DraftOutput, str, Optional[DraftCacheLookup]]:
+        """
+        FAQ intents: reuse a verified PASS draft of a paraphrased question
+        (same intent and language, cosine >= draft_cache_similarity, same knowledge corpus).
+        Returns (draft, model used, cache lookup or None when not eligible)
+        embedding: query embedding already computed for retrieval, if any
+        """
+        draft_kwargs = {"on_token": lambda text: emit("token", {"text": text})} if emit else {}
+        if not draft_cache_eligible(classification, context):
+            return await self.drafter.draft(message, classification, rag_extracts, context, **draft_kwargs), self.drafter.model, None
+        
+        if embedding is None:
+            embedding, corpus_version = await asyncio.gather(
+                self.rag.embed_query(message),
+                self.rag.corpus_version(db)
+            )
+        else:
+            corpus_version = await self.rag.corpus_version(db)
+        lookup = self.draft_cache.lookup(classification.intent.value, classification.language, embedding, corpus_version)
+        if lookup.entry is not None:
+            logger.info(f"💾 Draft cache hit: similarity={lookup.similarity:.3f} with \"{lookup.entry.message[:40]}\"")
+            await self._emit(emit, "token", {"text": lookup.entry.draft.reply_text})
+            return lookup.entry.draft, DRAFT_CACHE_MODEL, lookup
+        
+        draft = await self.drafter.draft(message, classification, rag_extracts, context, **draft_kwargs)
+        return draft, self.drafter.model, lookup
+    
+    def _remember_draft(
+        self,
+        lookup: DraftCacheLookup,
+        message: str,
+        draft: DraftOutput,
+        verification: VerificationOutput,
+        timings: dict
+    ):
+        """Store PASS drafts produced on a miss; account saved latency on a hit"""
+        if lookup.entry is not None:
+            self.draft_cache.observe_hit(timings["draft"], timings["verify"], settings.draft_cache_reverify)
+            return
+        self.draft_cache.observe_miss(timings["draft"], timings["verify"])
+        self.draft_cache.store(lookup, message, draft, verification)
+    
+    async def _verify(
+        self,
+        draft: DraftOutput,
+        classification: ClassificationOutput,
+        message: str,
+        context: dict = None
+    ) -> tuple[VerificationOutput, str]:
+        """
+        Risk-tiered verification (settings.verification_policy):
+        - low-risk safe_autopilot intents: local STYLE_GUIDE rule check
+        - otherwise, or if a rule fails: LLM verifier (Opus)
+        Returns (verification, model used)
+        """
+        tier_start = time.perf_counter()
+        tier = "llm"
+        
+        if rules_tier_eligible(classification):
+            message_type = (context or {}).get("message_type", "dm")
+            issues = check_style_rules(draft, message_type)
+            if not issues:
+                VERIFICATION_STATS.record("rules", (time.perf_counter() - tier_start) * 1000)
+                logger.info(f"✅ Verification: rule tier PASS (intent={classification.intent}, risk=low)")
+                return rules_verification(), RULES_MODEL
+            tier = "rules_then_llm"
+            logger.info(f"⚠️  Rule tier failed ({len(issues)} issues), escalating to {self.verifier.model}")
+        
+        verification = await self.verifier.verify(draft, classification, message)
+        VERIFICATION_STATS.record(tier, (time.perf_counter() - tier_start) * 1000)
+        return verification, self.verifier.model
+    
+    async def _classify(self, message: str, context: dict = None) -> tuple[ClassificationOutput, str]:
+        """
+        Classification cache (normalized text + context), then _classify_uncached
+        Returns (classification, model used) - "cache:<model>" on a hit
+        """
+        if not settings.classification_cache:
+            return await self._classify_uncached(message, context)
+        
+        cached = await self.classification_cache.get(message, context)
+        if cached is not None:
+            classification, model = cached
+            logger.info(f"💾 Classification cache hit: intent={classification.intent}")
+            return classification, f"cache:{model}"
+        
+        classification, model = await self._classify_uncached(message, context)
+        if is_fallback_classification(classification):
+            # Transient failure (unparseable output): the next occurrence asks the model again
+            logger.warning(f"⚠️  Fallback classification not cached: {classification.reasoning[:80]}")
+        else:
+            await self.classification_cache.set(message, context, classification, model)
+        return classification, model
+    
+    async def _classify_uncached(self, message: str, context: dict = None) -> tuple[ClassificationOutput, str]:
+        """
+        Keyword fast-path then LLM classifier (settings.classifier_fastpath):
+        - off: LLM only
+        - shadow: LLM always, fast-path result compared for agreement stats
+        - on: confident fast-path result skips the LLM (such runs always go to HITL, see _determine_hitl)
+        Returns (classification, model used)
+        """
+        mode = settings.classifier_fastpath
+        if mode == "off":
+            return await self.classifier.classify(message, context), self.classifier.model
+        
+        # Rebuilt if intents.yaml / risk.yaml were reloaded
+        self.keyword_classifier = get_keyword_classifier()
+        match = self.keyword_classifier.classify(message)
+        if mode == "on" and match.confident:
+            FASTPATH_STATS.record(match, skipped=True)
+            logger.info(f"⚡ Fast-path classification: intent={match.classification.intent} ({match.confidence:.2f}), flags={match.classification.risk_flags}")
+            return match.classification, FASTPATH_MODEL
+        
+        FASTPATH_STATS.record(match, skipped=False)
+        classification = await self.classifier.classify(message, context)
+        if mode == "shadow":
+            FASTPATH_STATS.record_shadow(match, classification)
+        return classification, self.classifier.model
+    
+    @staticmethod
+    def _usage(usage: list, stage: str = None) -> dict:
+        """Token usage (incl. prompt cache read/write) summed over a stage's LLM calls"""
+        entries = [e for e in usage if stage is None or e["stage"] == stage]
+        return {field: sum(e[field] for e in entries) for field in USAGE_FIELDS}
+    
+    @classmethod
+    def _log_usage(cls, usage: list):
+        if not usage:
+            return
+        totals = cls._usage(usage)
+        logger.info(
+            f"💾 LLM usage: {len(usage)} calls, input={totals['input_tokens']} output={totals['output_tokens']} "
+            f"cache_read={totals['cache_read_input_tokens']} cache_write={totals['cache_creation_input_tokens']}"
+        )
+    
+    @staticmethod
+    async def _emit(emit, event: str, data: dict):
+        if emit:
+            await emit(event, data)
+    
+    @classmethod
+    async def _emitting(cls, coro, emit, event: str, to_data: Callable):
+        """Await a stage, then stream its result as soon as it is ready"""
+        result = await coro
+        await cls._emit(emit, event, to_data(result))
+        return result
+    
+    @staticmethod
+    async def _timed(timings: dict, stage: str, coro):
+        """Await a stage and record its duration (ms) in timings + Prometheus histogram"""
+        stage_start = time.perf_counter()
+        try:
+            return await coro
+        except PipelineStageError:
+            raise
+        except Exception as e:
+            raise PipelineStageError(stage, e) from e
+        finally:
+            elapsed = time.perf_counter() - stage_start
+            timings[stage] = round(elapsed * 1000, 2)
+            observe_stage(stage, elapsed)
+    
     def _determine_hitl(
         self,
         classification: ClassificationOutput,
-        verification: VerificationOutput
+        verification: VerificationOutput,
+        classifier_model: str = ""
     ) -> tuple[bool, bool]:
         """
         Determine if HITL required and if autopilot allowed
@@ -117,6 +496,10 @@ class AIPipeline:
         if settings.hitl_required:
             return True, False
         
+        # Keyword fast-path: language and risk were never assessed by a model
+        if is_fastpath_model(classifier_model):
+            return True, False
+        
         # Escalate if critical risks
         critical_flags = get_critical_risk_flags()
         has_critical = any(flag in classification.risk_flags for flag in critical_flags)
@@ -205,13 +588,12 @@ class AIPipeline:
                 "can_autopilot": False
             }
         )
-        await db.commit()
         
         return result.scalar_one()
     
-    async def _log_step(
+    def _log_step(
         self,
-        db: AsyncSession,
+        audit: list,
         message_id: int,
         log_type: str,
         input_data: dict,
@@ -219,23 +601,24 @@ class AIPipeline:
         model_used: str,
         draft_id: int = None
     ):
-        """Log pipeline step for audit"""
+        """Log pipeline step for audit (kept in memory until the run commits)"""
+        audit.append(audit_record(message_id, log_type, input_data, output_data, model_used, draft_id))
+    
+    async def _commit(self, db: AsyncSession, audit: list):
+        """
+        Single commit for the run (AUDIT_LOG_MODE):
+        - transactional: audit rows inserted in the same transaction as the draft
+        - buffered: handed to the background writer once the transaction committed
+        """
+        writer = get_audit_log_writer()
+        if writer is None or settings.audit_log_mode != "buffered":
+            await insert_audit_records(db, audit)
+            await db.commit()
+            return
         
-        await db.execute(
-            text("""
-                INSERT INTO logs (message_id, draft_id, log_type, input_data, output_data, model_used)
-                VALUES (:message_id, :draft_id, :log_type, :input_data, :output_data, :model_used)
-            """),
-            {
-                "message_id": message_id,
-                "draft_id": draft_id,
-                "log_type": log_type,
-                "input_data": json.dumps(input_data),
-                "output_data": json.dumps(output_data),
-                "model_used": model_used
-            }
-        )
         await db.commit()
+        for record in audit:
+            await writer.write(record)
     
     async def should_convert_to_dm(
         self,
@@ -1,34 +1,596 @@
 """
-Service RAG - Retrieval Augmented Generation avec pgvector (MOCK pour tests)
+Service RAG - Retrieval Augmented Generation
+Embeddings BAAI/bge-m3 (sentence-transformers) stockés dans knowledge_docs (pgvector),
+recherche dans un index float32 en mémoire rechargé quand le corpus change
+(exact, éventuellement quantifié int8 / binaire avec rescoring float32 mappé depuis le disque,
+ou IVF approché au-delà de rag_ivf_min_docs si RAG_INDEX_BACKEND=ivf),
+ou directement dans Postgres via un index HNSW / IVFFlat (RAG_INDEX_BACKEND=pgvector).
+Recherche hybride (RAG_HYBRID): BM25 sur titre + contenu fusionné avec le vectoriel (reciprocal rank fusion).
+Routage (RAG_ROUTING): un index par partition (doc_type, category), la classification choisit les partitions.
+Caches (RAG_QUERY_CACHE): embedding par texte normalisé, extraits par (requête, routage, version du corpus).
+Sans sentence-transformers installé: mode MOCK (embeddings nuls, aucun extrait).
 """
 
+import asyncio
+import importlib.util
 import logging
-from typing import List
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
+from sqlalchemy import text
+
+from config import settings
 from models.schemas import RAGExtract
+from services.cache import TTLCache
+from services.chunking import approx_token_count, chunk_text
+from services.classification_cache import normalize_cache_text
+from services.embedding_batcher import EmbeddingBatcher
+from services.knowledge_ingest import content_hash, expand_rows, upsert_docs
+from services.knowledge_routing import Route, routed_doc_types
+from services.lexical_index import BM25Index, reciprocal_rank_fusion
+from services.metrics import CACHE_LOOKUPS
+from services.pg_vector_search import ensure_partition_indexes, ensure_vector_index, nearest_docs, to_pgvector
+from services.vector_index import IVFIndex, PartitionedIndex, QuantizedIndex, VectorIndex
 
 logger = logging.getLogger(__name__)
 
+# Up to this many new / changed docs, the BM25 index is updated in place on the event loop
+LEXICAL_INLINE_SYNC_DOCS = 500
+# Per cached RAGExtract, besides its strings (pydantic object, dict, floats)
+EXTRACT_OVERHEAD_BYTES = 400
+
+
+@dataclass
+class KnowledgeHit:
+    """Payload of an index row: a whole doc, or one chunk of a long doc (parent_id set)"""
+    doc_id: int
+    title: str
+    content: str
+    doc_type: str
+    category: Optional[str]
+    parent_id: Optional[int] = None
+    chunk_index: Optional[int] = None
+
+    def extract(self, score: float) -> RAGExtract:
+        return RAGExtract(
+            doc_id=self.parent_id or self.doc_id,
+            title=self.title,
+            content=self.content,
+            similarity_score=round(score, 4),
+            doc_type=self.doc_type,
+            category=self.category,
+            chunk_index=self.chunk_index
+        )
+
+
+def parse_pgvector(value: str) -> np.ndarray:
+    """pgvector text format '[0.1,0.2,...]' -> float32 array"""
+    return np.fromstring(value.strip("[]"), sep=",", dtype=np.float32)
+
+
+def extracts_nbytes(extracts) -> int:
+    """Estimated resident size of a cached list of extracts"""
+    return sum(
+        sys.getsizeof(extract.title) + sys.getsizeof(extract.content) + EXTRACT_OVERHEAD_BYTES
+        for extract in extracts
+    )
+
+
+def partition_path(path: str, partition: Tuple[Optional[str], Optional[str]]) -> str:
+    """Per-partition variant of an index file path (IVF .npz, quantized vectors .npy)"""
+    root, ext = os.path.splitext(path)
+    slug = re.sub(r"\W+", "_", "-".join(part or "none" for part in partition))
+    return f"{root}.{slug}{ext}"
+
+
 class RAGService:
     def __init__(self):
-        self.embedding_model_name = "BAAI/bge-m3-MOCK"
-        logger.info(f"RAG Service initialized (MOCK - no embeddings)")
-    
-    def embed(self, text: str) -> List[float]:
-        """Mock embedding - returns zeros"""
-        return [0.0] * 1024
-        
+        self.embedding_model_name = settings.embedding_model
+        self.dim = settings.embedding_dim
+        self._model = None
+        # Optional dependency (torch): without it retrieval is a no-op, as in tests / CI
+        self.enabled = importlib.util.find_spec("sentence_transformers") is not None
+        self._model_lock = threading.Lock()
+        # Concurrent query embeddings encoded together in one worker thread
+        self.embedder = EmbeddingBatcher(
+            self.embed_batch,
+            max_batch=settings.embedding_max_batch,
+            max_wait=settings.embedding_max_wait_ms / 1000
+        )
+        # Recurring questions skip the encoder, then the search (results keyed by corpus version)
+        self.embedding_cache = TTLCache(
+            settings.rag_embedding_cache_max_entries,
+            settings.rag_query_cache_ttl_seconds,
+            max_bytes=int(settings.rag_embedding_cache_mb * 1e6),
+            sizeof=lambda vector: vector.nbytes
+        )
+        self.result_cache = TTLCache(
+            settings.rag_result_cache_max_entries,
+            settings.rag_query_cache_ttl_seconds,
+            max_bytes=int(settings.rag_result_cache_mb * 1e6),
+            sizeof=extracts_nbytes
+        )
+        self._results_version: Optional[str] = None
+        self.result_cache_invalidations = 0
+        self._ingested = 0
+
+        self.index: Union[VectorIndex, IVFIndex, QuantizedIndex, PartitionedIndex] = VectorIndex(self.dim)
+        # Full-precision vectors of a quantized index (memory-mapped), one file per worker process
+        # (plus one per partition); the default temp files are removed on close()
+        self.vectors_path = settings.rag_vectors_path or os.path.join(tempfile.gettempdir(), f"rag_vectors_{os.getpid()}.npy")
+        self.lexical = BM25Index()
+        # doc_id -> its row in the in-memory matrix (views, no copy): cosine of lexical-only hits
+        self._doc_vectors: Dict[int, np.ndarray] = {}
+        self.index_version: Optional[str] = None
+        self._index_lock = asyncio.Lock()
+        self._corpus_version: Optional[str] = None
+        self._corpus_checked_at = 0.0
+
+        self.searches = 0
+        self.routed_searches = 0
+        self.search_ms_total = 0.0
+        self.reloads = 0
+        self.last_load_ms = 0.0
+        if self.enabled:
+            logger.info(f"RAG Service initialized (model {self.embedding_model_name}, loaded on first use)")
+        else:
+            logger.warning("⚠️  sentence-transformers not installed: RAG runs in MOCK mode (no extracts)")
+
+    # Embeddings
+
+    def _get_model(self):
+        """SentenceTransformer loaded once, on first embed (slow: always reached from an executor)"""
+        if self._model is None and self.enabled:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info(f"📦 Loading embedding model {self.embedding_model_name}...")
+                    self._model = SentenceTransformer(self.embedding_model_name)
+        return self._model
+
+    def count_tokens(self, text: str) -> int:
+        """Embedding model tokens (approximation before the model is loaded)"""
+        model = self._get_model()
+        if model is None:
+            return approx_token_count(text)
+        return len(model.tokenizer.tokenize(text))
+
+    def chunk(self, content: str) -> List[str]:
+        return chunk_text(content, settings.rag_chunk_max_tokens, settings.rag_chunk_overlap_tokens, self.count_tokens)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Normalized float32 embeddings, one row per text (CPU-bound: call from an executor)"""
+        model = self._get_model()
+        if model is None or not texts:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+        return np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Normalized float32 embedding (CPU-bound: call from an executor); zeros in MOCK mode"""
+        model = self._get_model()
+        if model is None:
+            return np.zeros(self.dim, dtype=np.float32)
+        return np.asarray(model.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embedding of one query without blocking the event loop (micro-batched with concurrent queries),
+        served from the embedding cache when the same normalized text was seen
+        """
+        key = normalize_cache_text(text) if settings.rag_query_cache and self.enabled else None
+        if key is not None:
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                CACHE_LOOKUPS.labels("rag_embedding", "hit_memory").inc()
+                return cached
+            CACHE_LOOKUPS.labels("rag_embedding", "miss").inc()
+        if settings.embedding_batching and self.enabled:
+            embedding = await self.embedder.embed(text)
+        else:
+            embedding = await asyncio.get_running_loop().run_in_executor(None, self.embed, text)
+        if key is not None:
+            # Own copy (a batched row would keep its whole batch alive), shared read-only between requests
+            embedding = np.array(embedding, dtype=np.float32)
+            embedding.setflags(write=False)
+            self.embedding_cache.set(key, embedding)
+        return embedding
+
+    async def close(self):
+        await self.embedder.stop()
+        if not settings.rag_vectors_path:
+            # Per-process temp files: nobody else maps them (mappings stay valid after unlink)
+            self._remove_vectors_files(self._vectors_files())
+
+    # Corpus / index
+
+    async def corpus_version(self, db) -> str:
+        """
+        Changes whenever knowledge docs change (invalidates the index and drafts built on them).
+        The DB is asked at most every rag_corpus_check_seconds, or right after a local ingest.
+        """
+        if not self.enabled:
+            return f"mock-{self._ingested}"
+        now = time.monotonic()
+        if self._corpus_version is None or now - self._corpus_checked_at >= settings.rag_corpus_check_seconds:
+            result = await db.execute(text("""
+                SELECT COUNT(*), COALESCE(MAX(id), 0), MAX(updated_at)
+                FROM knowledge_docs
+            """))
+            count, max_id, updated_at = result.fetchone()
+            stamp = updated_at.strftime("%Y%m%d%H%M%S%f") if updated_at else "0"
+            self._corpus_version = f"docs-{count}-{max_id}-{stamp}"
+            self._corpus_checked_at = now
+        return self._corpus_version
+
+    @property
+    def in_memory(self) -> bool:
+        """Vectors searched in the process (exact / IVF) rather than in Postgres"""
+        return settings.rag_index_backend != "pgvector"
+
+    async def load_index(self, db, version: Optional[str] = None):
+        """
+        Reload of knowledge_docs: embeddings into one contiguous matrix (in-memory backends),
+        BM25 index synced incrementally (only docs whose updated_at changed are re-tokenized)
+        """
+        start = time.perf_counter()
+        result = await db.execute(text(f"""
+            SELECT id, title, content, doc_type, category, parent_id, chunk_index, updated_at{", embedding::text AS embedding" if self.in_memory else ""}
+            FROM knowledge_docs
+            WHERE embedding IS NOT NULL
+            ORDER BY id
+        """))
+        rows = result.fetchall()
+        payloads = [
+            KnowledgeHit(row.id, row.title, row.content, row.doc_type or "", row.category, row.parent_id, row.chunk_index)
+            for row in rows
+        ]
+        version = version or await self.corpus_version(db)
+        loop = asyncio.get_running_loop()
+
+        if self.in_memory:
+            previous_files = self._vectors_files()
+            # Parsing the text embeddings is as CPU-bound as the build: both off the event loop
+            self.index = await loop.run_in_executor(None, self._parse_and_build, rows, payloads, version)
+            # Partitions gone (or quantization turned off) since the last build
+            self._remove_vectors_files(previous_files - self._vectors_files())
+            self._doc_vectors = {
+                hit.doc_id: vector
+                for part in self._sub_indexes()
+                for hit, vector in zip(part.payloads, part.matrix)
+            }
+
+        if settings.rag_hybrid:
+            docs = [(hit.doc_id, hit.title, hit.content, hit, row.updated_at) for hit, row in zip(payloads, rows)]
+            stamps = self.lexical.stamps
+            changed = sum(1 for doc_id, *_, stamp in docs if doc_id not in stamps or stamps[doc_id] != stamp)
+            if changed > LEXICAL_INLINE_SYNC_DOCS:
+                # Large change (first load, bulk ingest): build aside, then swap (searches never see a partial index)
+                lexical = BM25Index()
+                indexed, _ = await loop.run_in_executor(None, lexical.sync, docs)
+                removed = len(stamps.keys() - lexical.stamps.keys())
+                self.lexical = lexical
+            else:
+                indexed, removed = self.lexical.sync(docs)
+            logger.info(f"🔤 BM25 index synced: {indexed} docs (re)indexed, {removed} removed, {len(self.lexical)} total")
+
+        self.index_version = version
+        self.reloads += 1
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"📚 RAG index loaded ({self.backend}): {len(rows)} docs, {self.index.nbytes / 1e6:.1f} MB in {self.last_load_ms:.0f}ms")
+
+    def _parse_and_build(self, rows: list, payloads: List[KnowledgeHit], version: str):
+        vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            vectors[i] = parse_pgvector(row.embedding)
+        build = self._build_partitioned if settings.rag_routing else self._build_index
+        return build(vectors, payloads, version)
+
+    def _build_index(self, vectors: np.ndarray, payloads: List[KnowledgeHit], version: str, partition: Optional[tuple] = None):
+        """
+        Exact index for small corpora (int8 / binary first pass + memory-mapped rescoring if RAG_QUANTIZATION),
+        IVF (reused from rag_index_path when still current) for large ones
+        """
+        if settings.rag_index_backend != "ivf" or len(payloads) < settings.rag_ivf_min_docs:
+            if settings.rag_quantization != "none" and payloads:
+                return QuantizedIndex.build(
+                    vectors,
+                    payloads,
+                    partition_path(self.vectors_path, partition) if partition else self.vectors_path,
+                    mode=settings.rag_quantization,
+                    rescore=settings.rag_rescore_factor
+                )
+            return VectorIndex.build(vectors, payloads, dim=self.dim)
+
+        path = settings.rag_index_path
+        if path and partition:
+            path = partition_path(path, partition)
+        if path:
+            index = IVFIndex.load(path, payloads, version, nprobe=settings.rag_ivf_nprobe)
+            if index is not None:
+                logger.info(f"📂 RAG IVF index reused from {path}")
+                return index
+        index = IVFIndex.build(vectors, payloads, nlist=settings.rag_ivf_nlist, nprobe=settings.rag_ivf_nprobe)
+        if path:
+            try:
+                index.save(path, version)
+            except OSError as e:
+                logger.warning(f"⚠️  Could not persist RAG IVF index to {path}: {e}")
+        return index
+
+    def _build_partitioned(self, vectors: np.ndarray, payloads: List[KnowledgeHit], version: str) -> PartitionedIndex:
+        """One index per (doc_type, category), each sized and typed by _build_index"""
+        groups: Dict[tuple, List[int]] = {}
+        for i, hit in enumerate(payloads):
+            groups.setdefault((hit.doc_type or None, hit.category), []).append(i)
+        return PartitionedIndex({
+            partition: self._build_index(vectors[rows], [payloads[i] for i in rows], version, partition)
+            for partition, rows in groups.items()
+        })
+
+    def _sub_indexes(self) -> list:
+        return list(self.index.parts.values()) if isinstance(self.index, PartitionedIndex) else [self.index]
+
+    def _vectors_files(self) -> set:
+        """Memory-mapped vectors files of the current index (quantized parts)"""
+        return {
+            part.matrix.filename
+            for part in self._sub_indexes()
+            if isinstance(part, QuantizedIndex) and getattr(part.matrix, "filename", None)
+        }
+
+    @staticmethod
+    def _remove_vectors_files(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"⚠️  Could not remove RAG vectors file {path}: {e}")
+
+    @property
+    def backend(self) -> str:
+        if settings.rag_index_backend == "pgvector":
+            return "pgvector"
+        return "ivf" if any(isinstance(part, IVFIndex) for part in self._sub_indexes()) else "exact"
+
+    async def ensure_pg_index(self, db) -> Optional[str]:
+        """
+        pgvector backend: create / rebalance the ANN index on knowledge_docs.embedding,
+        plus one partial index per routed doc_type when RAG_ROUTING (commits)
+        """
+        if settings.rag_index_backend != "pgvector":
+            return None
+        name = await ensure_vector_index(
+            db,
+            settings.rag_pgvector_index,
+            m=settings.rag_hnsw_m,
+            ef_construction=settings.rag_hnsw_ef_construction
+        )
+        if settings.rag_routing:
+            await ensure_partition_indexes(
+                db,
+                settings.rag_pgvector_index,
+                routed_doc_types(),
+                m=settings.rag_hnsw_m,
+                ef_construction=settings.rag_hnsw_ef_construction
+            )
+        await db.commit()
+        return name
+
+    async def _results_cache_version(self, db) -> str:
+        """Corpus version of cached extracts: a new version (ingest, reload) drops every cached result"""
+        version = await self.corpus_version(db)
+        if version != self._results_version:
+            if self._results_version is not None and len(self.result_cache):
+                self.result_cache.clear()
+                self.result_cache_invalidations += 1
+                logger.info(f"♻️  Knowledge corpus changed ({version}): RAG result cache invalidated")
+            self._results_version = version
+        return version
+
+    async def _ensure_index(self, db):
+        version = await self.corpus_version(db)
+        if version == self.index_version:
+            return
+        async with self._index_lock:
+            # Another request may have reloaded while we waited
+            if version != self.index_version:
+                await self.load_index(db, version)
+
+    # Retrieval
+
+    async def prepare(self, query: str, db) -> np.ndarray:
+        """Query embedding, with the index brought up to date meanwhile (runs while the message is classified)"""
+        if not self.enabled:
+            return np.zeros(self.dim, dtype=np.float32)
+        if self.in_memory or settings.rag_hybrid:
+            embedding, _ = await asyncio.gather(self.embed_query(query), self._ensure_index(db))
+            return embedding
+        return await self.embed_query(query)
+
     async def retrieve(
-        self, 
-        query: str, 
+        self,
+        query: str,
         db,
         top_k: int = 5,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        route: Optional[Route] = None,
+        embedding: Optional[np.ndarray] = None
     ) -> List[RAGExtract]:
-        """Mock retrieve - returns empty list"""
-        logger.info(f"RAG retrieve (mock): query='{query[:30]}...'")
-        return []
-            
+        """
+        Top-k knowledge extracts, all with a cosine similarity >= similarity_threshold.
+        In hybrid mode BM25 hits (exact product names, SPF50+, shade numbers...) are merged in
+        by reciprocal rank fusion: they reorder the extracts and can bring in a doc the vector
+        search ranked too low, but a doc found by BM25 alone still has to reach the threshold.
+        ef_search / probes override the pgvector HNSW / IVFFlat settings for this query.
+        route (knowledge_routing.route_for) restricts both searches to its partitions; the best
+        hits of its pinned partitions are always returned. embedding: from prepare().
+        Results are cached per (normalized query, route, parameters, corpus version).
+        """
+        if not self.enabled:
+            logger.info(f"RAG retrieve (mock): query='{query[:30]}...'")
+            return []
+        if similarity_threshold is None:
+            similarity_threshold = settings.rag_similarity_threshold
+        cache_key = None
+        if settings.rag_query_cache:
+            version = await self._results_cache_version(db)
+            cache_key = (normalize_cache_text(query), route, top_k, similarity_threshold, ef_search, probes, version)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                CACHE_LOOKUPS.labels("rag_results", "hit_memory").inc()
+                return list(cached)
+            CACHE_LOOKUPS.labels("rag_results", "miss").inc()
+        hybrid = settings.rag_hybrid
+        candidates = max(top_k, settings.rag_hybrid_candidates) if hybrid else top_k
+        if embedding is None:
+            embedding = await self.prepare(query, db)
+
+        start = time.perf_counter()
+        vector_hits = await self._vector_search(db, embedding, candidates, similarity_threshold, ef_search, probes, route)
+        if hybrid:
+            hits = await self._fuse(db, query, embedding, vector_hits, candidates, top_k, similarity_threshold, route)
+        else:
+            hits = vector_hits[:top_k]
+        if route is not None:
+            if route.pinned:
+                hits = await self._pin(db, embedding, hits, route, top_k, ef_search, probes)
+            self.routed_searches += 1
+        self.searches += 1
+        self.search_ms_total += (time.perf_counter() - start) * 1000
+
+        extracts = [hit.extract(score) for hit, score in hits]
+        if cache_key is not None:
+            self.result_cache.set(cache_key, tuple(extracts))
+        return extracts
+
+    def _partitions(self, route: Optional[Route], pinned: bool = False) -> Optional[list]:
+        """Keys of the in-memory partitions a route searches (None: all)"""
+        if not isinstance(self.index, PartitionedIndex):
+            return None
+        if pinned:
+            return [key for key in self.index.parts if route.matches_pinned(*key)]
+        if route is None or route.partitions is None:
+            return None
+        return [key for key in self.index.parts if route.matches(*key)]
+
+    async def _vector_search(
+        self,
+        db,
+        embedding: np.ndarray,
+        k: int,
+        similarity_threshold: float,
+        ef_search: Optional[int],
+        probes: Optional[int],
+        route: Optional[Route] = None,
+        pinned: bool = False
+    ) -> List[Tuple[KnowledgeHit, float]]:
+        if self.in_memory:
+            if isinstance(self.index, PartitionedIndex):
+                return self.index.search(embedding, k, similarity_threshold, self._partitions(route, pinned), nprobe=probes)
+            if probes and isinstance(self.index, IVFIndex):
+                return self.index.search(embedding, k, similarity_threshold, nprobe=probes)
+            return self.index.search(embedding, k, similarity_threshold)
+
+        doc_types = route.pinned_doc_types() if pinned else (route.doc_types() if route is not None else None)
+        # One query per routed doc_type partition (its partial index), merged by similarity
+        rows = []
+        for doc_type, categories in (doc_types or {None: None}).items():
+            rows.extend(await nearest_docs(
+                db,
+                embedding,
+                k,
+                similarity_threshold,
+                ef_search=ef_search or settings.rag_hnsw_ef_search,
+                probes=probes or settings.rag_ivfflat_probes,
+                doc_type=doc_type,
+                categories=categories
+            ))
+        rows.sort(key=lambda row: row.similarity, reverse=True)
+        return [
+            (KnowledgeHit(row.id, row.title, row.content, row.doc_type or "", row.category, row.parent_id, row.chunk_index), float(row.similarity))
+            for row in rows[:k]
+        ]
+
+    async def _fuse(
+        self,
+        db,
+        query: str,
+        embedding: np.ndarray,
+        vector_hits: List[Tuple[KnowledgeHit, float]],
+        candidates: int,
+        top_k: int,
+        similarity_threshold: float,
+        route: Optional[Route] = None
+    ) -> List[Tuple[KnowledgeHit, float]]:
+        """
+        RRF of vector and BM25 rankings; every hit keeps its cosine similarity as score.
+        BM25-only hits under similarity_threshold are dropped (one shared token is not relevance).
+        """
+        accept = (lambda hit: route.matches(hit.doc_type, hit.category)) if route is not None and route.partitions is not None else None
+        lexical_hits = self.lexical.search(query, candidates, accept)
+        docs = {hit.doc_id: hit for hit, _ in lexical_hits}
+        docs.update((hit.doc_id, hit) for hit, _ in vector_hits)
+        fused = reciprocal_rank_fusion(
+            [[hit.doc_id for hit, _ in vector_hits], [hit.doc_id for hit, _ in lexical_hits]],
+            k=settings.rag_rrf_k
+        )
+        similarities = {hit.doc_id: score for hit, score in vector_hits}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in similarities]
+        if missing:
+            similarities.update(await self._cosine(db, embedding, missing))
+        return [
+            (docs[doc_id], similarities[doc_id])
+            for doc_id, _ in fused
+            if similarities.get(doc_id, -1.0) >= similarity_threshold
+        ][:top_k]
+
+    async def _pin(
+        self,
+        db,
+        embedding: np.ndarray,
+        hits: List[Tuple[KnowledgeHit, float]],
+        route: Route,
+        top_k: int,
+        ef_search: Optional[int],
+        probes: Optional[int]
+    ) -> List[Tuple[KnowledgeHit, float]]:
+        """Best hits of the pinned partitions (e.g. compliance policies on a risk flag) first, whatever their similarity"""
+        pinned = await self._vector_search(
+            db, embedding, settings.rag_routing_pinned_hits, -1.0, ef_search, probes, route, pinned=True
+        )
+        pinned_ids = {hit.doc_id for hit, _ in pinned}
+        return (pinned + [(hit, score) for hit, score in hits if hit.doc_id not in pinned_ids])[:top_k]
+
+    async def _cosine(self, db, embedding: np.ndarray, doc_ids: List[int]) -> Dict[int, float]:
+        """Cosine similarity of the query with docs found by BM25 only"""
+        if self.in_memory:
+            return {
+                doc_id: float(self._doc_vectors[doc_id] @ embedding)
+                for doc_id in doc_ids
+                if doc_id in self._doc_vectors
+            }
+        result = await db.execute(
+            text("""
+                SELECT id, 1 - (embedding <=> CAST(:embedding AS vector))
+                FROM knowledge_docs
+                WHERE id = ANY(:ids)
+            """),
+            {"embedding": to_pgvector(embedding), "ids": doc_ids}
+        )
+        return {doc_id: float(similarity) for doc_id, similarity in result.fetchall()}
+
     async def ingest_document(
         self,
         title: str,
@@ -39,7 +601,70 @@ class RAGService:
         source_file: str = None,
         metadata: dict = None
     ) -> int:
-        """Mock ingest - returns fake ID"""
-        logger.info(f"RAG ingest (mock): {title}")
-        return 1
+        """
+        Embeds and upserts one doc by doc_key with the bulk ingest's writer (knowledge_ingest.upsert_docs),
+        split into chunks when long (previous chunks replaced). No commit: the caller owns the
+        transaction, and the in-memory indexes pick the rows up on the reload after that commit.
+        """
+        self._ingested += 1
+        if not self.enabled:
+            logger.info(f"RAG ingest (mock): {title}")
+            return 1
+
+        doc = {"title": title, "content": content, "doc_type": doc_type, "category": category}
+        doc["content_hash"] = content_hash(doc)
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, expand_rows, doc, self.chunk)
+        embeddings = iter(await loop.run_in_executor(None, self.embed_batch, [row["content"] for row in rows if row["embed"]]))
+        # Same write path as scripts/ingest_knowledge.py (staging + ON CONFLICT, previous chunks replaced)
+        await upsert_docs(db, rows, [next(embeddings) if row["embed"] else None for row in rows])
+        result = await db.execute(text("SELECT id FROM knowledge_docs WHERE doc_key = :doc_key"), {"doc_key": rows[0]["doc_key"]})
+        doc_id = result.scalar_one()
+        # Process-wide indexes (vectors and BM25) are only touched by the reload that follows the
+        # caller's commit: next corpus_version() asks the DB again, a rollback leaves them untouched
+        self._corpus_version = None
+        return doc_id
 
+    def snapshot(self) -> Dict:
+        ivf = next((part for part in self._sub_indexes() if isinstance(part, IVFIndex)), None)
+        quantized = next((part for part in self._sub_indexes() if isinstance(part, QuantizedIndex)), None)
+        return {
+            "enabled": self.enabled,
+            "embedding_model": self.embedding_model_name,
+            "dim": self.dim,
+            "similarity_threshold": settings.rag_similarity_threshold,
+            "corpus_version": self.index_version,
+            "backend": self.backend,
+            "ivf": {"nlist": ivf.nlist, "nprobe": ivf.nprobe} if ivf is not None else None,
+            "quantization": {
+                "mode": quantized.mode,
+                "rescore": quantized.rescore,
+                "mapped_vectors_mb": round(sum(
+                    part.disk_bytes for part in self._sub_indexes() if isinstance(part, QuantizedIndex)
+                ) / 1e6, 2),
+            } if quantized is not None else None,
+            "partitions": {
+                f"{doc_type}/{category}": len(part) for (doc_type, category), part in self.index.parts.items()
+            } if isinstance(self.index, PartitionedIndex) else None,
+            "pgvector": {
+                "index": settings.rag_pgvector_index,
+                "ef_search": settings.rag_hnsw_ef_search,
+                "probes": settings.rag_ivfflat_probes,
+            } if settings.rag_index_backend == "pgvector" else None,
+            "docs": len(self.index),
+            "hybrid": settings.rag_hybrid,
+            "lexical_docs": len(self.lexical),
+            "lexical_terms": len(self.lexical.postings),
+            "index_mb": round(self.index.nbytes / 1e6, 2),
+            "reloads": self.reloads,
+            "last_load_ms": round(self.last_load_ms, 1),
+            "searches": self.searches,
+            "routed_searches": self.routed_searches,
+            "avg_search_ms": round(self.search_ms_total / self.searches, 3) if self.searches else 0.0,
+            "embedding_batcher": self.embedder.snapshot() if settings.embedding_batching else None,
+            "query_cache": {
+                "embeddings": self.embedding_cache.snapshot(),
+                "results": self.result_cache.snapshot(),
+                "invalidations": self.result_cache_invalidations,
+            } if settings.rag_query_cache else None,
+        }
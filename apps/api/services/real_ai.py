@@ -3,17 +3,16 @@ Real Anthropic AI Services - using Claude models
 """
 
 import logging
-from anthropic import Anthropic
 from models.schemas import ClassificationOutput, IntentEnum, RiskLevel, DraftOutput, VerificationOutput
+from services.llm_client import get_async_client, record_usage
 
 logger = logging.getLogger(__name__)
 
-client = Anthropic()
-
 class RealClassifierService:
     """Classify message intent and detect risks using Claude"""
     
-    def __init__(self):
+    def __init__(self, client=None):
+        self.client = client or get_async_client()
         self.model = "claude-haiku-4-5-20251001"
     
     async def classify(self, message: str, context: dict = None) -> ClassificationOutput:
@@ -35,7 +34,7 @@ Respond with JSON only:
   "reasoning": "brief explanation"
 }}"""
             
-            response = client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=500,
                 messages=[
@@ -44,6 +43,7 @@ Respond with JSON only:
             )
             
             import json
+            record_usage("classify", self.model, response)
             response_text = response.content[0].text
             # Extract JSON from response
             try:
@@ -80,10 +80,11 @@ Respond with JSON only:
 class RealDrafterService:
     """Generate reply using Claude"""
     
-    def __init__(self):
+    def __init__(self, client=None):
+        self.client = client or get_async_client()
         self.model = "claude-sonnet-4-5-20250929"
     
-    async def draft(self, message: str, intent: str, rag_docs: list = None) -> DraftOutput:
+    async def draft(self, message: str, intent: str, rag_docs: list = None, on_token=None) -> DraftOutput:
         """Draft a reply to the customer message"""
         try:
             context = ""
@@ -104,7 +105,7 @@ Generate a helpful, professional response that:
 
 Keep response to 1-2 sentences maximum."""
             
-            response = client.messages.create(
+            request = dict(
                 model=self.model,
                 max_tokens=300,
                 messages=[
@@ -112,6 +113,16 @@ Keep response to 1-2 sentences maximum."""
                 ]
             )
             
+            if on_token:
+                # Plain-text reply: forward every fragment as it streams
+                async with self.client.messages.stream(**request) as stream:
+                    async for text in stream.text_stream:
+                        await on_token(text)
+                    response = await stream.get_final_message()
+            else:
+                response = await self.client.messages.create(**request)
+            
+            record_usage("draft", self.model, response)
             reply_text = response.content[0].text
             
             return DraftOutput(
@@ -137,7 +148,8 @@ Keep response to 1-2 sentences maximum."""
 class RealVerifierService:
     """Verify reply for brand safety using Claude"""
     
-    def __init__(self):
+    def __init__(self, client=None):
+        self.client = client or get_async_client()
         self.model = "claude-opus-4-5-20251101"
     
     async def verify(self, reply_text: str, message_context: str) -> VerificationOutput:
@@ -162,7 +174,7 @@ Respond with JSON:
   "suggestions": "improvement suggestions if any"
 }}"""
             
-            response = client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=300,
                 messages=[
@@ -171,6 +183,7 @@ Respond with JSON:
             )
             
             import json
+            record_usage("verify", self.model, response)
             response_text = response.content[0].text
             try:
                 data = json.loads(response_text)
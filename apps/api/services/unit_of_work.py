@@ -0,0 +1,75 @@
+"""
+Unit of work par message traité
+Message + draft + logs d'audit d'un run pipeline sont écrits dans une seule
+transaction (un seul commit). Si un stage échoue: rollback complet, puis
+record_failure() conserve le message et une ligne d'audit "error".
+"""
+
+import json
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.schemas import IncomingMessage
+from services.audit_log import audit_record, insert_audit_records
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStageError(Exception):
+    """A pipeline stage failed; the run's transaction has been rolled back"""
+
+    def __init__(self, stage: str, error: Exception, message_id: Optional[int] = None):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+        self.message_id = message_id
+
+
+def message_row(message: IncomingMessage, message_type: str = None) -> dict:
+    return {
+        "platform": message.platform,
+        "message_type": message_type or message.message_type,
+        "sender_id": message.sender_id,
+        "sender_username": message.sender_username,
+        "content": message.content,
+        "thread_id": message.thread_id,
+        "meta": json.dumps(message.metadata) if message.metadata else '{}'
+    }
+
+
+async def insert_message(db: AsyncSession, row: dict) -> int:
+    """INSERT the message without committing (committed with the pipeline run)"""
+    result = await db.execute(
+        text("""
+            INSERT INTO messages (platform, message_type, sender_id, sender_username, content, thread_id, meta)
+            VALUES (:platform, :message_type, :sender_id, :sender_username, :content, :thread_id, :meta)
+            RETURNING id
+        """),
+        row
+    )
+    return result.scalar_one()
+
+
+async def record_failure(db: AsyncSession, error: PipelineStageError, row: dict = None) -> int:
+    """
+    After a failed (rolled back) run, persist in one commit:
+    - the message, if its INSERT was part of the rolled back transaction (row given)
+    - an "error" audit row with the failed stage
+    Returns the message id the error row refers to.
+    """
+    message_id = error.message_id
+    if row is not None:
+        message_id = await insert_message(db, row)
+
+    await insert_audit_records(db, [audit_record(
+        message_id, "error",
+        {"stage": error.stage},
+        {"error": str(error.error), "error_type": type(error.error).__name__},
+        None
+    )])
+    await db.commit()
+    logger.info(f"🗒️  Recorded failure of message {message_id} at stage {error.stage}")
+    return message_id
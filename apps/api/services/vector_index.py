@@ -0,0 +1,375 @@
+"""
+Index vectoriel en mémoire - similarité cosinus sur des matrices float32 contiguës
+- VectorIndex: recherche exacte, un seul produit matrice-vecteur,
+  top-k par argpartition (O(n)) puis tri des k meilleurs seulement
+- IVFIndex: recherche approchée (IVF-Flat, k-means), persistable en .npz
+- QuantizedIndex: premier passage int8 / binaire en mémoire, rescoring float32 depuis un fichier mappé
+- PartitionedIndex: un sous-index par partition, une recherche filtrée ne parcourt que ses partitions
+"""
+
+import heapq
+import os
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """float32, C-contiguous, unit-norm rows (zero rows stay zero and never match)"""
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class VectorIndex:
+    """
+    Exact nearest neighbours over a preallocated row buffer.
+    add() is amortized O(1) (capacity doubling); search() is one matvec.
+    Each row carries an opaque payload (the document) returned with its score.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((max(capacity, 1), dim), dtype=np.float32)
+        self.size = 0
+        self.payloads: List[Any] = []
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, rows: int):
+        if rows <= self._matrix.shape[0]:
+            return
+        capacity = max(rows, self._matrix.shape[0] * 2)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self.size] = self._matrix[:self.size]
+        self._matrix = grown
+
+    def add(self, vectors, payloads: Sequence[Any]):
+        rows = normalize_rows(vectors)
+        if rows.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {rows.shape[1]} != index dimension {self.dim}")
+        if len(payloads) != rows.shape[0]:
+            raise ValueError("One payload per vector")
+        self._reserve(self.size + rows.shape[0])
+        self._matrix[self.size:self.size + rows.shape[0]] = rows
+        self.size += rows.shape[0]
+        self.payloads.extend(payloads)
+
+    @classmethod
+    def build(cls, vectors, payloads: Sequence[Any], dim: Optional[int] = None) -> "VectorIndex":
+        rows = normalize_rows(vectors) if len(payloads) else np.zeros((0, dim or 0), dtype=np.float32)
+        index = cls(dim or rows.shape[1], capacity=rows.shape[0])
+        if len(payloads):
+            index._matrix[:rows.shape[0]] = rows
+            index.size = rows.shape[0]
+            index.payloads = list(payloads)
+        return index
+
+    def search(self, query, k: int, threshold: float = -1.0) -> List[Tuple[Any, float]]:
+        """(payload, cosine similarity) of the k closest rows with similarity >= threshold"""
+        if self.size == 0:
+            return []
+        vector = np.asarray(query, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return []
+        scores = self.matrix @ (vector / norm)
+        return [
+            (self.payloads[i], float(scores[i]))
+            for i in top_k(scores, k)
+            if scores[i] >= threshold
+        ]
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on unit rows (cosine assignment); returns unit-norm centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(vectors.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        # Empty clusters restart from a random row instead of collapsing to zero
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(vectors.shape[0], int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Approximate nearest neighbours (inverted file, IVF-Flat).
+    Rows are clustered around nlist k-means centroids and stored grouped by list;
+    search() scores the centroids, then scans only the nprobe closest lists.
+    nprobe trades recall for latency (nprobe = nlist is an exact search).
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        matrix: np.ndarray,
+        offsets: np.ndarray,
+        order: np.ndarray,
+        payloads: Sequence[Any],
+        nprobe: int = 8
+    ):
+        self.centroids = centroids
+        self.matrix = matrix
+        self.offsets = offsets
+        # order[i] = position in the build input of stored row i (payloads follow stored rows)
+        self.order = order
+        self.payloads = [payloads[i] for i in order]
+        self.dim = matrix.shape[1]
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.centroids.nbytes
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @classmethod
+    def build(
+        cls,
+        vectors,
+        payloads: Sequence[Any],
+        nlist: int = 0,
+        nprobe: int = 8,
+        iterations: int = 10,
+        train_size: int = 256,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        nlist=0 picks ~sqrt(n) lists. k-means trains on at most train_size rows per list,
+        then every row is assigned to its closest centroid.
+        """
+        rows = normalize_rows(vectors)
+        if len(payloads) != rows.shape[0]:
+            raise ValueError("One payload per vector")
+        if rows.shape[0] == 0:
+            raise ValueError("Cannot build an IVF index without vectors")
+        nlist = min(nlist or max(1, int(np.sqrt(rows.shape[0]))), rows.shape[0])
+
+        rng = np.random.default_rng(seed)
+        sample = rows
+        if rows.shape[0] > nlist * train_size:
+            sample = rows[rng.choice(rows.shape[0], nlist * train_size, replace=False)]
+        centroids = kmeans(sample, nlist, iterations, seed)
+
+        assignments = np.argmax(rows @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=nlist), out=offsets[1:])
+        return cls(centroids, np.ascontiguousarray(rows[order]), offsets, order, payloads, nprobe)
+
+    def search(self, query, k: int, threshold: float = -1.0, nprobe: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """(payload, cosine similarity) of the k closest rows found in the nprobe closest lists"""
+        if len(self) == 0:
+            return []
+        vector = np.asarray(query, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return []
+        vector = vector / norm
+
+        lists = top_k(self.centroids @ vector, min(nprobe or self.nprobe, self.nlist))
+        bounds = [(self.offsets[c], self.offsets[c + 1]) for c in lists]
+        rows = np.concatenate([np.arange(start, end) for start, end in bounds])
+        scores = np.concatenate([self.matrix[start:end] @ vector for start, end in bounds])
+        return [
+            (self.payloads[rows[i]], float(scores[i]))
+            for i in top_k(scores, k)
+            if scores[i] >= threshold
+        ]
+
+    def save(self, path: str, version: str = ""):
+        """Atomic .npz dump (vectors, centroids, lists); payloads are not persisted"""
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            centroids=self.centroids,
+            matrix=self.matrix,
+            offsets=self.offsets,
+            order=self.order,
+            version=np.array(version)
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, payloads: Sequence[Any], version: str = "", nprobe: int = 8) -> Optional["IVFIndex"]:
+        """Index saved for this corpus version and these payloads (build order), or None if stale"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["version"]) != version or data["order"].shape[0] != len(payloads):
+                return None
+            return cls(data["centroids"], data["matrix"], data["offsets"], data["order"], payloads, nprobe)
+
+
+# popcount of every byte value, for Hamming distances on packed bits
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def write_memmap(path: str, vectors: np.ndarray) -> np.ndarray:
+    """Atomically writes vectors to a .npy file and maps it read-only (rows paged in on demand)"""
+    tmp = f"{path}.tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=vectors.shape)
+    out[:] = vectors
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
+
+
+class QuantizedIndex:
+    """
+    Exact-backend variant with compressed first pass:
+    - int8: per-dimension scalar quantization (4x smaller), integer dot products
+    - binary: sign bits packed 8 per byte (32x smaller), Hamming distance in blocks of rows
+    The rescore * k best candidates are rescored against full-precision vectors kept
+    in a memory-mapped .npy file instead of RAM.
+    """
+
+    BLOCK_ROWS = 8192
+
+    def __init__(self, codes: np.ndarray, scale: Optional[np.ndarray], vectors: np.ndarray,
+                 payloads: Sequence[Any], mode: str, rescore: int):
+        self.codes = codes
+        self.scale = scale
+        self.matrix = vectors
+        self.payloads = list(payloads)
+        self.mode = mode
+        self.rescore = rescore
+        self.dim = vectors.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Resident memory of the first pass (codes); full-precision vectors live in the mapped file"""
+        return self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    @property
+    def disk_bytes(self) -> int:
+        return self.matrix.nbytes
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @classmethod
+    def build(cls, vectors, payloads: Sequence[Any], path: str, mode: str = "int8", rescore: int = 4) -> "QuantizedIndex":
+        rows = normalize_rows(vectors)
+        if len(payloads) != rows.shape[0]:
+            raise ValueError("One payload per vector")
+        if mode == "int8":
+            scale = np.abs(rows).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            codes = np.round(rows / scale).astype(np.int8)
+        elif mode == "binary":
+            scale = None
+            codes = np.packbits(rows > 0, axis=1)
+        else:
+            raise ValueError(f"Unknown quantization '{mode}' (expected 'int8' or 'binary')")
+        return cls(codes, scale, write_memmap(path, rows), payloads, mode, rescore)
+
+    def _first_pass(self, vector: np.ndarray) -> np.ndarray:
+        """Approximate scores, higher is closer"""
+        if self.mode == "binary":
+            bits = np.packbits(vector > 0)
+            scores = np.empty(len(self), dtype=np.float32)
+            for start in range(0, len(self), self.BLOCK_ROWS):
+                block = self.codes[start:start + self.BLOCK_ROWS]
+                scores[start:start + len(block)] = -POPCOUNT[block ^ bits].sum(axis=1, dtype=np.int32)
+            return scores
+        # Per-dimension scales folded into the query, quantized too: int8 x int8 with int32 accumulation
+        scaled = vector * self.scale
+        peak = float(np.abs(scaled).max()) or 1.0
+        query_codes = np.round(scaled / peak * 127).astype(np.int8)
+        return np.einsum("ij,j->i", self.codes, query_codes, dtype=np.int32).astype(np.float32)
+
+    def search(self, query, k: int, threshold: float = -1.0, rescore: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """(payload, exact cosine similarity) of the k best rows among the rescore * k first-pass candidates"""
+        if len(self) == 0:
+            return []
+        vector = np.asarray(query, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return []
+        vector = vector / norm
+
+        shortlist = np.sort(top_k(self._first_pass(vector), k * (rescore or self.rescore)))
+        scores = self.matrix[shortlist] @ vector
+        return [
+            (self.payloads[shortlist[i]], float(scores[i]))
+            for i in top_k(scores, k)
+            if scores[i] >= threshold
+        ]
+
+
+class PartitionedIndex:
+    """
+    One sub-index (exact, IVF or quantized) per partition key. A search restricted to some
+    partitions only scans those, so a filter never costs recall (no post-filtering of a global
+    top-k); the per-partition top-k lists are merged by score.
+    """
+
+    def __init__(self, parts: Dict[Hashable, Any]):
+        self.parts = parts
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self.parts.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(part.nbytes for part in self.parts.values())
+
+    @property
+    def payloads(self) -> List[Any]:
+        return [payload for part in self.parts.values() for payload in part.payloads]
+
+    def search(
+        self,
+        query,
+        k: int,
+        threshold: float = -1.0,
+        partitions: Optional[Iterable[Hashable]] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[Any, float]]:
+        """(payload, cosine similarity) of the k closest rows of the given partitions (None: all)"""
+        keys = self.parts.keys() if partitions is None else [key for key in partitions if key in self.parts]
+        hits = []
+        for key in keys:
+            part = self.parts[key]
+            if nprobe and isinstance(part, IVFIndex):
+                hits.extend(part.search(query, k, threshold, nprobe=nprobe))
+            else:
+                hits.extend(part.search(query, k, threshold))
+        return heapq.nlargest(k, hits, key=lambda hit: hit[1])
@@ -0,0 +1,148 @@
+"""
+Politique de vérification par tier de risque
+- tier "rules": check local STYLE_GUIDE (longueur, émojis, "!!!", phrases interdites)
+  pour les intents safe_autopilot à risque faible
+- tier "llm": vérification Opus (risque moyen+, intents sensibles, ou échec des règles)
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, List
+
+from config import settings, get_safe_autopilot_intents
+from models.schemas import (
+    ClassificationOutput, DraftOutput, VerificationOutput, VerdictEnum,
+    Issue, IssueType, IssueSeverity, RiskLevel
+)
+from prompts.system_prompts import STYLE_GUIDE
+from services.keyword_classifier import normalize_keyword_text
+
+logger = logging.getLogger(__name__)
+
+RULES_MODEL = "style-rules"
+
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F300-\U0001FAFF"  # symbols, pictographs, emoticons, transport, extended
+    "\U00002600-\U000027BF"  # misc symbols, dingbats
+    "\U0001F1E6-\U0001F1FF"  # flags
+    "\U0000FE0F"             # variation selector
+    "]"
+)
+SENTENCE_SPLIT = re.compile(r"[.!?]+")
+
+
+def check_style_rules(draft: DraftOutput, message_type: str = "dm") -> List[Issue]:
+    """Fast local checks derived from STYLE_GUIDE; an empty list means the draft passes"""
+    issues = []
+    text = draft.reply_text
+
+    max_length = STYLE_GUIDE["max_length"].get(message_type, STYLE_GUIDE["max_length"]["dm"])
+    if len(text) > max_length:
+        issues.append(Issue(
+            type=IssueType.LENGTH,
+            severity=IssueSeverity.MAJOR,
+            description=f"{len(text)} caractères (max {max_length} pour {message_type})"
+        ))
+
+    if not STYLE_GUIDE["emoji"] and EMOJI_PATTERN.search(text):
+        issues.append(Issue(
+            type=IssueType.TONE,
+            severity=IssueSeverity.MAJOR,
+            description="Émoji interdit par le style guide",
+            location=EMOJI_PATTERN.search(text).group(0)
+        ))
+
+    run = STYLE_GUIDE["max_exclamation_run"] + 1
+    if "!" * run in text:
+        issues.append(Issue(
+            type=IssueType.TONE,
+            severity=IssueSeverity.MINOR,
+            description="Ponctuation excessive",
+            location="!" * run
+        ))
+
+    if text.count("?") > STYLE_GUIDE["max_questions"]:
+        issues.append(Issue(
+            type=IssueType.TONE,
+            severity=IssueSeverity.MINOR,
+            description=f"Plus de {STYLE_GUIDE['max_questions']} question"
+        ))
+
+    for sentence in SENTENCE_SPLIT.split(text):
+        if len(sentence.split()) > STYLE_GUIDE["sentence_max_words"]:
+            issues.append(Issue(
+                type=IssueType.LENGTH,
+                severity=IssueSeverity.MINOR,
+                description=f"Phrase de plus de {STYLE_GUIDE['sentence_max_words']} mots",
+                location=sentence.strip()[:60]
+            ))
+            break
+
+    normalized = normalize_keyword_text(text)
+    for phrase in STYLE_GUIDE["banned_phrases"]:
+        if normalize_keyword_text(phrase) in normalized:
+            issues.append(Issue(
+                type=IssueType.COMPLIANCE,
+                severity=IssueSeverity.CRITICAL,
+                description="Formulation interdite (promesse absolue / médical)",
+                location=phrase
+            ))
+
+    return issues
+
+
+def rules_tier_eligible(classification: ClassificationOutput) -> bool:
+    """Low-risk safe_autopilot intents without any risk flag"""
+    return (
+        settings.verification_policy == "tiered"
+        and classification.intent.value in get_safe_autopilot_intents()
+        and classification.risk_level == RiskLevel.LOW
+        and not classification.risk_flags
+    )
+
+
+def rules_verification() -> VerificationOutput:
+    return VerificationOutput(
+        verdict=VerdictEnum.PASS,
+        reasoning="Rule check STYLE_GUIDE OK (intent safe, risque faible) - vérification Opus non requise"
+    )
+
+
+class VerificationTierStats:
+    """Process-wide per-tier counts and latencies"""
+
+    TIERS = ("rules", "rules_then_llm", "llm")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {tier: 0 for tier in self.TIERS}
+        self.total_ms = {tier: 0.0 for tier in self.TIERS}
+        self.max_ms = {tier: 0.0 for tier in self.TIERS}
+
+    def record(self, tier: str, elapsed_ms: float):
+        with self._lock:
+            self.counts[tier] += 1
+            self.total_ms[tier] += elapsed_ms
+            self.max_ms[tier] = max(self.max_ms[tier], elapsed_ms)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            total = sum(self.counts.values()) or 1
+            return {
+                "policy": settings.verification_policy,
+                "tiers": {
+                    tier: {
+                        "count": self.counts[tier],
+                        "share": round(self.counts[tier] / total, 3),
+                        "avg_ms": round(self.total_ms[tier] / self.counts[tier], 2) if self.counts[tier] else 0.0,
+                        "max_ms": round(self.max_ms[tier], 2)
+                    }
+                    for tier in self.TIERS
+                },
+                "llm_calls_avoided": self.counts["rules"]
+            }
+
+
+VERIFICATION_STATS = VerificationTierStats()
@@ -4,17 +4,17 @@ Service de vérification - Brand-safe check (Claude Opus)
 
 import json
 import logging
-import anthropic
 
 from config import settings
+from services.llm_client import get_async_client, cached_system_prompt, record_usage
 from models.schemas import VerificationOutput, DraftOutput, ClassificationOutput
 from prompts.system_prompts import SYSTEM_VERIFIER
 
 logger = logging.getLogger(__name__)
 
 class VerifierService:
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    def __init__(self, client=None):
+        self.client = client or get_async_client()
         self.model = settings.model_verifier
         
     async def verify(
@@ -50,11 +50,11 @@ Réponse draft à vérifier:
             user_prompt += "\n\nVérifie la conformité et retourne le verdict JSON."
             
             # Call Claude Opus
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=600,
                 temperature=0.5,
-                system=SYSTEM_VERIFIER,
+                system=cached_system_prompt(SYSTEM_VERIFIER),
                 messages=[{
                     "role": "user",
                     "content": user_prompt
@@ -62,6 +62,7 @@ Réponse draft à vérifier:
             )
             
             # Parse JSON
+            record_usage("verify", self.model, response)
             content = response.content[0].text
             logger.debug(f"Verifier raw response: {content[:200]}...")
             
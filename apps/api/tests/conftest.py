@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the API packages the way main.py does (apps/api on sys.path)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from models.schemas import ClassificationOutput
+from services.classification_cache import ClassificationCache
+from services.pipeline import AIPipeline
+
+
+class FlakyClassifier:
+    """Parse-error fallback first, then a real classification"""
+
+    model = "fake-haiku"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def classify(self, message, context=None):
+        self.calls += 1
+        if self.calls == 1:
+            return ClassificationOutput(intent="unknown", intent_confidence=0.5, risk_level="medium",
+                                        should_escalate=True, reasoning="Parse error: Expecting value")
+        return ClassificationOutput(intent="delivery_return", intent_confidence=0.95, risk_level="low")
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "classification_cache", True)
+    monkeypatch.setattr(settings, "classification_cache_backend", "memory")
+    monkeypatch.setattr(settings, "classifier_fastpath", "off")
+    pipeline = AIPipeline(FlakyClassifier(), rag=None, drafter=None, verifier=None)
+    pipeline.classification_cache = ClassificationCache()
+    return pipeline
+
+
+def test_fallback_classification_is_not_cached(pipeline):
+    async def run():
+        first, _ = await pipeline._classify("Où est mon colis ?")
+        second, model = await pipeline._classify("Où est mon colis ?")
+        third, cached_model = await pipeline._classify("Où est mon colis ?")
+        return first, second, model, third, cached_model
+
+    first, second, model, third, cached_model = asyncio.run(run())
+    assert first.intent.value == "unknown"
+    # The fallback was not pinned: the classifier is asked again, and its real answer is cached
+    assert second.intent.value == "delivery_return" and model == "fake-haiku"
+    assert third.intent.value == "delivery_return" and cached_model == "cache:fake-haiku"
+    assert pipeline.classifier.calls == 2
@@ -0,0 +1,21 @@
+import numpy as np
+
+from config import settings
+from models.schemas import DraftOutput, VerdictEnum, VerificationOutput
+from services.draft_cache import SemanticDraftCache
+
+
+def test_cached_draft_is_not_served_in_another_language(monkeypatch):
+    monkeypatch.setattr(settings, "draft_cache_similarity", 0.9)
+    cache = SemanticDraftCache()
+    # Same meaning, multilingual embedder: nearly identical vectors
+    french = np.array([1.0, 0.1, 0.0, 0.0], dtype=np.float32)
+    english = np.array([1.0, 0.12, 0.0, 0.0], dtype=np.float32)
+
+    miss = cache.lookup("delivery_return", "fr", french, "docs-1")
+    cache.store(miss, "Quel est le délai de livraison ?", DraftOutput(reply_text="Comptez 3 à 5 jours ouvrés."),
+                VerificationOutput(verdict=VerdictEnum.PASS))
+
+    assert cache.lookup("delivery_return", "en", english, "docs-1").entry is None
+    hit = cache.lookup("delivery_return", "fr", english, "docs-1")
+    assert hit.entry is not None and hit.entry.draft.reply_text == "Comptez 3 à 5 jours ouvrés."
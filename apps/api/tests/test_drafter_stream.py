@@ -0,0 +1,27 @@
+import json
+
+from services.drafter import ReplyTextStream
+
+
+def stream(chunks):
+    parser = ReplyTextStream()
+    return [parser.feed(chunk) for chunk in chunks]
+
+
+def test_surrogate_pair_split_across_chunks_is_one_code_point():
+    raw = '{"reply_text": "Merci \\uD83D\\uDE00 !", "confidence": 0.9}'
+    for split in range(len(raw) + 1):
+        pieces = stream([raw[:split], raw[split:]])
+        text = "".join(pieces)
+        assert text == "Merci \U0001F600 !"
+        # Every fragment must be sendable as UTF-8 (SSE)
+        for piece in pieces:
+            json.dumps({"text": piece}, ensure_ascii=False).encode("utf-8")
+
+
+def test_lone_surrogate_is_replaced():
+    assert "".join(stream(['{"reply_text": "a\\uD83D" }'])) == "a�"
+
+
+def test_plain_escapes():
+    assert "".join(stream(['{"reply_text": "l\\u00e0\\n\\"ok\\""}'])) == 'là\n"ok"'
@@ -0,0 +1,25 @@
+import pytest
+
+from config import settings
+from models.schemas import ClassificationOutput, VerdictEnum, VerificationOutput
+from services.pipeline import AIPipeline
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "hitl_required", False)
+    return AIPipeline(classifier=None, rag=None, drafter=None, verifier=None)
+
+
+@pytest.mark.parametrize("model, autopilot", [
+    ("claude-haiku", True),
+    ("keyword-fastpath", False),
+    ("cache:keyword-fastpath", False),
+])
+def test_fastpath_classification_never_autopilots(pipeline, model, autopilot):
+    # English message the fast path labelled with the default language and LOW risk
+    classification = ClassificationOutput(intent="availability", intent_confidence=0.95, risk_level="low")
+    verification = VerificationOutput(verdict=VerdictEnum.PASS)
+
+    requires_hitl, can_autopilot = pipeline._determine_hitl(classification, verification, model)
+    assert can_autopilot is autopilot and requires_hitl is not autopilot
@@ -0,0 +1,41 @@
+import asyncio
+
+from models.schemas import IncomingMessage
+from routes.messages import INSERT_CHUNK_ROWS, insert_messages
+
+
+class Result:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(reversed(self.ids))
+
+
+class FakeDB:
+    def __init__(self):
+        self.statements = []
+        self.next_id = 1
+
+    async def execute(self, query, params):
+        rows = len(params) // 7
+        self.statements.append(len(params))
+        ids = list(range(self.next_id, self.next_id + rows))
+        self.next_id += rows
+        return Result(ids)
+
+
+def test_large_batches_stay_under_the_bind_parameter_limit():
+    messages = [
+        IncomingMessage(sender_id=str(i), sender_username=f"user{i}", content=f"message {i}")
+        for i in range(5000)
+    ]
+    db = FakeDB()
+    ids = asyncio.run(insert_messages(db, messages))
+
+    assert ids == list(range(1, 5001))
+    assert len(db.statements) == 2 and max(db.statements) <= 32767
+    assert db.statements[0] == INSERT_CHUNK_ROWS * 7
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from config import settings
+from services import job_queue
+from services.job_queue import InMemoryJobQueue, JobStatus, JobWorkerPool, create_job_queue
+
+
+def test_memory_queue_evicts_finished_jobs_after_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "job_result_ttl_seconds", 60)
+
+    async def scenario():
+        queue = await InMemoryJobQueue().connect()
+        old = await queue.enqueue("process_message", {})
+        await queue.dequeue(0.1)
+        await queue.complete(old["job_id"], {"ok": True})
+        pending = await queue.enqueue("process_message", {})
+
+        queue._finished[old["job_id"]] = time.time() - 61
+        await queue.enqueue("process_message", {})
+        return queue, old["job_id"], pending["job_id"]
+
+    queue, old_id, pending_id = asyncio.run(scenario())
+    assert old_id not in queue._jobs and old_id not in queue._done_events
+    assert queue._jobs[pending_id]["status"] == JobStatus.QUEUED.value
+
+
+def test_memory_queue_caps_finished_jobs(monkeypatch):
+    monkeypatch.setattr(job_queue, "MEMORY_MAX_FINISHED_JOBS", 2)
+
+    async def scenario():
+        queue = await InMemoryJobQueue().connect()
+        ids = []
+        for _ in range(3):
+            job = await queue.enqueue("process_message", {})
+            await queue.dequeue(0.1)
+            await queue.complete(job["job_id"], {})
+            ids.append(job["job_id"])
+        return queue, ids
+
+    queue, ids = asyncio.run(scenario())
+    assert [job_id for job_id in ids if job_id in queue._jobs] == ids[1:]
+
+
+def test_create_job_queue_memory_only_when_configured(monkeypatch):
+    monkeypatch.setattr(settings, "job_queue_backend", "memory")
+    assert asyncio.run(create_job_queue()).backend == "memory"
+
+    monkeypatch.setattr(settings, "job_queue_backend", "rabbit")
+    with pytest.raises(ValueError):
+        asyncio.run(create_job_queue())
+
+
+def test_worker_survives_queue_errors_when_settling_jobs():
+    class FlakyQueue(InMemoryJobQueue):
+        async def fail(self, job_id, error):
+            raise ConnectionError("queue unreachable")
+
+    async def handler(job):
+        if job["payload"]["boom"]:
+            raise RuntimeError("handler failed")
+        return {"ok": True}
+
+    async def scenario():
+        queue = await FlakyQueue().connect()
+        pool = JobWorkerPool(queue, handler, concurrency=1)
+        await pool.start()
+        first = await queue.enqueue("process_message", {"boom": True})
+        second = await queue.enqueue("process_message", {"boom": False})
+        done = await queue.wait(second["job_id"], timeout=5.0)
+        alive = not pool._tasks[0].done()
+        await pool.stop(grace_seconds=2.0)
+        return queue, first["job_id"], done, alive
+
+    queue, first_id, done, alive = asyncio.run(scenario())
+    assert alive
+    assert done["status"] == JobStatus.DONE.value and done["result"] == {"ok": True}
+    assert queue._jobs[first_id]["status"] == JobStatus.RUNNING.value
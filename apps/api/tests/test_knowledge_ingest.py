@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+
+from services.knowledge_ingest import ingest, last_per_key
+
+
+def test_last_per_key_keeps_last_row():
+    batch = [
+        {"doc_key": "faq:1", "title": "Livraison", "content": "v1"},
+        {"title": "Retours", "content": "30 jours", "doc_type": "faq"},
+        {"doc_key": "faq:1", "title": "Livraison", "content": "v2"},
+    ]
+    assert [doc["content"] for doc in last_per_key(batch)] == ["v2", "30 jours"]
+
+
+class Result:
+    def fetchall(self):
+        return []
+
+
+class RecordingDB:
+    def __init__(self):
+        self.staged = []
+
+    async def execute(self, query, params=None):
+        return Result()
+
+    async def commit(self):
+        pass
+
+
+def test_ingest_stages_each_key_once(monkeypatch):
+    db = RecordingDB()
+
+    async def upsert_docs(db, rows, embeddings):
+        db.staged.append([(row["doc_key"], row["content"]) for row in rows])
+
+    monkeypatch.setattr("services.knowledge_ingest.upsert_docs", upsert_docs)
+    docs = [
+        {"doc_key": "faq:1", "title": "Livraison", "content": "v1"},
+        {"doc_key": "faq:2", "title": "Retours", "content": "30 jours"},
+        {"doc_key": "faq:1", "title": "Livraison", "content": "v2"},
+    ]
+    stats = asyncio.run(ingest(db, docs, lambda texts: np.zeros((len(texts), 4), dtype=np.float32)))
+
+    assert db.staged == [[("faq:1", "v2"), ("faq:2", "30 jours")]]
+    assert stats.duplicates == 1 and stats.embedded == 2
+
+
+class IdResult:
+    def scalar_one(self):
+        return 42
+
+
+class LookupDB:
+    async def execute(self, query, params=None):
+        return IdResult()
+
+
+def test_rag_ingest_document_uses_the_bulk_writer(monkeypatch):
+    from services.rag import RAGService
+
+    staged = []
+
+    async def upsert_docs(db, rows, embeddings):
+        staged.extend((row["doc_key"], row["parent_key"], embedding is not None) for row, embedding in zip(rows, embeddings))
+
+    monkeypatch.setattr("services.rag.upsert_docs", upsert_docs)
+    rag = RAGService()
+    rag.enabled = True
+    monkeypatch.setattr(rag, "chunk", lambda content: content.split("|"))
+    monkeypatch.setattr(rag, "embed_batch", lambda texts: np.ones((len(texts), 4), dtype=np.float32))
+
+    doc_id = asyncio.run(rag.ingest_document("Retours", "30 jours|remboursement sous 14 jours", "faq", "retours", LookupDB()))
+
+    assert doc_id == 42
+    assert staged == [("faq:Retours", None, False), ("faq:Retours#0", "faq:Retours", True), ("faq:Retours#1", "faq:Retours", True)]
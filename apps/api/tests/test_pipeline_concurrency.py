@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+from config import settings
+from models.schemas import ClassificationOutput
+from services.pipeline import AIPipeline
+
+STAGE_SECONDS = 0.2
+
+
+class SlowRAG:
+    async def prepare(self, message, db):
+        await asyncio.sleep(STAGE_SECONDS)
+        return [1.0, 0.0]
+
+    async def retrieve(self, message, db, top_k=5, route=None, embedding=None):
+        if embedding is None:
+            await asyncio.sleep(STAGE_SECONDS)
+        return []
+
+
+@pytest.mark.parametrize("routing", [False, True])
+def test_classify_and_retrieve_overlap(monkeypatch, routing):
+    monkeypatch.setattr(settings, "rag_routing", routing)
+    pipeline = AIPipeline(classifier=None, rag=SlowRAG(), drafter=None, verifier=None)
+
+    async def classify(message, context=None):
+        await asyncio.sleep(STAGE_SECONDS)
+        return ClassificationOutput(intent="delivery_return", intent_confidence=0.9, risk_level="low"), "fake-haiku"
+
+    monkeypatch.setattr(pipeline, "_classify", classify)
+    timings = {}
+
+    async def run():
+        start = time.perf_counter()
+        await pipeline._classify_and_retrieve("Où est mon colis ?", None, db=None, timings=timings)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    # max(a, b), not a + b: a refactor serializing the stages fails here
+    assert elapsed < STAGE_SECONDS * 1.5
+    assert timings["classify"] >= STAGE_SECONDS * 1000 * 0.9
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from config import settings
+from services.rag import RAGService
+
+Row = namedtuple("Row", "id title content doc_type category parent_id chunk_index updated_at embedding")
+STAMP = datetime.datetime(2026, 1, 1)
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, query, params=None):
+        if "COUNT(*)" in str(query):
+            return Result([(len(self.rows), len(self.rows), STAMP)])
+        return Result(self.rows)
+
+
+def pgvector(values):
+    return "[" + ",".join(str(x) for x in values) + "]"
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    for name, value in {
+        "embedding_dim": 4, "rag_index_backend": "exact", "rag_quantization": "none",
+        "rag_hybrid": True, "rag_routing": False, "rag_query_cache": False,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    service = RAGService()
+    service.enabled = True
+    return service
+
+
+def test_lexical_only_hits_below_threshold_are_dropped(rag):
+    query = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+    db = FakeDB([
+        Row(1, "Livraison standard", "3 à 5 jours ouvrés", "faq", "livraison", None, None, STAMP, pgvector([0.9, 0.1, 0, 0])),
+        # Shares the token "livraison" with the query, but off-topic (cosine < 0)
+        Row(2, "Rouge à lèvres livraison offerte", "Teinte 145", "product", "maquillage", None, None, STAMP, pgvector([-0.2, 1, 0, 0])),
+    ])
+
+    async def run():
+        await rag.load_index(db)
+        return await rag.retrieve("délai de livraison", db, top_k=5, similarity_threshold=0.7, embedding=query)
+
+    extracts = asyncio.run(run())
+    assert [extract.doc_id for extract in extracts] == [1]
+    assert all(extract.similarity_score >= 0.7 for extract in extracts)
+
+
+def test_quantized_vectors_files_are_removed(rag, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "rag_vectors_path", "")
+    monkeypatch.setattr(settings, "rag_quantization", "int8")
+    monkeypatch.setattr(settings, "rag_routing", True)
+    rag.vectors_path = str(tmp_path / "rag_vectors.npy")
+    rows = [
+        Row(1, "Livraison standard", "3 à 5 jours ouvrés", "faq", "livraison", None, None, STAMP, pgvector([0.9, 0.1, 0, 0])),
+        Row(2, "Rouge à lèvres", "Teinte 145", "product", "maquillage", None, None, STAMP, pgvector([-0.2, 1, 0, 0])),
+    ]
+
+    async def run():
+        await rag.load_index(FakeDB(rows))
+        both = sorted(path.name for path in tmp_path.iterdir())
+        # The product partition disappears: its file goes with it
+        await rag.load_index(FakeDB(rows[:1]))
+        rebuilt = sorted(path.name for path in tmp_path.iterdir())
+        await rag.close()
+        return both, rebuilt
+
+    both, rebuilt = asyncio.run(run())
+    assert both == ["rag_vectors.faq_livraison.npy", "rag_vectors.product_maquillage.npy"]
+    assert rebuilt == ["rag_vectors.faq_livraison.npy"]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,79 @@
+"""
+Rappel@k et latence de l'index approché (IVFIndex) contre la recherche exacte (VectorIndex)
+Corpus synthétique regroupé en thèmes (comme un catalogue produits + FAQ), requêtes = paraphrases
+bruitées de documents; rappel = part du top-k exact retrouvée par l'IVF, pour chaque nprobe.
+"""
+
+import argparse
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+import numpy as np
+
+from services.vector_index import IVFIndex, VectorIndex, normalize_rows
+
+QUERIES = 200
+TOP_K = 5
+
+
+def clustered_corpus(size: int, dim: int, topics: int, spread: float, rng) -> np.ndarray:
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    noise = rng.standard_normal((size, dim), dtype=np.float32) * spread
+    return normalize_rows(centers[rng.integers(0, topics, size)] + noise)
+
+
+def timed_search(index, queries, **kwargs):
+    results, samples = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query, TOP_K, **kwargs)
+        samples.append(time.perf_counter() - start)
+        results.append({payload for payload, _ in hits})
+    return results, np.array(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1024, help="1024 = bge-m3")
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=1.2, help="within-topic noise (higher = harder)")
+    parser.add_argument("--query-noise", type=float, default=0.05)
+    parser.add_argument("--nlist", type=int, default=0, help="0 = ~sqrt(size)")
+    parser.add_argument("--nprobes", default="1,2,4,8,16,32,64")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_corpus(args.size, args.dim, args.topics, args.spread, rng)
+    picks = vectors[rng.integers(0, args.size, QUERIES)]
+    queries = normalize_rows(picks + rng.standard_normal(picks.shape, dtype=np.float32) * args.query_noise)
+    payloads = list(range(args.size))
+
+    exact = VectorIndex.build(vectors, payloads)
+    start = time.perf_counter()
+    ivf = IVFIndex.build(vectors, payloads, nlist=args.nlist)
+    build_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ivf.npz")
+        ivf.save(path, "bench")
+        start = time.perf_counter()
+        IVFIndex.load(path, payloads, "bench")
+        load_s = time.perf_counter() - start
+
+    print(f"{args.size} x {args.dim}, {args.topics} topics, top-{TOP_K}, {QUERIES} queries")
+    print(f"IVF nlist={ivf.nlist}: build {build_s:.1f}s, reload from .npz {load_s * 1000:.0f}ms\n")
+
+    truth, ms = timed_search(exact, queries)
+    print(f"{'exact':<12} recall@{TOP_K}=1.000   p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms")
+    for nprobe in (int(n) for n in args.nprobes.split(",")):
+        found, ms = timed_search(ivf, queries, nprobe=nprobe)
+        recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+        print(f"nprobe={nprobe:<5} recall@{TOP_K}={recall:.3f}   p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Commits et temps DB par message traité: unit of work vs commit par step
+- par défaut: session simulée (latence execute / commit configurable)
+- --real-db: Postgres de DATABASE_URL, commits comptés via les events SQLAlchemy
+  (tables créées par l'API au démarrage)
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+from bench_pipeline_concurrency import build_pipeline, LATENCY
+from models.schemas import IncomingMessage
+from services.audit_log import audit_record, insert_audit_records
+from services.unit_of_work import message_row, insert_message
+
+# Simulated DB costs: a statement round-trip vs a commit (round-trip + WAL flush)
+EXECUTE_LATENCY = 0.001
+COMMIT_LATENCY = 0.004
+MESSAGES = 50
+
+MESSAGE = IncomingMessage(
+    platform="instagram",
+    message_type="dm",
+    sender_id="bench",
+    sender_username="bench",
+    content="Quel est le délai de livraison ?"
+)
+
+
+class _Result:
+    def scalar_one(self):
+        return 1
+
+
+class CountingSession:
+    """AsyncSession stand-in counting statements, commits and time spent in the DB"""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        self.db_time = 0.0
+
+    async def execute(self, *args, **kwargs):
+        start = time.perf_counter()
+        await asyncio.sleep(EXECUTE_LATENCY)
+        self.statements += 1
+        self.db_time += time.perf_counter() - start
+        return _Result()
+
+    async def commit(self):
+        start = time.perf_counter()
+        await asyncio.sleep(COMMIT_LATENCY)
+        self.commits += 1
+        self.db_time += time.perf_counter() - start
+
+    async def rollback(self):
+        pass
+
+
+async def unit_of_work_run(pipeline, db):
+    """Current /api/messages/process flow: message + pipeline run, one commit"""
+    message_id = await insert_message(db, message_row(MESSAGE))
+    await pipeline.process(MESSAGE.content, message_id, db)
+
+
+async def per_step_commit_run(pipeline, db):
+    """
+    DB traffic of the previous flow, replayed with the same statements:
+    message, draft and each of the 3 audit rows committed separately
+    """
+    message_id = await insert_message(db, message_row(MESSAGE))
+    await db.commit()
+    # LLM stages still run; only their DB writes are replayed below
+    classification, _ = await pipeline._classify(MESSAGE.content)
+    draft = await pipeline.drafter.draft(MESSAGE.content, classification, [])
+    draft_id = await pipeline._save_draft(db, message_id, draft, classification, [])
+    await db.commit()
+    verification = await pipeline.verifier.verify(draft, classification, MESSAGE.content)
+    for log_type, output in (("classify", classification), ("draft", draft), ("verify", verification)):
+        await insert_audit_records(db, [audit_record(message_id, log_type, {}, json.loads(output.json()), "bench", draft_id)])
+        await db.commit()
+
+
+async def bench_simulated(pipeline):
+    print(f"Simulated DB: execute={EXECUTE_LATENCY * 1000:.1f}ms commit={COMMIT_LATENCY * 1000:.1f}ms, {MESSAGES} messages\n")
+    results = {}
+    for name, run in (("per-step commits (before)", per_step_commit_run), ("unit of work", unit_of_work_run)):
+        sessions = [CountingSession() for _ in range(MESSAGES)]
+        start = time.perf_counter()
+        for db in sessions:
+            await run(pipeline, db)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "commits/msg": sum(s.commits for s in sessions) / MESSAGES,
+            "statements/msg": sum(s.statements for s in sessions) / MESSAGES,
+            "db_ms/msg": round(sum(s.db_time for s in sessions) / MESSAGES * 1000, 2),
+            "wall_ms": round(elapsed * 1000, 1),
+        }
+        print(f"{name:<28} {json.dumps(results[name])}")
+
+    before, after = results["per-step commits (before)"], results["unit of work"]
+    print(f"\n✅ Commits per message: {before['commits/msg']:.0f} → {after['commits/msg']:.0f}, "
+          f"DB time per message: {before['db_ms/msg']:.1f}ms → {after['db_ms/msg']:.1f}ms")
+
+
+async def bench_real_db(pipeline):
+    from sqlalchemy import event
+    from db.database import engine, AsyncSessionLocal
+
+    counts = {"commits": 0, "statements": 0}
+    event.listen(engine.sync_engine, "commit", lambda conn: counts.__setitem__("commits", counts["commits"] + 1))
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda *args: counts.__setitem__("statements", counts["statements"] + 1)
+    )
+
+    print(f"Real DB ({engine.url.render_as_string(hide_password=True)}), {MESSAGES} messages\n")
+    for name, run in (("per-step commits (before)", per_step_commit_run), ("unit of work", unit_of_work_run)):
+        counts.update(commits=0, statements=0)
+        start = time.perf_counter()
+        for _ in range(MESSAGES):
+            async with AsyncSessionLocal() as db:
+                await run(pipeline, db)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} commits/msg={counts['commits'] / MESSAGES:.1f} "
+              f"statements/msg={counts['statements'] / MESSAGES:.1f} ms/msg={elapsed / MESSAGES * 1000:.1f}")
+    await engine.dispose()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--real-db", action="store_true", help="Use DATABASE_URL instead of a simulated session")
+    args = parser.parse_args()
+
+    # No model latency: isolate DB cost
+    for stage in LATENCY:
+        LATENCY[stage] = 0.0
+    pipeline = build_pipeline()
+
+    if args.real_db:
+        await bench_real_db(pipeline)
+    else:
+        await bench_simulated(pipeline)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
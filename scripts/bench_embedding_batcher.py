@@ -0,0 +1,92 @@
+"""
+Embeddings de requêtes sous charge: un encode() par requête dans l'executor vs micro-batching (EmbeddingBatcher)
+Débit et latences p50/p99 par niveau de concurrence. Modèle réel si sentence-transformers est installé
+(--model), sinon coût d'encode simulé: surcoût fixe par appel + coût par texte (GIL relâché comme torch).
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+import numpy as np
+
+from services.embedding_batcher import EmbeddingBatcher
+
+QUERIES = [
+    "J'ai des rougeurs depuis que j'utilise votre crème",
+    "Combien de temps pour recevoir ma commande ?",
+    "Quelle teinte de fond de teint pour une peau claire ?",
+    "Le code promo ne marche pas sur mon panier",
+    "Je suis enceinte, je peux utiliser le sérum ?",
+    "Mes cheveux sont cassants après ma coloration",
+]
+
+
+def load_encode(args):
+    """encode(texts) -> normalized float32 matrix, and a label"""
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(args.model)
+
+        def encode(texts):
+            return np.asarray(model.encode(texts, batch_size=len(texts), normalize_embeddings=True), dtype=np.float32)
+        encode(QUERIES)  # warm-up
+        return encode, args.model
+
+    def encode(texts):
+        time.sleep(args.call_ms / 1000 + args.text_ms / 1000 * len(texts))
+        vectors = np.random.default_rng(len(texts)).standard_normal((len(texts), args.dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return encode, f"simulated ({args.call_ms}ms/call + {args.text_ms}ms/text)"
+
+
+async def run_load(embed, concurrency: int, requests: int):
+    """concurrency clients each sending requests // concurrency queries back to back"""
+    latencies = []
+
+    async def client(worker: int):
+        for i in range(requests // concurrency):
+            start = time.perf_counter()
+            await embed(QUERIES[(worker + i) % len(QUERIES)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.array(latencies) * 1000
+
+
+async def main(args):
+    encode, label = load_encode(args)
+    print(f"Query embeddings, encoder: {label}, max_batch={args.max_batch}, max_wait={args.max_wait_ms}ms\n")
+    loop = asyncio.get_running_loop()
+
+    async def per_request(text):
+        return (await loop.run_in_executor(None, encode, [text]))[0]
+
+    for concurrency in args.concurrency:
+        requests = max(args.requests, concurrency)
+        batcher = EmbeddingBatcher(encode, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+        for name, embed in (("executor", per_request), ("batcher", batcher.embed)):
+            throughput, ms = await run_load(embed, concurrency, requests)
+            print(f"  c={concurrency:<4} {name:<9} {throughput:8.0f} req/s  "
+                  f"p50={np.percentile(ms, 50):7.2f}ms p99={np.percentile(ms, 99):7.2f}ms")
+        stats = batcher.snapshot()
+        await batcher.stop()
+        print(f"  {'':<6} avg batch {stats['avg_batch_size']}, {stats['batches']} encode calls\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="", help="sentence-transformers model (default: simulated encoder)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=512, help="queries per concurrency level")
+    parser.add_argument("--max-batch", type=int, default=int(os.getenv("EMBEDDING_MAX_BATCH", "32")))
+    parser.add_argument("--max-wait-ms", type=float, default=float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5")))
+    parser.add_argument("--call-ms", type=float, default=8.0, help="simulated fixed cost per encode call")
+    parser.add_argument("--text-ms", type=float, default=0.5, help="simulated cost per text")
+    parser.add_argument("--dim", type=int, default=1024)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Pertinence et latence: vectoriel seul vs BM25 seul vs hybride (reciprocal rank fusion)
+Corpus = KNOWLEDGE_DOCS de seed_db.py + catalogue synthétique (noms de gammes, teintes, SPF, codes promo).
+Deux familles de requêtes annotées: questions paraphrasées (sémantique) et tokens exacts
+(nom de produit, "teinte 145", "SPF50+", code promo). Embeddings réels: sentence-transformers requis.
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+import numpy as np
+
+from seed_db import KNOWLEDGE_DOCS
+from services.lexical_index import BM25Index, reciprocal_rank_fusion
+from services.vector_index import VectorIndex
+
+TOP_K = 5
+CANDIDATES = 20
+
+SEMANTIC_QUERIES = [
+    ("J'ai des rougeurs et ça gratte depuis que j'utilise votre crème", "Politique de réponse allergies"),
+    ("Je suis enceinte, je peux utiliser vos soins ?", "Politique grossesse/allaitement"),
+    ("Combien de temps pour recevoir ma commande ?", "FAQ - Livraison standard"),
+    ("Je veux renvoyer un produit, comment faire ?", "FAQ - Retours et remboursements"),
+    ("Comment marchent les points de fidélité ?", "FAQ - Programme fidélité"),
+    ("Quelle crème pour les rides ?", "Revitalift Filler HA - Soin anti-âge"),
+    ("Mes cheveux sont cassants après ma couleur", "Elseve Bond Repair - Shampooing réparateur"),
+    ("Quoi mettre au soleil pour ne pas brûler ?", "UV Defender SPF50+ - Protection solaire"),
+    ("J'ai des boutons, quelle routine ?", "Routine peau acnéique"),
+    ("Comment choisir la bonne couleur de fond de teint ?", "Guide choix fond de teint"),
+]
+
+LINES = ["Revitalift", "Infaillible", "Elseve", "Age Perfect", "Men Expert", "Casting", "Paradise", "Bright Reveal",
+         "Hydra Genius", "Pure Clay", "Color Riche", "Excellence", "True Match", "Skin Paradise"]
+KINDS = [("crème", "soin visage"), ("sérum", "soin visage"), ("fond de teint", "maquillage"), ("rouge à lèvres", "maquillage"),
+         ("shampooing", "cheveux"), ("coloration", "coloration"), ("fluide solaire", "solaire"), ("gel", "homme")]
+BENEFITS = ["hydratant", "anti-âge", "éclat", "matifiant", "réparateur", "longue tenue", "protecteur", "apaisant"]
+
+
+def synthetic_catalog(size: int, rng):
+    """Products whose distinguishing facts are exact tokens (shade, SPF, promo code)"""
+    docs, exact_queries = [], []
+    for i in range(size):
+        line = LINES[i % len(LINES)]
+        kind, category = KINDS[rng.integers(len(KINDS))]
+        benefit = BENEFITS[rng.integers(len(BENEFITS))]
+        shade = 100 + i
+        spf = int(rng.choice([15, 30, 50]))
+        code = f"BEAUTE{i:05d}"
+        title = f"{line} {kind} {benefit} teinte {shade}"
+        content = (f"{kind.capitalize()} {benefit} de la gamme {line}, teinte {shade}, SPF{spf}. "
+                   f"Code promo {code} valable ce mois-ci. Texture légère, tous types de peau.")
+        docs.append({"title": title, "content": content, "doc_type": "product", "category": category})
+        if i % max(size // 50, 1) == 0:
+            exact_queries.append((f"Vous avez encore la teinte {shade} en {kind} ?", title))
+            exact_queries.append((f"Le code {code} marche sur quel produit ?", title))
+    return docs, exact_queries
+
+
+def evaluate(name: str, search, queries, titles):
+    ranks, samples = [], []
+    for query, embedding, expected in queries:
+        start = time.perf_counter()
+        hits = search(query, embedding)
+        samples.append(time.perf_counter() - start)
+        found = [titles[doc_id] for doc_id in hits]
+        ranks.append(found.index(expected) + 1 if expected in found else None)
+    recall = np.mean([rank is not None for rank in ranks])
+    mrr = np.mean([1 / rank if rank else 0 for rank in ranks])
+    ms = np.array(samples) * 1000
+    print(f"  {name:<8} recall@{TOP_K}={recall:.2f}  MRR@{TOP_K}={mrr:.2f}  "
+          f"p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog", type=int, default=5000, help="synthetic product docs added to the seed")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3"))
+    parser.add_argument("--rrf-k", type=int, default=60)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    rng = np.random.default_rng(0)
+    catalog, exact_queries = synthetic_catalog(args.catalog, rng)
+    docs = KNOWLEDGE_DOCS + catalog
+    titles = [doc["title"] for doc in docs]
+
+    print(f"📦 Encoding {len(docs)} docs with {args.model}...")
+    model = SentenceTransformer(args.model)
+    vectors = model.encode([doc["content"] for doc in docs], batch_size=64, normalize_embeddings=True)
+    vector_index = VectorIndex.build(vectors, list(range(len(docs))))
+    lexical = BM25Index()
+    for doc_id, doc in enumerate(docs):
+        lexical.add(doc_id, doc["title"], doc["content"], doc_id)
+
+    def vector_search(query, embedding):
+        return [doc_id for doc_id, _ in vector_index.search(embedding, TOP_K)]
+
+    def lexical_search(query, embedding):
+        return [doc_id for doc_id, _ in lexical.search(query, TOP_K)]
+
+    def hybrid_search(query, embedding):
+        rankings = [
+            [doc_id for doc_id, _ in vector_index.search(embedding, CANDIDATES)],
+            [doc_id for doc_id, _ in lexical.search(query, CANDIDATES)],
+        ]
+        return [doc_id for doc_id, _ in reciprocal_rank_fusion(rankings, k=args.rrf_k, limit=TOP_K)]
+
+    for label, labeled in (("semantic", SEMANTIC_QUERIES), ("exact tokens", exact_queries)):
+        embeddings = model.encode([query for query, _ in labeled], normalize_embeddings=True)
+        queries = [(query, embedding, expected) for (query, expected), embedding in zip(labeled, embeddings)]
+        print(f"\n{label} queries ({len(queries)}), {len(docs)} docs, top-{TOP_K}")
+        for name, search in (("vector", vector_search), ("bm25", lexical_search), ("hybrid", hybrid_search)):
+            evaluate(name, search, queries, titles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Vérifie que des appels concurrents à AIPipeline.process se chevauchent
+Simule la latence Anthropic avec un faux client async (aucun appel réseau)
+"""
+
+import asyncio
+import json
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+from services.classifier import ClassifierService
+from services.drafter import DrafterService
+from services.verifier import VerifierService
+from services.rag import RAGService
+from services.pipeline import AIPipeline
+
+# Fake model latency per stage (seconds)
+LATENCY = {"classifier": 0.2, "drafter": 0.4, "verifier": 0.3}
+DB_LATENCY = 0.02
+CONCURRENCY = 10
+
+RESPONSES = {
+    "classifier": {
+        "intent": "recommendation",
+        "intent_confidence": 0.93,
+        "risk_flags": [],
+        "risk_level": "low",
+        "language": "fr",
+        "reasoning": "bench"
+    },
+    "drafter": {
+        "reply_text": "La livraison standard prend 3 à 5 jours ouvrés. Souhaitez-vous le lien de suivi ?",
+        "confidence": 0.9
+    },
+    "verifier": {
+        "verdict": "PASS",
+        "issues": [],
+        "reasoning": "bench"
+    }
+}
+
+
+class _Block:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Response:
+    def __init__(self, text):
+        self.content = [_Block(text)]
+
+
+class FakeMessages:
+    def __init__(self, stage):
+        self.stage = stage
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(LATENCY[self.stage])
+        return _Response(json.dumps(RESPONSES[self.stage], ensure_ascii=False))
+
+
+class FakeAsyncClient:
+    def __init__(self, stage):
+        self.messages = FakeMessages(stage)
+
+
+class _Result:
+    def scalar_one(self):
+        return 1
+
+
+class FakeSession:
+    """Minimal AsyncSession stand-in: every statement succeeds after DB_LATENCY"""
+
+    async def execute(self, *args, **kwargs):
+        await asyncio.sleep(DB_LATENCY)
+        return _Result()
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def build_pipeline() -> AIPipeline:
+    return AIPipeline(
+        classifier=ClassifierService(client=FakeAsyncClient("classifier")),
+        rag=RAGService(),
+        drafter=DrafterService(client=FakeAsyncClient("drafter")),
+        verifier=VerifierService(client=FakeAsyncClient("verifier")),
+    )
+
+
+async def main():
+    pipeline = build_pipeline()
+    sequential_estimate = sum(LATENCY.values())
+
+    start = time.perf_counter()
+    processed = await pipeline.process("Quel est le délai de livraison ?", 1, FakeSession())
+    single = time.perf_counter() - start
+    timings = processed.stage_timings_ms
+    stages_sum = sum(v for k, v in timings.items() if k != "total")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        pipeline.process(f"Quel est le délai de livraison ? #{i}", i, FakeSession())
+        for i in range(CONCURRENCY)
+    ])
+    concurrent = time.perf_counter() - start
+
+    print(f"\n⏱️  Stage timings (ms):     {timings}")
+    print(f"⏱️  Single run:            {single * 1000:.0f} ms (sum of stages {stages_sum:.0f} ms, model latency {sequential_estimate * 1000:.0f} ms)")
+    print(f"⏱️  {CONCURRENCY} concurrent runs:    {concurrent * 1000:.0f} ms")
+    print(f"⏱️  If runs were serialized: {single * CONCURRENCY * 1000:.0f} ms")
+
+    # Runs overlap if N concurrent runs take well under N x a single run
+    assert concurrent < single * 2, "Pipeline runs did not overlap - event loop is blocked"
+    print("✅ Concurrent pipeline runs overlap (event loop not blocked)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Mémoire et rappel des embeddings quantifiés (QuantizedIndex) contre la recherche exacte float32
+Premier passage int8 ou binaire en RAM, rescoring des rescore * k candidats sur les vecteurs float32
+d'un fichier mappé. Corpus synthétique regroupé en thèmes, à la taille du corpus (docs + chunks).
+"""
+
+import argparse
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+import numpy as np
+
+from services.vector_index import QuantizedIndex, VectorIndex, normalize_rows
+
+QUERIES = 200
+TOP_K = 5
+
+
+def clustered_corpus(size: int, dim: int, topics: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    return normalize_rows(centers[rng.integers(0, topics, size)] + rng.standard_normal((size, dim), dtype=np.float32) * 1.2)
+
+
+def run(index, queries, **kwargs):
+    results, samples = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query, TOP_K, **kwargs)
+        samples.append(time.perf_counter() - start)
+        results.append({payload for payload, _ in hits})
+    return results, np.array(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=50000, help="embedded rows (docs + chunks)")
+    parser.add_argument("--dim", type=int, default=1024, help="1024 = bge-m3")
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--rescore", default="1,2,4,10")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_corpus(args.size, args.dim, args.topics, rng)
+    picks = vectors[rng.integers(0, args.size, QUERIES)]
+    queries = normalize_rows(picks + rng.standard_normal(picks.shape, dtype=np.float32) * 0.05)
+    payloads = list(range(args.size))
+
+    exact = VectorIndex.build(vectors, payloads)
+    truth, ms = run(exact, queries)
+    print(f"{args.size} x {args.dim}, top-{TOP_K}, {QUERIES} queries\n")
+    print(f"{'float32':<8} {'':<10} RAM {exact.nbytes / 1e6:8.1f} MB               "
+          f"recall@{TOP_K}=1.000  p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("int8", "binary"):
+            index = QuantizedIndex.build(vectors, payloads, os.path.join(tmp, f"{mode}.npy"), mode=mode)
+            for rescore in (int(r) for r in args.rescore.split(",")):
+                results, ms = run(index, queries, rescore=rescore)
+                recall = np.mean([len(r & t) / len(t) for r, t in zip(results, truth)])
+                print(f"{mode:<8} rescore={rescore:<3} RAM {index.nbytes / 1e6:8.1f} MB "
+                      f"({exact.nbytes / index.nbytes:4.1f}x less)  recall@{TOP_K}={recall:.3f}  "
+                      f"p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms")
+            print(f"{'':<8} full-precision vectors mapped from disk: {index.disk_bytes / 1e6:.1f} MB")
+            del index
+
+
+if __name__ == "__main__":
+    main()
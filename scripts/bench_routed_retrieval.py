@@ -0,0 +1,106 @@
+"""
+Recherche routée par partition (doc_type, category): index par partition vs corpus entier post-filtré
+Corpus synthétique (vecteurs regroupés par sujet, partitions de tailles inégales). Pour chaque requête
+routée vers quelques partitions, compare au top-k exact de ces partitions:
+- global + post-filtre: top-k (ou top-N candidats) du corpus entier, puis filtre sur la partition
+- partitionné: PartitionedIndex ne parcourt que les partitions routées
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+import numpy as np
+
+from services.vector_index import PartitionedIndex, VectorIndex, normalize_rows
+
+DOC_TYPES = {"product": 0.7, "faq": 0.15, "claim": 0.1, "policy": 0.05}
+
+
+def synthetic_corpus(n: int, dim: int, categories: int, rng):
+    """Vectors around per-topic centers; partition sizes follow DOC_TYPES shares, then a Zipf split in categories"""
+    partitions = []
+    for doc_type, share in DOC_TYPES.items():
+        weights = 1 / np.arange(1, categories + 1)
+        sizes = np.maximum(1, (weights / weights.sum() * share * n).astype(int))
+        partitions.extend(((doc_type, f"cat{c}"), int(size)) for c, size in enumerate(sizes))
+    topics = normalize_rows(rng.standard_normal((256, dim)))
+    vectors, keys = [], []
+    for key, size in partitions:
+        centers = topics[rng.integers(len(topics), size=size)]
+        vectors.append(centers + rng.standard_normal((size, dim)) * 3.2 / np.sqrt(dim))
+        keys.extend([key] * size)
+    return normalize_rows(np.concatenate(vectors)), keys, topics
+
+
+def timed(search, queries):
+    samples, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        samples.append(time.perf_counter() - start)
+    ms = np.array(samples) * 1000
+    return results, np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def recall(results, truths):
+    return np.mean([len(set(found) & set(truth)) / max(len(truth), 1) for found, truth in zip(results, truths)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--categories", type=int, default=8, help="categories per doc_type")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[5, 20, 100], help="global top-N before post-filtering")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors, keys, topics = synthetic_corpus(args.docs, args.dim, args.categories, rng)
+    ids = np.arange(len(keys))
+    full = VectorIndex.build(vectors, list(ids))
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    partitioned = PartitionedIndex({key: VectorIndex.build(vectors[rows], rows) for key, rows in groups.items()})
+    key_array = np.array([f"{doc_type}/{category}" for doc_type, category in keys])
+
+    # Routes: 1 to 3 partitions of the smaller doc_types (faq / claim / policy), as intents do
+    small = [key for key in groups if key[0] != "product"]
+    routes = [[small[i] for i in rng.choice(len(small), rng.integers(1, 4), replace=False)] for _ in range(args.queries)]
+    queries = normalize_rows(topics[rng.integers(len(topics), size=args.queries)] + rng.standard_normal((args.queries, args.dim)) * 0.05)
+
+    truths = []
+    for query, route in zip(queries, routes):
+        mask = np.isin(key_array, [f"{doc_type}/{category}" for doc_type, category in route])
+        scores = np.where(mask, vectors @ query, -np.inf)
+        truths.append(list(np.argsort(-scores)[:args.k]))
+
+    routed_share = np.mean([sum(len(groups[key]) for key in route) for route in routes]) / len(keys)
+    print(f"{len(keys)} docs x {args.dim}, {len(groups)} partitions, routes cover {routed_share:.1%} of the corpus on average, top-{args.k}\n")
+
+    for candidates in args.candidates:
+        def post_filtered(query, route=None):
+            allowed = {f"{doc_type}/{category}" for doc_type, category in route}
+            return [doc_id for doc_id, _ in full.search(query, candidates) if key_array[doc_id] in allowed][:args.k]
+        results, p50, p99 = timed(lambda item: post_filtered(*item), list(zip(queries, routes)))
+        print(f"  global top-{candidates:<4} + post-filter  recall@{args.k}={recall(results, truths):.3f}  p50={p50:.3f}ms p99={p99:.3f}ms")
+
+    def routed(item):
+        query, route = item
+        return [doc_id for doc_id, _ in partitioned.search(query, args.k, partitions=route)]
+    results, p50, p99 = timed(routed, list(zip(queries, routes)))
+    print(f"  partitioned (routed)            recall@{args.k}={recall(results, truths):.3f}  p50={p50:.3f}ms p99={p99:.3f}ms")
+
+    results, p50, p99 = timed(lambda query: [doc_id for doc_id, _ in partitioned.search(query, args.k)], queries)
+    _, full_p50, full_p99 = timed(lambda query: full.search(query, args.k), queries)
+    print(f"\n  unrouted: single index p50={full_p50:.3f}ms p99={full_p99:.3f}ms, "
+          f"all partitions merged p50={p50:.3f}ms p99={p99:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
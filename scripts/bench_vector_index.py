@@ -0,0 +1,66 @@
+"""
+Latence de recherche de l'index vectoriel en mémoire (services/vector_index.py)
+Embeddings aléatoires normalisés, top-5 par produit matrice-vecteur + argpartition,
+comparé à un tri complet des scores (np.argsort) sur le même matvec.
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "apps", "api"))
+
+import numpy as np
+
+from services.vector_index import VectorIndex, normalize_rows
+
+QUERIES = 200
+TOP_K = 5
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return f"p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms"
+
+
+def bench(size: int, dim: int, rng):
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    index = VectorIndex.build(vectors, list(range(size)))
+    queries = normalize_rows(rng.standard_normal((QUERIES, dim), dtype=np.float32))
+
+    argpartition, argsort = [], []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, TOP_K)
+        argpartition.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        scores = index.matrix @ query
+        np.argsort(-scores)[:TOP_K]
+        argsort.append(time.perf_counter() - start)
+
+    # Same top-k as a full sort
+    for query in queries[:20]:
+        expected = np.argsort(-(index.matrix @ query))[:TOP_K].tolist()
+        assert [payload for payload, _ in index.search(query, TOP_K)] == expected
+
+    print(f"{size:>7} x {dim:<5} {index.nbytes / 1e6:7.1f} MB   "
+          f"argpartition {percentiles(argpartition)}   full argsort {percentiles(argsort)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,20000,50000")
+    parser.add_argument("--dims", default="384,1024", help="1024 = bge-m3")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"top-{TOP_K}, {QUERIES} queries per size, single query per search\n")
+    for dim in (int(d) for d in args.dims.split(",")):
+        for size in (int(s) for s in args.sizes.split(",")):
+            bench(size, dim, rng)
+        print()
+
+
+if __name__ == "__main__":
+    main()